@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Build Benchmark for Portfolio
+Generates a synthetic gallery (projects x sections x images, with mixed aspect ratios,
+JPEGs, PNGs, animated GIFs and MP4 stubs) in a scratch directory and times each build
+stage on it: scan, dimension probing, thumbnails, layout, gallery rendering and page
+writes. Results can be written as JSON to compare runs and catch regressions.
+
+Usage: ./benchmark-build.py [--projects N] [--sections M] [--images K] [--json FILE]
+"""
+
+import argparse
+import contextlib
+import functools
+import importlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import build  # Registers the import finder for the hyphenated pipeline scripts
+from gallery_media import GALLERY_BASE, probe_dimensions
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Error: Pillow not found")
+    print("Install with: pip install Pillow")
+    sys.exit(1)
+
+# Aspect ratios (width, height) the synthetic images cycle through
+ASPECT_RATIOS = [(3, 2), (2, 3), (1, 1), (4, 3), (3, 4), (16, 9), (9, 16), (21, 9), (4, 5)]
+
+# Every Nth image is a video stub, an animated GIF or a PNG; the rest are JPEGs
+VIDEO_EVERY = 17
+GIF_EVERY = 13
+PNG_EVERY = 5
+
+GIF_FRAMES = 3
+GIF_SCALE = 4  # GIFs are generated at 1/GIF_SCALE of the image size, like real web animations
+JPEG_QUALITY = 90
+NOISE_SIGMA = 40
+NOISE_DETAIL = 8  # Noise is drawn at 1/NOISE_DETAIL of the size and smoothed up, so files compress like photos
+
+# ------------------------------------------------------------------
+# Synthetic gallery
+# ------------------------------------------------------------------
+
+def mp4_box(box_type, payload):
+    """One MP4 box"""
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+def mp4_stub(width, height):
+    """Smallest MP4 the dimension probe accepts: ftyp plus a moov with one video track header"""
+    identity_matrix = struct.pack('>9i', 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+    tkhd = (b'\x00\x00\x00\x03' + bytes(20) + bytes(16) + identity_matrix
+            + struct.pack('>II', width << 16, height << 16))
+    return mp4_box(b'ftyp', b'isom\x00\x00\x02\x00isomiso2mp41') + mp4_box(b'moov', mp4_box(b'trak', mp4_box(b'tkhd', tkhd)))
+
+@functools.lru_cache(maxsize=None)
+def noise_image(width, height):
+    """A smooth RGB noise image of the given size (cached: the gallery only uses a few sizes)"""
+    size = (max(1, width // NOISE_DETAIL), max(1, height // NOISE_DETAIL))
+    return Image.merge('RGB', [Image.effect_noise(size, NOISE_SIGMA) for _ in range(3)]).resize((width, height), Image.BICUBIC)
+
+def synthetic_image(path, width, height):
+    """Noise image with a path-dependent block, so every file has different content"""
+    img = noise_image(width, height).copy()
+    shade = zlib.crc32(path.encode('utf-8')) & 0xFFFFFF
+    img.paste((shade >> 16, (shade >> 8) & 0xFF, shade & 0xFF), (0, 0, max(1, width // 10), max(1, height // 10)))
+    return img
+
+def write_media(path, width, height):
+    """Write one synthetic gallery file; its extension picks the kind"""
+    extension = os.path.splitext(path)[1]
+    if extension == '.mp4':
+        with open(path, 'wb') as f:
+            f.write(mp4_stub(width, height))
+    elif extension == '.gif':
+        size = (max(1, width // GIF_SCALE), max(1, height // GIF_SCALE))
+        frames = [synthetic_image(f"{path}#{n}", *size).convert('P') for n in range(GIF_FRAMES)]
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=100, loop=0)
+    elif extension == '.png':
+        synthetic_image(path, width, height).save(path, compress_level=1)
+    else:
+        synthetic_image(path, width, height).save(path, quality=JPEG_QUALITY)
+
+def plan_gallery(projects, sections, images, image_size, seed):
+    """List (path, width, height) for every synthetic file, deterministically for a seed"""
+    rng = random.Random(seed)
+    files = []
+    counter = 0
+
+    for p in range(1, projects + 1):
+        for s in range(1, sections + 1):
+            folder = f"{GALLERY_BASE}/{p}-synthetic-{p:03d}/{s}-section-{s:03d}"
+            for i in range(1, images + 1):
+                counter += 1
+                ratio_w, ratio_h = rng.choice(ASPECT_RATIOS)
+                scale = image_size / max(ratio_w, ratio_h)
+                width, height = round(ratio_w * scale), round(ratio_h * scale)
+
+                if counter % VIDEO_EVERY == 0:
+                    extension = 'mp4'
+                elif counter % GIF_EVERY == 0:
+                    extension = 'gif'
+                elif counter % PNG_EVERY == 0:
+                    extension = 'png'
+                else:
+                    extension = 'jpg'
+                files.append((f"{folder}/{i:05d}-image.{extension}", width, height))
+
+    return files
+
+def create_gallery(root, files, workers):
+    """Write the synthetic gallery (and an empty text-content.json) under root"""
+    for folder in sorted({os.path.dirname(path) for path, _width, _height in files}):
+        os.makedirs(os.path.join(root, folder), exist_ok=True)
+
+    with open(os.path.join(root, 'text-content.json'), 'w', encoding='utf-8') as f:
+        json.dump({'projects': {}}, f)
+
+    jobs = [(os.path.join(root, path), width, height) for path, width, height in files]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(write_media, *zip(*jobs), chunksize=16))
+
+# ------------------------------------------------------------------
+# Stages
+# ------------------------------------------------------------------
+
+def timed(function, *args, **kwargs):
+    """Call a function with its progress output silenced and return (result, seconds)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        seconds = time.perf_counter() - start
+    return result, seconds
+
+def stage_result(seconds, items):
+    """Timing record for one stage"""
+    return {
+        'seconds': round(seconds, 4),
+        'items': items,
+        'per_item_ms': round(seconds * 1000 / items, 4) if items else None,
+    }
+
+def synthetic_projects(gallery_data):
+    """Project entries (as in generate-static-site.py's PROJECTS) for the synthetic gallery"""
+    return {gallery_key.split('-', 1)[1]: {'category': gallery_key.split('-', 1)[1].upper(), 'gallery_key': gallery_key}
+            for gallery_key in gallery_data['projects']}
+
+def layout_sections(site, gallery_data):
+    """Measured images and layout settings for every section, as generate_project_page prepares them"""
+    media = gallery_data.get('media')
+    sections = []
+
+    for gallery_key, project_data in gallery_data['projects'].items():
+        for section_key, section_data in project_data['sections'].items():
+            images = []
+            for idx, img_src in enumerate(section_data['images']):
+                size = site.get_image_size(img_src, is_last_in_section=idx == len(section_data['images']) - 1, media=media)
+                if size:
+                    images.append(site.image_object(img_src, size, len(images)))
+            min_images_per_row, target_row_height = site.get_layout_settings(section_key)
+            sections.append((f"{gallery_key}--{section_key}", images, min_images_per_row, target_row_height))
+
+    return sections
+
+def run_benchmark(args):
+    """Generate the gallery, time every stage and return the results"""
+    files = plan_gallery(args.projects, args.sections, args.images, args.image_size, args.seed)
+    stages = {}
+
+    _, seconds = timed(create_gallery, '.', files, args.workers)
+    print(f"  Generated {len(files)} files in {seconds:.2f}s")
+
+    # Imported only now: the site generator reads text-content.json and its caches on import
+    thumbnails = importlib.import_module('generate_thumbnails')
+    gallery = importlib.import_module('generate_gallery')
+    site = importlib.import_module('generate_static_site')
+
+    gallery_data, seconds = timed(gallery.scan_gallery, True)
+    stages['scan'] = stage_result(seconds, len(gallery_data['media']))
+
+    paths = list(gallery_data['media'])
+    _, seconds = timed(lambda: [probe_dimensions(path) for path in paths])
+    stages['probe_dimensions'] = stage_result(seconds, len(paths))
+
+    # create_thumbnail on its own (one process), then the whole stage across the pool
+    ladder = thumbnails.ladder_config(formats=args.formats) if args.formats else None
+    sources = [path for path in paths if os.path.splitext(path)[1].lower() in ('.jpg', '.jpeg', '.png')]
+    sample = sources[:args.sample]
+    scratch = tempfile.mkdtemp(prefix='thumb-', dir='.')
+    _, seconds = timed(lambda: [thumbnails.create_thumbnail(path, os.path.join(scratch, f"{n}_thumb.jpg"),
+                                                            thumbnails.THUMBNAIL_SIZE, ladder)
+                                for n, path in enumerate(sample)])
+    shutil.rmtree(scratch)
+    stages['create_thumbnail'] = stage_result(seconds, len(sample))
+
+    built, seconds = timed(thumbnails.build_thumbnails, args.workers, True, ladder)
+    stages['thumbnails'] = stage_result(seconds, built)
+
+    # Layout and rendering, section by section on the measured images
+    site.PROJECTS.clear()
+    site.PROJECTS.update(synthetic_projects(gallery_data))
+    sections = layout_sections(site, gallery_data)
+    image_count = sum(len(images) for _label, images, _min, _target in sections)
+
+    layouts, seconds = timed(lambda: [(label, site.create_bin_packed_layout([dict(img) for img in images], container_width=1000,
+                                                                           target_row_height=target_row_height, gap=10,
+                                                                           min_images_per_row=min_images_per_row))
+                                      for label, images, min_images_per_row, target_row_height in sections])
+    stages['create_bin_packed_layout'] = stage_result(seconds, image_count)
+
+    _, seconds = timed(lambda: [site.render_gallery_html(rows, gap=10, section_id=label) for label, rows in layouts])
+    stages['render_gallery_html'] = stage_result(seconds, image_count)
+
+    # Full page builds (layout, rendering, companion files and writes), then a no-op rebuild
+    pages, seconds = timed(site.build_pages, gallery_data, args.workers, True)
+    stages['pages'] = stage_result(seconds, len(pages))
+    pages, seconds = timed(site.build_pages, gallery_data, args.workers, False)
+    stages['pages_noop'] = stage_result(seconds, len(site.PROJECTS))
+
+    return {
+        'config': {
+            'projects': args.projects,
+            'sections': args.sections,
+            'images': args.images,
+            'image_size': args.image_size,
+            'seed': args.seed,
+            'workers': args.workers,
+            'formats': args.formats,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'files': len(files),
+        'stages': stages,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the build pipeline on a synthetic gallery")
+    parser.add_argument('--projects', type=int, default=4, help="number of projects (default: 4)")
+    parser.add_argument('--sections', type=int, default=5, help="sections per project (default: 5)")
+    parser.add_argument('--images', type=int, default=25, help="files per section (default: 25)")
+    parser.add_argument('--image-size', type=int, default=1600, help="long edge of the synthetic images in px (default: 1600)")
+    parser.add_argument('--seed', type=int, default=1, help="random seed for aspect ratios (default: 1)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: number of CPU cores)")
+    parser.add_argument('--formats', default='',
+                        help="comma-separated responsive ladder formats to include (default: none, JPEG thumbnails only)")
+    parser.add_argument('--sample', type=int, default=20, help="images timed one by one with create_thumbnail (default: 20)")
+    parser.add_argument('--keep', metavar='DIR', help="build in DIR and keep it, instead of a temporary directory")
+    parser.add_argument('--json', metavar='FILE', help="also write the results as JSON")
+    args = parser.parse_args()
+    args.formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in args.formats if fmt not in importlib.import_module('generate_thumbnails').RESPONSIVE_FORMATS]
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(unknown)}")
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    root = os.path.abspath(args.keep) if args.keep else tempfile.mkdtemp(prefix='portfolio-benchmark-')
+    os.makedirs(root, exist_ok=True)
+    if os.listdir(root):
+        parser.error(f"{root} is not empty")
+
+    print(f"Build Benchmark ({args.projects} projects x {args.sections} sections x {args.images} files) in {root}")
+    print("=" * 72)
+
+    # The pipeline scripts use paths relative to the site root, so the benchmark runs inside it
+    os.chdir(root)
+    try:
+        results = run_benchmark(args)
+    finally:
+        os.chdir(build.BASE_DIR)
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print("=" * 72)
+    print(f"{'stage':<28} {'seconds':>10} {'items':>8} {'ms/item':>10}")
+    for stage, result in results['stages'].items():
+        per_item = f"{result['per_item_ms']:.3f}" if result['per_item_ms'] is not None else '-'
+        print(f"{stage:<28} {result['seconds']:>10.3f} {result['items']:>8} {per_item:>10}")
+
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {json_path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Layout Benchmark for Portfolio Gallery
+Compares the greedy and optimal row partitioning modes of generate-static-site.py
+on the real gallery-data.json: layout time, row height deviation and upscaled thumbnails
+"""
+
+import argparse
+import importlib.util
+import json
+import time
+
+MODES = ['greedy', 'optimal']
+CONTAINER_WIDTH = 1000
+THUMBNAIL_SIZE = 600  # Regular thumbnails; images rendered wider than this are upscaled
+
+def load_site_generator():
+    """Import generate-static-site.py (its file name is not a valid module name)"""
+    spec = importlib.util.spec_from_file_location('generate_static_site', 'generate-static-site.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def load_sections(site):
+    """Collect every section as (label, images, section_options, min_images_per_row, target_row_height)"""
+    with open('gallery-data.json', 'r', encoding='utf-8') as f:
+        gallery_data = json.load(f)
+
+    sections = []
+
+    for project_id, project_info in site.PROJECTS.items():
+        project_data = gallery_data['projects'].get(project_info['gallery_key'])
+        if not project_data:
+            continue
+
+        project_text = site.TEXT_CONTENT['projects'].get(project_id, {})
+
+        for section_key, section_data in project_data['sections'].items():
+            section_options = site.SECTION_CONFIGS.get(project_id, {}).get(section_key, {})
+            section_text = project_text.get('sections', {}).get(section_key, {})
+            section_name = section_text.get('title', section_key.split('-', 1)[-1].replace('-', ' ').title())
+
+            images = []
+            for idx, img_src in enumerate(section_data['images']):
+                is_last = idx == len(section_data['images']) - 1
+                size = site.get_image_size(img_src, is_last_in_section=is_last)
+                if size is None:
+                    continue
+                images.append({'src': img_src, 'width': size[0], 'height': size[1],
+                               'isVideo': img_src.lower().endswith('.mp4'), 'index': len(images),
+                               'isLastInSection': is_last})
+
+            min_images_per_row, target_row_height = site.get_layout_settings(section_name, section_options)
+            sections.append((f"{project_id}/{section_key}", images, section_options, min_images_per_row, target_row_height))
+
+    return sections
+
+def measure(site, images, section_options, mode, min_images_per_row, target_row_height, repeat):
+    """Lay a section out `repeat` times and return timing and quality figures for the last layout"""
+    options = dict(section_options, layoutMode=mode)
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = site.create_bin_packed_layout([dict(img) for img in images], container_width=CONTAINER_WIDTH,
+                                             target_row_height=target_row_height, gap=10,
+                                             min_images_per_row=min_images_per_row, section_options=options)
+        timings.append(time.perf_counter() - start)
+
+    deviations = [abs(row[0]['height'] - target_row_height) / target_row_height for row in rows]
+    upscaled = sum(1 for row in rows for img in row
+                   if img['width'] > (1000 if img.get('isLastInSection') else THUMBNAIL_SIZE))
+
+    return {
+        'seconds': min(timings),
+        'rows': len(rows),
+        'mean_deviation': sum(deviations) / len(deviations) if deviations else 0.0,
+        'max_deviation': max(deviations, default=0.0),
+        'upscaled_images': upscaled,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark greedy vs optimal gallery layout")
+    parser.add_argument('--repeat', type=int, default=20, help="layouts per section and mode (best time is kept)")
+    parser.add_argument('--json', metavar='FILE', help="also write the results as JSON")
+    args = parser.parse_args()
+
+    site = load_site_generator()
+    sections = load_sections(site)
+
+    print("Layout Benchmark (container width 1000px)")
+    print("=" * 96)
+    print(f"{'section':<40} {'images':>6}  " + "  ".join(f"{mode:>24}" for mode in MODES))
+    print(f"{'':<40} {'':>6}  " + "  ".join(f"{'ms  rows  dev%  up':>24}" for _ in MODES))
+
+    results = []
+    totals = {mode: {'seconds': 0.0, 'rows': 0, 'deviation': 0.0, 'upscaled_images': 0} for mode in MODES}
+
+    for label, images, section_options, min_images_per_row, target_row_height in sections:
+        section_result = {'section': label, 'images': len(images)}
+        columns = []
+
+        for mode in MODES:
+            stats = measure(site, images, section_options, mode, min_images_per_row, target_row_height, args.repeat)
+            section_result[mode] = stats
+            totals[mode]['seconds'] += stats['seconds']
+            totals[mode]['rows'] += stats['rows']
+            totals[mode]['deviation'] += stats['mean_deviation'] * stats['rows']
+            totals[mode]['upscaled_images'] += stats['upscaled_images']
+            columns.append(f"{stats['seconds'] * 1000:>7.3f} {stats['rows']:>5} {stats['mean_deviation'] * 100:>5.1f} {stats['upscaled_images']:>3}")
+
+        results.append(section_result)
+        print(f"{label:<40} {len(images):>6}  " + "  ".join(f"{column:>24}" for column in columns))
+
+    print("=" * 96)
+    summary = {}
+    for mode in MODES:
+        total = totals[mode]
+        summary[mode] = {
+            'seconds': total['seconds'],
+            'rows': total['rows'],
+            'mean_deviation': total['deviation'] / total['rows'] if total['rows'] else 0.0,
+            'upscaled_images': total['upscaled_images'],
+        }
+        print(f"{mode:<8} total {total['seconds'] * 1000:8.2f} ms, {total['rows']} rows, "
+              f"mean row height deviation {summary[mode]['mean_deviation'] * 100:.1f}%, "
+              f"{total['upscaled_images']} images wider than their thumbnail")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'container_width': CONTAINER_WIDTH, 'sections': results, 'summary': summary}, f, indent=2)
+        print(f"\n✓ Results written to {args.json}")
+
+if __name__ == '__main__':
+    main()
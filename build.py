@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Portfolio Build
+Runs the whole pipeline in one process as a dependency graph of stages sharing one
+in-memory model: gallery scan, thumbnails, video posters and renditions, image
+dimensions, project pages, mobile carousels and (on request) description sync and
+publishing to dist/. Stages whose inputs are ready run at the same time, and every stage
+skips work whose inputs have not changed.
+
+Usage: ./build.py [stage ...] [--force] [--workers N] [--watch [--port PORT]]
+"""
+
+import argparse
+import importlib
+import importlib.abc
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import build_stats
+import dev_server
+from gallery_media import is_media_file
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The stage scripts have hyphenated file names; expose them as importable modules so
+# their process pools can pickle functions (spawned workers import this file first)
+SCRIPT_MODULES = {
+    'generate_gallery': 'generate-gallery.py',
+    'generate_thumbnails': 'generate-thumbnails.py',
+    'generate_videos': 'generate-videos.py',
+    'generate_static_site': 'generate-static-site.py',
+    'generate_mobile_carousels': 'generate-mobile-carousels.py',
+    'populate_image_descriptions': 'populate-image-descriptions.py',
+    'publish_site': 'publish-site.py',
+}
+
+class ScriptFinder(importlib.abc.MetaPathFinder):
+    """Import finder for the hyphenated pipeline scripts"""
+
+    def find_spec(self, name, path, target=None):
+        if name not in SCRIPT_MODULES:
+            return None
+        return importlib.util.spec_from_file_location(name, os.path.join(BASE_DIR, SCRIPT_MODULES[name]))
+
+sys.meta_path.append(ScriptFinder())
+
+# Stage -> stages whose results it needs
+STAGES = {
+    'scan': [],
+    'descriptions': ['scan'],
+    'thumbnails': [],
+    'videos': [],
+    'dimensions': ['scan', 'thumbnails', 'videos'],
+    'pages': ['scan', 'dimensions'],
+    'covers': ['scan', 'dimensions'],
+    'carousels': [],
+    'publish': ['pages', 'covers', 'carousels'],
+}
+
+# Ordering that only applies when both stages are part of the build
+RUN_AFTER = {
+    'pages': ['descriptions'],
+    'covers': ['carousels'],  # Both rewrite index.html
+}
+
+DEFAULT_TARGETS = ['pages', 'covers', 'carousels']
+
+# Watch mode: inputs and the stages to rebuild when something in them changes
+WATCH_RULES = [
+    ('images/gallery', ['pages', 'covers']),
+    ('images/mobile-covers', ['carousels']),
+    ('text-content.json', ['pages']),
+    ('media-rules.json', ['pages']),
+    ('generate-static-site.py', ['pages', 'covers']),  # Project, section and cover configs live here
+    ('templates', ['pages', 'carousels']),
+]
+WATCH_STATIC_EXTENSIONS = ('.html', '.css', '.js')  # Site files that only need a reload
+WATCH_POLL_SECONDS = 0.25
+WATCH_DEBOUNCE_SECONDS = 0.3  # Wait for a burst of changes (e.g. copying a folder) to settle
+
+def run_scan(model, args):
+    """Scan images/gallery into the gallery data"""
+    gallery_data = importlib.import_module('generate_gallery').scan_gallery(args.force)
+    if gallery_data is None:
+        raise RuntimeError("images/gallery did not exist; add images and build again")
+    model['gallery_data'] = gallery_data
+
+def run_descriptions(model, args):
+    """Add every gallery image to text-content.json"""
+    text_content = importlib.import_module('populate_image_descriptions').populate_text_content(model['gallery_data'])
+
+    # Pages built in this process read the text content loaded at import time
+    site = importlib.import_module('generate_static_site')
+    site.TEXT_CONTENT.clear()
+    site.TEXT_CONTENT.update(text_content)
+
+def run_thumbnails(model, args):
+    """Bring thumbnails and responsive derivatives up to date"""
+    thumbnails = importlib.import_module('generate_thumbnails')
+    thumbnails.build_thumbnails(args.workers, args.force, thumbnails.ladder_config(), args.memory_limit)
+
+def run_videos(model, args):
+    """Bring video posters, web renditions and preview loops up to date"""
+    importlib.import_module('generate_videos').build_videos(args.workers, args.force)
+
+def run_dimensions(model, args):
+    """Measure every gallery entry into the shared dimension cache"""
+    importlib.import_module('generate_static_site').measure_gallery(model['gallery_data'])
+
+def run_pages(model, args):
+    """Regenerate the project pages whose inputs changed"""
+    model['pages'] = importlib.import_module('generate_static_site').build_pages(model['gallery_data'], args.workers, args.force)
+
+def run_covers(model, args):
+    """Inline the homepage cover manifest into index.html"""
+    site = importlib.import_module('generate_static_site')
+    manifest = site.build_cover_manifest(model['gallery_data'])
+    site.save_dimension_cache()  # Keep the cover thumbnail sizes measured for the manifest
+    if not site.update_homepage_covers(manifest):
+        raise RuntimeError("could not update index.html")
+
+def run_carousels(model, args):
+    """Build the cover renditions and regenerate the mobile carousels in index.html"""
+    carousels = importlib.import_module('generate_mobile_carousels')
+    carousels_html = carousels.generate_all_carousels(args.workers, args.force)
+    if carousels_html and not carousels.update_index_html(carousels_html):
+        raise RuntimeError("could not update index.html")
+
+def run_publish(model, args):
+    """Copy the built site into dist/, minified, fingerprinted and pre-compressed"""
+    importlib.import_module('publish_site').publish_site()
+
+STAGE_FUNCTIONS = {
+    'scan': run_scan,
+    'descriptions': run_descriptions,
+    'thumbnails': run_thumbnails,
+    'videos': run_videos,
+    'dimensions': run_dimensions,
+    'pages': run_pages,
+    'covers': run_covers,
+    'carousels': run_carousels,
+    'publish': run_publish,
+}
+
+def plan_stages(targets):
+    """The targets plus every stage they need, transitively"""
+    selected = set()
+    pending = list(targets)
+    while pending:
+        stage = pending.pop()
+        if stage not in selected:
+            selected.add(stage)
+            pending.extend(STAGES[stage])
+    return selected
+
+def stage_dependencies(stage, selected):
+    """Stages that must finish before `stage` can start"""
+    return STAGES[stage] + [other for other in RUN_AFTER.get(stage, []) if other in selected]
+
+def run_stages(selected, model, args):
+    """Run the selected stages, each as soon as its dependencies are done; returns the failed stages"""
+    pending = set(selected)
+    done = set()
+    failed = []
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=len(selected)) as executor:
+        while pending or running:
+            # Start everything that is ready (nothing new starts after a failure)
+            for stage in sorted(pending):
+                if not failed and all(dependency in done for dependency in stage_dependencies(stage, selected)):
+                    print(f"\n▶ {stage}")
+                    running[executor.submit(timed, stage, model, args)] = stage
+                    pending.discard(stage)
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                try:
+                    elapsed = future.result()
+                except (Exception, SystemExit) as e:
+                    print(f"\n✗ {stage} failed: {e}")
+                    failed.append(stage)
+                else:
+                    print(f"\n✓ {stage} done in {elapsed:.2f}s")
+                    done.add(stage)
+
+    return failed
+
+def timed(stage, model, args):
+    """Run a stage and return how long it took"""
+    start_time = time.time()
+    with build_stats.stage(stage):
+        STAGE_FUNCTIONS[stage](model, args)
+    return time.time() - start_time
+
+def snapshot_inputs():
+    """(mtime, size) of every watched file
+
+    Only originals are tracked under the image folders, so the thumbnails a build writes
+    there don't trigger another build; other watched folders are tracked in full.
+    """
+    snapshot = {}
+
+    def add(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+    for root, _rule_stages in WATCH_RULES:
+        if os.path.isfile(root):
+            add(root)
+            continue
+        for folder, dirs, files in os.walk(root):
+            dirs[:] = [name for name in dirs if not name.startswith('.')]
+            for name in files:
+                if is_media_file(name) or not root.startswith('images/'):
+                    add(f"{folder}/{name}")
+
+    for name in os.listdir('.'):
+        if name.endswith(WATCH_STATIC_EXTENSIONS):
+            add(name)
+
+    return snapshot
+
+def stages_for_changes(paths):
+    """Stages to rebuild for a set of changed paths"""
+    stages = set()
+    for path in paths:
+        for root, rule_stages in WATCH_RULES:
+            if path == root or path.startswith(f"{root}/"):
+                stages.update(rule_stages)
+    return stages
+
+def reload_inputs(paths):
+    """Refresh modules whose data changed on disk since they were imported"""
+    site = sys.modules.get('generate_static_site')
+    if not site:
+        return
+    if 'generate-static-site.py' in paths:
+        importlib.reload(site)
+    elif 'text-content.json' in paths:
+        site.TEXT_CONTENT.clear()
+        site.TEXT_CONTENT.update(site.load_text_content())
+    if 'media-rules.json' in paths and 'generate-static-site.py' not in paths:
+        site.MEDIA_RULES = site.media_rules.load_matcher()
+
+def watch(args):
+    """Serve the site, rebuild what a change affects and live-reload open pages"""
+    server = dev_server.start_server(args.port, BASE_DIR)
+    print(f"\nServing http://localhost:{args.port} (live reload on); watching for changes, Ctrl+C to stop")
+
+    snapshot = snapshot_inputs()
+    try:
+        while True:
+            time.sleep(WATCH_POLL_SECONDS)
+            current = snapshot_inputs()
+            if current == snapshot:
+                continue
+
+            # Debounce: keep waiting until the files stop changing
+            while True:
+                time.sleep(WATCH_DEBOUNCE_SECONDS)
+                settled = snapshot_inputs()
+                if settled == current:
+                    break
+                current = settled
+
+            changed = {path for path in snapshot.keys() | current.keys() if snapshot.get(path) != current.get(path)}
+            stages = stages_for_changes(changed)
+            print(f"\n⟳ {len(changed)} file(s) changed: {', '.join(sorted(changed)[:3])}{' ...' if len(changed) > 3 else ''}")
+
+            if stages:
+                reload_inputs(changed)
+                start_time = time.time()
+                failed = run_stages(plan_stages(stages), {}, args)
+                elapsed = time.time() - start_time
+                print(f"\n✗ Rebuild failed in {', '.join(failed)}" if failed else f"\n✓ Rebuilt in {elapsed:.2f}s")
+
+            # Absorb the build's own outputs so they don't count as the next change
+            snapshot = snapshot_inputs()
+            dev_server.notify_reload()
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        server.shutdown()
+
+def main():
+    """Build the portfolio"""
+    parser = argparse.ArgumentParser(description="Build the portfolio (scan, thumbnails, pages, covers, carousels)")
+    parser.add_argument('stages', nargs='*', metavar='stage',
+                        help=f"stages to build, with everything they need ({', '.join(STAGES)}; "
+                             f"default: {' '.join(DEFAULT_TARGETS)})")
+    parser.add_argument('--force', action='store_true', help="rebuild everything, ignoring caches and manifests")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes for thumbnails and pages (default: number of CPU cores)")
+    parser.add_argument('--memory-limit', type=int, metavar='MB',
+                        help="memory ceiling per thumbnail for decoded bitmaps; the pool budget is workers x this "
+                             "(default: 512)")
+    parser.add_argument('--watch', action='store_true',
+                        help="after building, serve the site and rebuild whatever a file change affects")
+    parser.add_argument('--port', type=int, default=8000, help="port for --watch (default: 8000)")
+    build_stats.add_arguments(parser)
+    args = parser.parse_args()
+
+    unknown = [stage for stage in args.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    # The stage scripts use paths relative to the site root
+    os.chdir(BASE_DIR)
+
+    print("=" * 50)
+    print("Portfolio Build")
+    print("=" * 50)
+
+    build_stats.start(args.stats, args.trace)
+    start_time = time.time()
+    selected = plan_stages(args.stages or DEFAULT_TARGETS)
+    failed = run_stages(selected, {}, args)
+    elapsed = time.time() - start_time
+    build_stats.finish()
+
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"✗ Build failed in {', '.join(failed)} after {elapsed:.2f}s")
+        if not args.watch:
+            sys.exit(1)
+    else:
+        print(f"✓ Build complete in {elapsed:.2f}s")
+    print("=" * 50)
+
+    if args.watch:
+        # Later builds only touch what changed, so force only applies to the first one
+        args.force = False
+        watch(args)
+        return
+
+    print("\nRun: python -m http.server 8000")
+    print("Then open: http://localhost:8000")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Build Instrumentation
+Per-stage and per-file timings, counters (cache hits and misses, bytes read and
+written, subprocesses), peak memory and rebuild reasons for the build scripts.
+
+Recording is off unless a script runs with --stats FILE and/or --trace FILE (or the
+BUILD_STATS / BUILD_TRACE environment variables). Every process, worker processes
+included, then appends its events to a scratch directory, and the process that
+started recording merges them when the build ends: a JSON summary for --stats and a
+Chrome trace (chrome://tracing or https://ui.perfetto.dev) for --trace.
+"""
+
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak memory is then not reported
+    resource = None
+
+# Scratch directory shared with worker processes through the environment
+EVENTS_DIR_VARIABLE = 'BUILD_STATS_EVENTS'
+STATS_VARIABLE = 'BUILD_STATS'
+TRACE_VARIABLE = 'BUILD_TRACE'
+
+SLOWEST_FILES = 20  # Per-file spans listed in the summary
+
+_lock = threading.Lock()
+_local = threading.local()  # Span nesting depth per thread
+_state = {'pid': None, 'counters': {}, 'events': None}
+_outputs = {}  # Set in the process that called start()
+
+def _reset_after_fork():
+    """A forked worker starts with no open spans, and must not inherit a lock another thread held"""
+    global _lock, _local
+    _lock = threading.Lock()
+    _local = threading.local()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def enabled():
+    """Whether this build is being recorded"""
+    return EVENTS_DIR_VARIABLE in os.environ
+
+def _process_state():
+    """This process's counters and event file; a forked worker starts from empty ones"""
+    if _state['pid'] != os.getpid():
+        _state['pid'] = os.getpid()
+        _state['counters'] = {}
+        path = os.path.join(os.environ[EVENTS_DIR_VARIABLE], f"{os.getpid()}.jsonl")
+        _state['events'] = open(path, 'a', encoding='utf-8', buffering=1)
+    return _state
+
+def _write(record):
+    """Append one event to this process's event file"""
+    with _lock:
+        _process_state()['events'].write(json.dumps(record, ensure_ascii=False) + '\n')
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None where it cannot be measured)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def count(name, amount=1):
+    """Add to a counter, e.g. count('dimensions.cache.hit') or count('bytes_written', size)"""
+    if not enabled():
+        return
+    with _lock:
+        counters = _process_state()['counters']
+        counters[name] = counters.get(name, 0) + amount
+
+def flush():
+    """Record this process's counter totals and peak memory (the last record per process wins)"""
+    if not enabled():
+        return
+    with _lock:
+        state = _process_state()
+        record = {'type': 'counters', 'pid': os.getpid(), 'values': dict(state['counters']), 'peak_rss_mb': peak_rss_mb()}
+        state['events'].write(json.dumps(record) + '\n')
+
+@contextlib.contextmanager
+def span(name, category='file', **details):
+    """Time a block of work; yields a dict the block can add details (sizes, reasons) to
+
+    Counters are flushed whenever a thread's outermost span ends, so worker processes
+    report theirs without needing a shutdown hook.
+    """
+    if not enabled():
+        yield details
+        return
+
+    depth = getattr(_local, 'depth', 0)
+    _local.depth = depth + 1
+    start_time = time.time()
+    start = time.perf_counter()
+    try:
+        yield details
+    finally:
+        _local.depth = depth
+        _write({'type': 'span', 'name': name, 'cat': category, 'ts': start_time, 'dur': time.perf_counter() - start,
+                'pid': os.getpid(), 'tid': threading.get_ident(), 'args': details})
+        if depth == 0:
+            flush()
+
+def stage(name):
+    """Time a build stage"""
+    return span(name, category='stage')
+
+def rebuild(path, *reasons):
+    """Record why an output is being rebuilt (e.g. 'changed', 'missing output', 'forced')"""
+    if not enabled():
+        return
+    for reason in reasons:
+        count(f"rebuild.{reason}")
+    _write({'type': 'rebuild', 'path': path, 'reasons': list(reasons)})
+
+def add_arguments(parser):
+    """Add the --stats and --trace options to a script's argument parser"""
+    parser.add_argument('--stats', metavar='FILE', type=os.path.abspath, default=os.environ.get(STATS_VARIABLE),
+                        help="write build timings, counters and rebuild reasons to FILE as JSON")
+    parser.add_argument('--trace', metavar='FILE', type=os.path.abspath, default=os.environ.get(TRACE_VARIABLE),
+                        help="write a Chrome trace of the build to FILE")
+
+def start(stats_path=None, trace_path=None):
+    """Start recording if a stats or trace file was asked for (no-op when already recording)"""
+    if not (stats_path or trace_path) or enabled():
+        return
+    _outputs.update(stats=stats_path, trace=trace_path, started=time.time(),
+                    directory=tempfile.mkdtemp(prefix='build-stats-'))
+    os.environ[EVENTS_DIR_VARIABLE] = _outputs['directory']
+
+def read_events(directory):
+    """All events recorded in a scratch directory, and the last counter record of each process"""
+    events = []
+    counters = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # A worker killed mid-write
+                if record['type'] == 'counters':
+                    counters[record['pid']] = record
+                else:
+                    events.append(record)
+    return events, counters
+
+def summarize(events, counters, wall_seconds):
+    """Merge every process's events into the --stats summary"""
+    spans = [event for event in events if event['type'] == 'span']
+
+    stages = {}
+    for event in spans:
+        if event['cat'] == 'stage':
+            entry = stages.setdefault(event['name'], {'seconds': 0.0, 'runs': 0})
+            entry['seconds'] = round(entry['seconds'] + event['dur'], 4)
+            entry['runs'] += 1
+
+    totals = {}
+    for record in counters.values():
+        for name, value in record['values'].items():
+            totals[name] = totals.get(name, 0) + value
+
+    caches = {}
+    for name in totals:
+        if name.endswith(('.hit', '.miss')):
+            cache = name.rsplit('.', 1)[0]
+            hits, misses = totals.get(f"{cache}.hit", 0), totals.get(f"{cache}.miss", 0)
+            caches[cache] = {'hit': hits, 'miss': misses, 'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None}
+
+    files = sorted((event for event in spans if event['cat'] != 'stage'), key=lambda event: event['dur'], reverse=True)
+    peaks = [record['peak_rss_mb'] for record in counters.values() if record['peak_rss_mb'] is not None]
+
+    return {
+        'wall_seconds': round(wall_seconds, 4),
+        'stages': stages,
+        'counters': dict(sorted(totals.items())),
+        'caches': dict(sorted(caches.items())),
+        'peak_rss_mb': {'main': peak_rss_mb(), 'max_process': max(peaks, default=None)},
+        'processes': len(counters),
+        'slowest': [{'name': event['name'], 'category': event['cat'], 'seconds': round(event['dur'], 4), **event['args']}
+                    for event in files[:SLOWEST_FILES]],
+        'rebuilds': [{'path': event['path'], 'reasons': event['reasons']} for event in events if event['type'] == 'rebuild'],
+    }
+
+def chrome_trace(events):
+    """Spans as Chrome trace events (complete events, microsecond timestamps)"""
+    return {'traceEvents': [{'name': event['name'], 'cat': event['cat'], 'ph': 'X', 'ts': round(event['ts'] * 1e6),
+                             'dur': round(event['dur'] * 1e6), 'pid': event['pid'], 'tid': event['tid'], 'args': event['args']}
+                            for event in events if event['type'] == 'span'],
+            'displayTimeUnit': 'ms'}
+
+def finish():
+    """Stop recording, write the requested files and print a short summary (only where start() was called)"""
+    if not _outputs.get('directory'):
+        return
+
+    flush()
+    directory = _outputs.pop('directory')
+    del os.environ[EVENTS_DIR_VARIABLE]
+    if _state['events']:
+        _state['events'].close()
+    _state.update(pid=None, counters={}, events=None)
+
+    events, counters = read_events(directory)
+    shutil.rmtree(directory, ignore_errors=True)
+    summary = summarize(events, counters, time.time() - _outputs['started'])
+
+    print("\nBuild stats")
+    for name, entry in summary['stages'].items():
+        print(f"  {name:<28} {entry['seconds']:8.3f}s")
+    for name, cache in summary['caches'].items():
+        print(f"  {name:<28} {cache['hit']} hit / {cache['miss']} miss")
+    for name in ('bytes_read', 'bytes_written', 'subprocesses'):
+        if name in summary['counters']:
+            print(f"  {name:<28} {summary['counters'][name]:,}")
+    if summary['peak_rss_mb']['max_process'] is not None:
+        print(f"  {'peak RSS':<28} {summary['peak_rss_mb']['max_process']} MB")
+
+    if _outputs['stats']:
+        with open(_outputs['stats'], 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        print(f"✓ Stats written to {_outputs['stats']}")
+    if _outputs['trace']:
+        with open(_outputs['trace'], 'w', encoding='utf-8') as f:
+            json.dump(chrome_trace(events), f, ensure_ascii=False)
+        print(f"✓ Trace written to {_outputs['trace']}")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Derivative Cache Tool
+Export the derivative cache to a tarball or shared directory, seed it from one, evict
+entries down to a size limit, or show how big it is.
+
+Usage:
+  ./derivative-cache.py export derivatives.tar.gz   (or a directory)
+  ./derivative-cache.py import derivatives.tar.gz   (or a directory, e.g. a shared path)
+  ./derivative-cache.py prune [--max-size MB]
+  ./derivative-cache.py info
+"""
+
+import argparse
+import os
+
+import derivative_cache
+
+def main():
+    """Run a cache command"""
+    parser = argparse.ArgumentParser(description="Manage the content-addressed derivative cache")
+    parser.add_argument('--cache-dir', default=derivative_cache.cache_dir(),
+                        help=f"cache directory (default: ${derivative_cache.CACHE_DIR_VARIABLE} or "
+                             f"{derivative_cache.DEFAULT_CACHE_DIR})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help="write the cache to a tarball or merge it into a directory")
+    export_parser.add_argument('target', help="a .tar, .tar.gz or .tgz file, or a directory")
+    import_parser = commands.add_parser('import', help="add the entries of a tarball or cache directory")
+    import_parser.add_argument('source', help="a .tar, .tar.gz or .tgz file, or a directory")
+    prune_parser = commands.add_parser('prune', help="evict least recently used entries down to a size limit")
+    prune_parser.add_argument('--max-size', type=int, default=derivative_cache.max_size_mb(), metavar='MB',
+                              help=f"size limit (default: ${derivative_cache.MAX_SIZE_VARIABLE} or "
+                                   f"{derivative_cache.DEFAULT_MAX_SIZE_MB})")
+    commands.add_parser('info', help="show the number of entries and their size")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        count = derivative_cache.export_cache(args.target, args.cache_dir)
+        print(f"✓ Exported {count} entries to {args.target}")
+    elif args.command == 'import':
+        if not os.path.exists(args.source):
+            parser.error(f"{args.source} does not exist")
+        count = derivative_cache.import_cache(args.source, args.cache_dir)
+        print(f"✓ Imported {count} new entries into {args.cache_dir}")
+    elif args.command == 'prune':
+        removed, freed = derivative_cache.prune(args.max_size, args.cache_dir)
+        print(f"✓ Evicted {removed} entries ({freed / (1024 * 1024):.1f} MB)")
+    else:
+        entries = list(derivative_cache.iter_entries(args.cache_dir))
+        size = sum(entry_size for _path, entry_size, _last_use in entries)
+        print(f"{args.cache_dir}: {len(entries)} entries, {size / (1024 * 1024):.1f} MB "
+              f"(limit {derivative_cache.max_size_mb()} MB)")
+
+if __name__ == "__main__":
+    main()
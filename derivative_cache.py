@@ -0,0 +1,187 @@
+"""
+Derivative Cache
+Content-addressed store for built derivatives (thumbnails, responsive ladders, video
+posters and renditions), keyed by source hash + operation + encoder parameters, so a
+fresh checkout or another machine can publish them instead of encoding them again.
+
+Each entry is a directory <cache>/<key[:2]>/<key>/ holding the files by name (the part
+of the output path after the source's base name, e.g. _thumb480.webp) and a meta.json
+with anything else the build recorded. Files are published into the site tree as hard
+links (copies across file systems); writers must detach() an output before rewriting it.
+Entries are evicted least recently used first once the cache outgrows its size limit.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+
+import build_stats
+
+DEFAULT_CACHE_DIR = ".build-cache/derivatives"
+CACHE_DIR_VARIABLE = 'DERIVATIVE_CACHE'  # e.g. a shared file system path
+DEFAULT_MAX_SIZE_MB = 2048
+MAX_SIZE_VARIABLE = 'DERIVATIVE_CACHE_MB'
+META_FILE = 'meta.json'
+TARBALL_EXTENSIONS = ('.tar', '.tar.gz', '.tgz')
+
+def cache_dir():
+    """The cache directory: $DERIVATIVE_CACHE, or .build-cache/derivatives"""
+    return os.environ.get(CACHE_DIR_VARIABLE) or DEFAULT_CACHE_DIR
+
+def max_size_mb():
+    """The cache size limit in MB: $DERIVATIVE_CACHE_MB, or DEFAULT_MAX_SIZE_MB"""
+    return int(os.environ.get(MAX_SIZE_VARIABLE) or DEFAULT_MAX_SIZE_MB)
+
+def cache_key(source_hash, operation, params):
+    """Key for the outputs of running `operation` with `params` on a source"""
+    payload = json.dumps([source_hash, operation, params], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def entry_path(key, directory=None):
+    """Directory of a cache entry"""
+    return os.path.join(directory or cache_dir(), key[:2], key)
+
+def link_or_copy(source, destination):
+    """Hard-link a file into place, copying when a link is not possible, replacing what is there"""
+    detach(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        tmp_path = f"{destination}.tmp"
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+
+def detach(path):
+    """Remove an output before it is rewritten, so writing never goes through a link into the cache"""
+    if os.path.lexists(path):
+        os.remove(path)
+
+def read_meta(path):
+    """An entry's meta.json, or None if the entry is missing or incomplete"""
+    try:
+        with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not all(os.path.exists(os.path.join(path, name)) for name in meta.get('files', [])):
+        return None
+    return meta
+
+def restore(key, base_path, directory=None):
+    """Publish a cached entry next to base_path (base_path + file name); returns its meta, or None on a miss"""
+    path = entry_path(key, directory)
+    meta = read_meta(path)
+    if meta is None:
+        build_stats.count('derivatives.cache.miss')
+        return None
+
+    for name in meta['files']:
+        link_or_copy(os.path.join(path, name), f"{base_path}{name}")
+
+    # Last use, for LRU eviction
+    os.utime(os.path.join(path, META_FILE))
+    build_stats.count('derivatives.cache.hit')
+    return meta
+
+def store(key, base_path, paths, meta=None, directory=None):
+    """Add freshly built outputs (all starting with base_path) to the cache under a key
+
+    The entry is assembled in a scratch directory and renamed into place, so concurrent
+    builds sharing a cache never see half an entry.
+    """
+    path = entry_path(key, directory)
+    if os.path.exists(path):
+        return
+
+    names = [output[len(base_path):] for output in paths]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix=f".{key}-", dir=os.path.dirname(path))
+    try:
+        for name, output in zip(names, paths):
+            link_or_copy(output, os.path.join(tmp_path, name))
+        with open(os.path.join(tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(dict(meta or {}, files=names, stored=time.time()), f, ensure_ascii=False)
+        os.rename(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)  # Another build stored it first, or the disk is full
+
+def iter_entries(directory=None):
+    """(path, size in bytes, last use) of every complete entry"""
+    directory = directory or cache_dir()
+    if not os.path.isdir(directory):
+        return
+    for prefix in sorted(os.listdir(directory)):
+        prefix_path = os.path.join(directory, prefix)
+        if len(prefix) != 2 or not os.path.isdir(prefix_path):
+            continue
+        for key in sorted(os.listdir(prefix_path)):
+            path = os.path.join(prefix_path, key)
+            if key.startswith('.'):
+                continue
+            try:
+                size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+                last_use = os.path.getmtime(os.path.join(path, META_FILE))
+            except OSError:
+                continue
+            yield path, size, last_use
+
+def prune(max_mb=None, directory=None):
+    """Evict least recently used entries until the cache fits max_mb; returns (entries removed, bytes freed)"""
+    limit = (max_mb if max_mb is not None else max_size_mb()) * 1024 * 1024
+    entries = sorted(iter_entries(directory), key=lambda entry: entry[2])
+    total = sum(size for _path, size, _last_use in entries)
+
+    removed = freed = 0
+    for path, size, _last_use in entries:
+        if total <= limit:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        freed += size
+        removed += 1
+    return removed, freed
+
+def merge(source, destination):
+    """Copy entries that destination does not have yet from one cache directory into another; returns how many"""
+    added = 0
+    for path, _size, _last_use in list(iter_entries(source)):
+        key = os.path.basename(path)
+        target = entry_path(key, destination)
+        if os.path.exists(target) or read_meta(path) is None:
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = tempfile.mkdtemp(prefix=f".{key}-", dir=os.path.dirname(target))
+        shutil.copytree(path, tmp_path, dirs_exist_ok=True)
+        try:
+            os.rename(tmp_path, target)
+            added += 1
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+    return added
+
+def export_cache(target, directory=None):
+    """Write the cache to a tarball (.tar, .tar.gz, .tgz) or merge it into another directory; returns entries written"""
+    directory = directory or cache_dir()
+    if not target.endswith(TARBALL_EXTENSIONS):
+        return merge(directory, target)
+
+    entries = list(iter_entries(directory))
+    with tarfile.open(target, 'w:gz' if target.endswith(('.gz', '.tgz')) else 'w') as tar:
+        for path, _size, _last_use in entries:
+            tar.add(path, arcname=os.path.relpath(path, directory))
+    return len(entries)
+
+def import_cache(source, directory=None):
+    """Seed the cache from a tarball or another cache directory (a shared path); returns entries added"""
+    directory = directory or cache_dir()
+    if os.path.isdir(source):
+        return merge(source, directory)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        with tarfile.open(source, 'r:*') as tar:
+            tar.extractall(scratch, filter='data')
+        return merge(scratch, directory)
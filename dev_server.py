@@ -0,0 +1,164 @@
+"""
+Local Development Server
+Serves the site for `./build.py --watch`: answers HTTP range requests (Safari needs
+them to play and seek MP4s) and live-reloads open pages after each rebuild
+"""
+
+import http.server
+import os
+import re
+import threading
+
+LIVE_RELOAD_PATH = '/__livereload'
+LIVE_RELOAD_SCRIPT = (f"<script>new EventSource('{LIVE_RELOAD_PATH}')"
+                      ".addEventListener('reload', () => location.reload());</script>")
+KEEPALIVE_SECONDS = 15
+COPY_CHUNK_SIZE = 64 * 1024
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)$')
+
+# Bumped by notify_reload(); each live-reload connection waits for it to change
+_reload_condition = threading.Condition()
+_reload_generation = 0
+
+def notify_reload():
+    """Tell every open page to reload"""
+    global _reload_generation
+    with _reload_condition:
+        _reload_generation += 1
+        _reload_condition.notify_all()
+
+class RangeNotSatisfiable(Exception):
+    """A Range header asking only for bytes past the end of the file (answered with 416)"""
+
+def parse_range(range_header, size):
+    """Return the (start, end) byte range (inclusive) a Range header asks for, or None to serve the whole file
+
+    Only single ranges are supported; a header that does not parse, or asks for several
+    ranges, is ignored as RFC 9110 says, and so is any range of an empty file. Raises
+    RangeNotSatisfiable when the range holds no byte of the file.
+    """
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match or match.groups() == ('', '') or size == 0:
+        return None
+
+    start, end = match.groups()
+    if start == '':
+        # "bytes=-N" is the last N bytes
+        if int(end) == 0:
+            raise RangeNotSatisfiable(range_header)
+        return (max(0, size - int(end)), size - 1)
+
+    start = int(start)
+    if end and int(end) < start:
+        return None  # "bytes=5-2" is invalid, so ignored
+    if start >= size:
+        raise RangeNotSatisfiable(range_header)
+    return (start, min(int(end), size - 1) if end else size - 1)
+
+class DevRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler with range requests, live reload and caching turned off"""
+
+    def end_headers(self):
+        self.send_header('Cache-Control', 'no-store')
+        super().end_headers()
+
+    def log_request(self, code='-', size='-'):
+        # Only report failures; successful requests would drown out the build output
+        if isinstance(code, int) and code >= 400:
+            super().log_request(code, size)
+
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            return self.send_live_reload_events()
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, 'index.html')
+
+        if path.endswith('.html') and os.path.isfile(path):
+            return self.send_html(path)
+        if 'Range' in self.headers and os.path.isfile(path):
+            return self.send_range(path)
+        return super().do_GET()
+
+    def send_html(self, path):
+        """Serve a page with the live-reload script added"""
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        script = LIVE_RELOAD_SCRIPT.encode('utf-8')
+        body_end = content.rfind(b'</body>')
+        content = content[:body_end] + script + content[body_end:] if body_end != -1 else content + script
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def send_range(self, path):
+        """Serve the requested byte range of a file"""
+        size = os.path.getsize(path)
+        try:
+            byte_range = parse_range(self.headers['Range'], size)
+        except RangeNotSatisfiable:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if byte_range is None:
+            return super().do_GET()
+
+        start, end = byte_range
+        self.send_response(206)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            try:
+                while remaining > 0:
+                    chunk = f.read(min(COPY_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Browsers drop video range requests all the time
+
+    def send_live_reload_events(self):
+        """Hold a server-sent events stream open and send "reload" after each rebuild"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+
+        with _reload_condition:
+            generation = _reload_generation
+
+        try:
+            while True:
+                with _reload_condition:
+                    _reload_condition.wait_for(lambda: _reload_generation != generation, timeout=KEEPALIVE_SECONDS)
+                    reloaded = _reload_generation != generation
+                    generation = _reload_generation
+
+                self.wfile.write(b'event: reload\ndata: \n\n' if reloaded else b': keepalive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def start_server(port, directory):
+    """Serve `directory` on localhost:port from a background thread and return the server"""
+    def handler(*args, **kwargs):
+        return DevRequestHandler(*args, directory=directory, **kwargs)
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,293 @@
+"""
+Shared gallery media helpers
+Which files count as gallery media (one rule for the scanner, thumbnailer and site
+generator), source fingerprints for the build manifests and header-only dimension
+probing for images and videos
+"""
+
+import hashlib
+import os
+import struct
+
+import build_stats
+
+GALLERY_BASE = "images/gallery"
+
+# Media the gallery picks up, and the subset generate-thumbnails.py can resize
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'}
+VIDEO_EXTENSIONS = {'.mp4', '.mov'}
+MEDIA_EXTENSIONS = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+THUMBNAIL_SOURCE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+# Generated derivatives (_thumb.jpg, _thumb1000.jpg, _thumb480.webp, ...) carry this marker
+THUMBNAIL_MARKER = '_thumb'
+
+# JPEG start-of-frame markers that carry the image size (excludes DHT, JPG and DAC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def is_media_file(filename):
+    """Whether a file name is an original gallery image or video (not a thumbnail or hidden file)"""
+    if filename.startswith('.') or THUMBNAIL_MARKER in filename:
+        return False
+    return os.path.splitext(filename)[1].lower() in MEDIA_EXTENSIONS
+
+def is_thumbnail_source(filename):
+    """Whether generate-thumbnails.py builds thumbnails for this file"""
+    return is_media_file(filename) and os.path.splitext(filename)[1].lower() in THUMBNAIL_SOURCE_EXTENSIONS
+
+def is_video_file(filename):
+    """Whether a file name is an original gallery video"""
+    return is_media_file(filename) and os.path.splitext(filename)[1].lower() in VIDEO_EXTENSIONS
+
+def hash_file(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+            build_stats.count('bytes_read', len(chunk))
+    build_stats.count('files_hashed')
+    return digest.hexdigest()
+
+def source_fingerprint(path, entry=None):
+    """Size, mtime and content hash of a source file
+
+    The hash is reused from a build manifest entry when size and mtime are unchanged,
+    so only touched files are read.
+    """
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+    if entry and entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime_ns:
+        fingerprint['hash'] = entry['hash']
+    else:
+        fingerprint['hash'] = hash_file(path)
+
+    return fingerprint
+
+def read_exif_orientation(data):
+    """Return the EXIF orientation tag from an APP1 segment payload (1 if absent)"""
+    if not data.startswith(b'Exif\x00\x00'):
+        return 1
+
+    tiff = data[6:]
+    byte_order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if not byte_order:
+        return 1
+
+    ifd_offset = struct.unpack(f'{byte_order}I', tiff[4:8])[0]
+    entry_count = struct.unpack(f'{byte_order}H', tiff[ifd_offset:ifd_offset + 2])[0]
+
+    for i in range(entry_count):
+        entry = tiff[ifd_offset + 2 + i * 12:ifd_offset + 14 + i * 12]
+        tag, value_type, _count = struct.unpack(f'{byte_order}HHI', entry[:8])
+        if tag == 0x0112 and value_type == 3:
+            return struct.unpack(f'{byte_order}H', entry[8:10])[0]
+
+    return 1
+
+def read_jpeg_size(f):
+    """Read width/height from the first JPEG SOF segment, honoring EXIF rotation"""
+    if f.read(2) != b'\xff\xd8':
+        return None
+
+    orientation = 1
+
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue
+
+        # Skip fill bytes between markers
+        marker = f.read(1)
+        while marker == b'\xff':
+            marker = f.read(1)
+        if not marker:
+            return None
+
+        marker = marker[0]
+        if marker == 0xD8 or 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            continue  # Standalone markers have no length
+        if marker == 0xD9:
+            return None
+
+        length = struct.unpack('>H', f.read(2))[0]
+
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>xHH', f.read(5))
+            # Orientations 5-8 rotate the image by 90 degrees
+            return (height, width) if orientation >= 5 else (width, height)
+
+        if marker == 0xE1 and orientation == 1:
+            orientation = read_exif_orientation(f.read(length - 2))
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+def read_png_size(f):
+    """Read width/height from the PNG IHDR chunk"""
+    header = f.read(24)
+    if header[:8] != b'\x89PNG\r\n\x1a\n' or header[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', header[16:24])
+
+def read_gif_size(f):
+    """Read width/height from the GIF logical screen descriptor"""
+    header = f.read(10)
+    if header[:6] not in (b'GIF87a', b'GIF89a'):
+        return None
+    return struct.unpack('<HH', header[6:10])
+
+def skip_gif_sub_blocks(f):
+    """Skip a chain of GIF data sub-blocks (length byte + data, ended by a zero length)"""
+    while True:
+        length = f.read(1)
+        if not length or length == b'\x00':
+            return
+        f.seek(length[0], os.SEEK_CUR)
+
+def count_gif_frames(f, limit=2):
+    """Count the frames of a GIF, stopping at `limit`; returns 0 for anything that is not a GIF"""
+    header = f.read(13)
+    if len(header) < 13 or header[:6] not in (b'GIF87a', b'GIF89a'):
+        return 0
+
+    flags = header[10]
+    if flags & 0x80:
+        f.seek(3 << ((flags & 0x07) + 1), os.SEEK_CUR)  # Global color table
+
+    frames = 0
+    while frames < limit:
+        block = f.read(1)
+        if block == b'\x21':  # Extension: label, then sub-blocks
+            f.seek(1, os.SEEK_CUR)
+            skip_gif_sub_blocks(f)
+        elif block == b'\x2c':  # Image descriptor
+            descriptor = f.read(9)
+            if len(descriptor) < 9:
+                break
+            if descriptor[8] & 0x80:
+                f.seek(3 << ((descriptor[8] & 0x07) + 1), os.SEEK_CUR)  # Local color table
+            f.seek(1, os.SEEK_CUR)  # LZW minimum code size
+            skip_gif_sub_blocks(f)
+            frames += 1
+        else:  # Trailer, or a truncated file
+            break
+
+    return frames
+
+def is_animated_gif(path):
+    """Whether a file is a GIF with more than one frame"""
+    if os.path.splitext(path)[1].lower() != '.gif':
+        return False
+    try:
+        with open(path, 'rb') as f:
+            return count_gif_frames(f) > 1
+    except OSError:
+        return False
+
+def read_webp_size(f):
+    """Read width/height from a WebP VP8, VP8L or VP8X header"""
+    header = f.read(30)
+    if header[:4] != b'RIFF' or header[8:12] != b'WEBP':
+        return None
+
+    chunk = header[12:16]
+    if chunk == b'VP8 ':
+        width, height = struct.unpack('<HH', header[26:30])
+        return (width & 0x3FFF, height & 0x3FFF)
+    if chunk == b'VP8L':
+        bits = int.from_bytes(header[21:25], 'little')
+        return ((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b'VP8X':
+        return (int.from_bytes(header[24:27], 'little') + 1, int.from_bytes(header[27:30], 'little') + 1)
+    return None
+
+def iter_mp4_boxes(f, end):
+    """Yield (type, payload_start, box_end) for the MP4 boxes between the current position and end"""
+    while f.tell() + 8 <= end:
+        box_start = f.tell()
+        size, box_type = struct.unpack('>I4s', f.read(8))
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+        elif size == 0:
+            size = end - box_start
+        if size < 8:
+            return
+
+        yield box_type, f.tell(), box_start + size
+        f.seek(box_start + size)
+
+def read_mp4_size(f):
+    """Read the display width/height of the first video track from its tkhd box"""
+    f.seek(0, os.SEEK_END)
+    file_end = f.tell()
+    f.seek(0)
+
+    for box_type, moov_start, moov_end in iter_mp4_boxes(f, file_end):
+        if box_type != b'moov':
+            continue
+
+        f.seek(moov_start)
+        for trak_type, trak_start, trak_end in iter_mp4_boxes(f, moov_end):
+            if trak_type != b'trak':
+                continue
+
+            f.seek(trak_start)
+            for tkhd_type, tkhd_start, _tkhd_end in iter_mp4_boxes(f, trak_end):
+                if tkhd_type != b'tkhd':
+                    continue
+
+                f.seek(tkhd_start)
+                version = f.read(1)[0]
+                # Skip flags, times, track id and duration (wider in version 1), then reserved/layer/volume
+                f.seek(3 + (32 if version == 1 else 20) + 16, os.SEEK_CUR)
+                matrix = struct.unpack('>9i', f.read(36))
+                width, height = (value >> 16 for value in struct.unpack('>II', f.read(8)))
+
+                # Audio tracks have a zero size; keep looking for the video track
+                if width and height:
+                    # A matrix with a == d == 0 rotates the video by 90 degrees
+                    if matrix[0] == 0 and matrix[4] == 0:
+                        return (height, width)
+                    return (width, height)
+                break
+
+            f.seek(trak_end)
+        return None
+
+    return None
+
+def sniff_dimension_reader(header):
+    """Pick a header reader from a file's leading bytes (extensions are not trusted:
+    older thumbnails are sometimes PNG data saved as .jpg)"""
+    if header.startswith(b'\xff\xd8'):
+        return read_jpeg_size
+    if header.startswith(b'\x89PNG'):
+        return read_png_size
+    if header.startswith(b'GIF8'):
+        return read_gif_size
+    if header.startswith(b'RIFF') and header[8:12] == b'WEBP':
+        return read_webp_size
+    if header[4:8] in (b'ftyp', b'moov', b'mdat', b'free', b'wide'):
+        return read_mp4_size
+    return None
+
+def probe_dimensions(path):
+    """Read (width, height) from a file's header bytes, or None if the file can't be parsed"""
+    build_stats.count('files_probed')
+    try:
+        with open(path, 'rb') as f:
+            reader = sniff_dimension_reader(f.read(12))
+            if not reader:
+                return None
+            f.seek(0)
+            size = reader(f)
+    except (OSError, struct.error, IndexError) as e:
+        print(f"  Warning: Could not parse {path}: {e}")
+        return None
+
+    if not size or not size[0] or not size[1]:
+        return None
+    return (int(size[0]), int(size[1]))
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Gallery Scanner for Portfolio
+Scans images/gallery and writes gallery-data.json, recording every entry's
+dimensions and file size so later stages don't need to probe the originals.
+A snapshot of the tree is kept so a rescan only lists directories that changed.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import build_stats
+from gallery_media import GALLERY_BASE, is_media_file, probe_dimensions
+
+# Configuration
+OUTPUT_FILE = "gallery-data.json"
+SNAPSHOT_FILE = ".build-cache/gallery-scan.json"
+EXAMPLE_FOLDERS = ["magazines/ellegirl", "magazines/elle", "magazines/cosmo", "illustration"]
+
+# Collation order of punctuation; names sort case-insensitively with punctuation before
+# digits and letters, matching the order the old shell scanner's `sort` produced
+PUNCTUATION_ORDER = {char: rank for rank, char in enumerate(' _-,;:!?.\'"()[]{}@*/\\&#%`^+<=>|~$')}
+
+def sort_key(name):
+    """Sort key for file and folder names"""
+    return [(0, PUNCTUATION_ORDER[char]) if char in PUNCTUATION_ORDER else (1, ord(char))
+            for char in name.lower()], name
+
+def load_snapshot():
+    """Load the directory snapshot from the previous scan"""
+    try:
+        with open(SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_json_atomic(path, data, **dump_options):
+    """Write JSON to a temporary file and move it into place, so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, **dump_options)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+def scan_directory(path, previous, stats):
+    """List one directory in a single os.scandir pass
+
+    Returns {'mtime', 'folders', 'files'}, where files maps each media file name to its
+    mtime, size and dimensions. Files whose mtime and size match the previous snapshot
+    keep their recorded dimensions instead of being probed again.
+    """
+    previous_files = (previous or {}).get('files', {})
+    folders = []
+    files = {}
+
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir():
+                folders.append(entry.name)
+                continue
+            if not entry.is_file() or not is_media_file(entry.name):
+                continue
+
+            stat = entry.stat()
+            record = previous_files.get(entry.name)
+            if not record or record['mtime'] != stat.st_mtime_ns or record['bytes'] != stat.st_size:
+                record = {'mtime': stat.st_mtime_ns, 'bytes': stat.st_size}
+                size = probe_dimensions(entry.path)
+                if size:
+                    record['width'], record['height'] = size
+                stats['probed'] += 1
+            files[entry.name] = record
+
+    stats['listed'] += 1
+    return {'mtime': os.stat(path).st_mtime_ns, 'folders': sorted(folders, key=sort_key), 'files': files}
+
+def scan_tree(base, snapshot, force=False, depth=2):
+    """Scan base and its folders down to `depth` levels (projects and their sections)
+
+    A directory whose mtime matches the snapshot has had no entries added, removed or
+    renamed, so its previous listing is reused without touching its files. Files edited
+    in place are only picked up by a forced rescan.
+    """
+    stats = {'listed': 0, 'reused': 0, 'probed': 0}
+    directories = {}
+    pending = [(base, 0)]
+
+    while pending:
+        path, level = pending.pop()
+        previous = snapshot.get(path)
+
+        if not force and previous and previous['mtime'] == os.stat(path).st_mtime_ns:
+            listing = previous
+            stats['reused'] += 1
+            build_stats.count('scan.directories.hit')
+        else:
+            listing = scan_directory(path, previous, stats)
+            build_stats.count('scan.directories.miss')
+
+        directories[path] = listing
+        if level < depth:
+            pending.extend((f"{path}/{name}", level + 1) for name in listing['folders'])
+
+    return directories, stats
+
+def build_gallery_data(base, directories):
+    """Assemble gallery-data.json: projects -> sections -> sorted media paths, plus a media map"""
+    projects = {}
+    media = {}
+
+    def section_images(path):
+        images = []
+        for name in sorted(directories[path]['files'], key=sort_key):
+            record = directories[path]['files'][name]
+            image_path = f"{path}/{name}"
+            images.append(image_path)
+            media[image_path] = {key: record[key] for key in ('width', 'height', 'bytes') if key in record}
+        return {'images': images}
+
+    for project_name in directories[base]['folders']:
+        project_path = f"{base}/{project_name}"
+        section_names = directories[project_path]['folders']
+
+        # Projects without sub-folders get a single "main" section
+        if section_names:
+            sections = {name: section_images(f"{project_path}/{name}") for name in section_names}
+        else:
+            sections = {'main': section_images(project_path)}
+
+        projects[project_name] = {'sections': sections}
+
+    return {'projects': projects, 'media': media}
+
+def scan_gallery(force=False):
+    """Scan the gallery, write gallery-data.json if it changed and return the gallery data"""
+    if not os.path.isdir(GALLERY_BASE):
+        print("Creating images/gallery folder structure...")
+        for folder in EXAMPLE_FOLDERS:
+            os.makedirs(f"{GALLERY_BASE}/{folder}", exist_ok=True)
+        print("Created folder structure. Add your images and run this script again.")
+        return None
+
+    print("Scanning gallery directory...")
+    start_time = time.time()
+
+    directories, stats = scan_tree(GALLERY_BASE, load_snapshot(), force=force)
+    gallery_data = build_gallery_data(GALLERY_BASE, directories)
+
+    # Leave gallery-data.json untouched when nothing changed, so later stages see an unchanged input
+    try:
+        with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
+            changed = json.load(f) != gallery_data
+    except (OSError, ValueError):
+        changed = True
+
+    if changed:
+        write_json_atomic(OUTPUT_FILE, gallery_data, indent=2)
+    if stats['listed']:
+        write_json_atomic(SNAPSHOT_FILE, directories, indent=1, sort_keys=True)
+
+    elapsed = time.time() - start_time
+    print(f"✓ Gallery data {'generated' if changed else 'unchanged'}: {OUTPUT_FILE}")
+    print(f"  Found {len(gallery_data['media'])} media files (images + videos)")
+    print(f"  Listed {stats['listed']} directories, reused {stats['reused']} unchanged, "
+          f"probed {stats['probed']} files in {elapsed:.2f}s")
+    return gallery_data
+
+def main():
+    """Scan the gallery and write gallery-data.json"""
+    parser = argparse.ArgumentParser(description="Scan images/gallery and write gallery-data.json")
+    parser.add_argument('--force', action='store_true', help="list every directory and re-stat every file")
+    build_stats.add_arguments(parser)
+    args = parser.parse_args()
+    build_stats.start(args.stats, args.trace)
+
+    with build_stats.stage('scan'):
+        gallery_data = scan_gallery(args.force)
+    if gallery_data is not None:
+        print("  Run this script whenever you add/remove images or videos from the gallery.")
+    build_stats.finish()
+
+if __name__ == "__main__":
+    try:
+        main()
+    except OSError as e:
+        print(f"Error generating gallery data: {e}")
+        sys.exit(1)
@@ -3,12 +3,28 @@
 Mobile Carousel Generator
 Scans images/mobile-covers/ folders and generates carousel HTML for index.html
 Automatically detects image order based on filename numbering
+Also builds phone-width AVIF/WebP/JPEG renditions of every cover (for srcset), recorded in a
+manifest so unchanged covers are skipped and restored from the derivative cache when possible
 """
 
+import argparse
+import json
 import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import build_stats
+import derivative_cache
+import site_templates
+from gallery_media import is_media_file, source_fingerprint
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Carousels then point at the original covers
+    Image = None
+
 # Mobile covers base directory
 MOBILE_COVERS_BASE = "images/mobile-covers"
 
@@ -24,6 +40,25 @@ CATEGORIES = {
     "8-display": "DISPLAY"
 }
 
+# Renditions: <name>_thumb<width>.<format> for each width below the cover's own (plus the cover's
+# width, capped at the largest rung), in every format Pillow can encode; JPEG is the fallback
+RENDITION_WIDTHS = [360, 540, 720, 1080]
+RENDITION_FORMATS = {
+    'avif': ('AVIF', {'quality': 50, 'speed': 8}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+RENDITION_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+FALLBACK_WIDTH = 720  # <img src> for browsers without srcset: the largest JPEG up to this width
+MANIFEST_FILE = ".build-cache/carousels.json"
+
+# Slides are 50vw wide and 45vh tall with object-fit: cover (styles.css), so a portrait cover is
+# drawn at the larger of 50vw and 45vh times its aspect ratio. Carousels are hidden above the
+# breakpoint, where browsers only fetch the eager first slides, so the smallest rendition will do
+CAROUSEL_BREAKPOINT_PX = 768
+SLIDE_WIDTH_VW = 50
+SLIDE_HEIGHT_VH = 45
+
 def extract_title_from_filename(filename):
     """
     Extract title from filename like '1-pivotpoint.jpg' -> 'PIVOT POINT'
@@ -51,8 +86,8 @@ def scan_category_folder(category_path, category_key):
         print(f"  Warning: {category_path} not found")
         return images
 
-    # Get all jpg files and sort them naturally (1, 2, 3, not 1, 10, 2)
-    files = [f for f in os.listdir(category_path) if f.lower().endswith('.jpg')]
+    # Get all jpg files (not renditions) and sort them naturally (1, 2, 3, not 1, 10, 2)
+    files = [f for f in os.listdir(category_path) if is_media_file(f) and f.lower().endswith('.jpg')]
 
     # Natural sort by the number prefix
     def natural_sort_key(filename):
@@ -75,57 +110,218 @@ def scan_category_folder(category_path, category_key):
 
     return images
 
+def rendition_path(image_path, width, extension):
+    """Path of a cover rendition, e.g. 1-elle.jpg -> 1-elle_thumb540.webp"""
+    return f"{image_path.rsplit('.', 1)[0]}_thumb{width}.{extension}"
+
+def rendition_widths(source_width):
+    """Rendition widths for a cover; never upscaled, and always including the largest one it allows"""
+    largest = min(source_width, RENDITION_WIDTHS[-1])
+    return [width for width in RENDITION_WIDTHS if width < largest] + [largest]
+
+def available_formats():
+    """Rendition formats this Pillow build can encode (AVIF needs Pillow 11.3+)"""
+    formats = {}
+    for extension, (fmt, options) in RENDITION_FORMATS.items():
+        if extension == 'jpg' or features.check(extension):
+            formats[extension] = (fmt, options)
+        else:
+            print(f"  Warning: Pillow has no {fmt} support, skipping {extension} renditions")
+    return formats
+
+def create_renditions(image_path, formats):
+    """Encode a cover's renditions; returns (width, height, written paths) of the oriented cover"""
+    with Image.open(image_path) as img:
+        img = ImageOps.exif_transpose(img).convert('RGB')
+        source_width, source_height = img.size
+        written = []
+        for width in rendition_widths(source_width):
+            height = max(1, round(source_height * width / source_width))
+            resized = img if width == source_width else img.resize((width, height), Image.LANCZOS)
+            for extension, (fmt, options) in formats.items():
+                path = rendition_path(image_path, width, extension)
+                derivative_cache.detach(path)
+                resized.save(path, fmt, **options)
+                written.append(path)
+    return source_width, source_height, written
+
+def load_manifest(path=MANIFEST_FILE):
+    """Load the build manifest (cover path -> entry), or an empty one if there is none yet"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('sources', {})
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    """Write the build manifest atomically so an interrupted run never leaves it half-written"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'sources': manifest}, f, indent=1, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def rebuild_reason(entry, fingerprint, settings):
+    """Why a manifest entry no longer describes the renditions we want to build (None if it does)"""
+    if entry is None:
+        return 'new'
+    if entry.get('hash') != fingerprint['hash']:
+        return 'source changed'
+    if entry.get('encoder') != settings:
+        return 'encoder changed'
+    if not all(os.path.exists(path) for path in entry.get('outputs', [])):
+        return 'missing output'
+    return None
+
+def remove_output(path):
+    """Delete a rendition this script built earlier, if it is still there"""
+    if os.path.exists(path):
+        os.remove(path)
+
+def process_cover(image_path, entry, formats, settings, force):
+    """Bring one cover's renditions up to date; returns (manifest entry, built)"""
+    fingerprint = source_fingerprint(image_path, entry)
+    reason = 'forced' if force else rebuild_reason(entry, fingerprint, settings)
+    if reason is None:
+        build_stats.count('carousels.cache.hit')
+        return dict(entry, **fingerprint), False
+    build_stats.count('carousels.cache.miss')
+    build_stats.rebuild(image_path, reason)
+
+    base_path = image_path.rsplit('.', 1)[0]
+    key = derivative_cache.cache_key(fingerprint['hash'], 'carousel', settings)
+    meta = None if force else derivative_cache.restore(key, base_path)
+    if meta is not None:
+        outputs = [f"{base_path}{name}" for name in meta['files']]
+        width, height = meta['size']
+        built = False
+    else:
+        with build_stats.span(image_path, 'carousel') as details:
+            try:
+                width, height, outputs = create_renditions(image_path, formats)
+            except Exception as e:
+                print(f"  ✗ {image_path}: {e}")
+                return entry, False
+            details['bytes_written'] = sum(os.path.getsize(path) for path in outputs)
+            build_stats.count('bytes_written', details['bytes_written'])
+        derivative_cache.store(key, base_path, outputs, {'size': [width, height]})
+        built = True
+
+    # Renditions from an earlier build that this one no longer produces are stale
+    for path in set((entry or {}).get('outputs', [])) - set(outputs):
+        remove_output(path)
+
+    return dict(fingerprint, width=width, height=height, outputs=outputs, encoder=settings), built
+
+def build_renditions(images, workers=None, force=False):
+    """Bring every cover's renditions up to date and add their sizes and renditions to the images"""
+    if Image is None:
+        print("Warning: Pillow not found, carousels will use the original covers")
+        print("Install with: pip install Pillow")
+        return
+
+    start_time = time.time()
+    formats = available_formats()
+    settings = {'widths': RENDITION_WIDTHS, 'formats': {extension: options for extension, (_fmt, options) in formats.items()},
+                'resample': 'lanczos'}
+    manifest = load_manifest()
+    paths = [img['path'] for img in images]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or os.cpu_count() or 1)) as executor:
+        results = list(executor.map(lambda path: process_cover(path, manifest.get(path), formats, settings, force), paths))
+
+    built = 0
+    for img, (entry, was_built) in zip(images, results):
+        if entry is None:
+            continue
+        manifest[img['path']] = entry
+        built += was_built
+        img['width'], img['height'] = entry['width'], entry['height']
+        img['renditions'] = entry['outputs']
+
+    removed = 0
+    for image_path in sorted(set(manifest) - set(paths)):
+        for path in manifest.pop(image_path).get('outputs', []):
+            remove_output(path)
+        removed += 1
+
+    save_manifest(manifest)
+    derivative_cache.prune()
+    elapsed = time.time() - start_time
+    print(f"  Renditions: built {built}, up to date {len(paths) - built}, removed {removed} in {elapsed:.1f}s")
+
+def slide_sizes(img):
+    """sizes attribute for a slide: its drawn width on phones, and the smallest rendition on larger screens"""
+    height_vh = SLIDE_HEIGHT_VH * img['width'] / img['height']
+    return f"(max-width: {CAROUSEL_BREAKPOINT_PX}px) max({SLIDE_WIDTH_VW}vw, {height_vh:.4g}vh), 1px"
+
+def slide_image_html(img, first):
+    """<picture> (or plain <img> without renditions) for one slide; only the first slide loads eagerly"""
+    loading = 'loading="eager" fetchpriority="high"' if first else 'loading="lazy"'
+    if not img.get('renditions'):
+        return f'<img src="{img["path"]}" alt="{img["alt"]}" {loading} decoding="async">'
+
+    candidates = {}
+    for path in img['renditions']:
+        name, extension = path.rsplit('.', 1)
+        candidates.setdefault(extension, []).append((int(name.rsplit('_thumb', 1)[1]), path))
+    sizes = slide_sizes(img)
+
+    def srcset(extension):
+        return ', '.join(f"{path} {width}w" for width, path in sorted(candidates[extension]))
+
+    jpegs = sorted(candidates['jpg'])
+    fallback = ([path for width, path in jpegs if width <= FALLBACK_WIDTH] or [jpegs[0][1]])[-1]
+    html = '<picture>'
+    for extension, mime_type in RENDITION_TYPES.items():
+        if extension in candidates:
+            html += f'<source type="{mime_type}" srcset="{srcset(extension)}" sizes="{sizes}">'
+    html += (f'<img src="{fallback}" srcset="{srcset("jpg")}" sizes="{sizes}" width="{img["width"]}" '
+             f'height="{img["height"]}" alt="{img["alt"]}" {loading} decoding="async">')
+    return html + '</picture>'
+
 def generate_carousel_html(category_key, category_name, images):
     """
-    Generate HTML for a single carousel
+    Generate HTML for a single carousel (templates/carousel.html)
     """
     if not images:
         return ""
 
-    category_id = category_name.lower().replace(' ', '-')
-    first_title = images[0]['title']
-
-    html = f'    <!-- Mobile Carousel - {category_name} -->\n'
-    html += f'    <div class="mobile-carousel" data-category="{category_id}">\n'
-    html += '        <div class="carousel-track">\n'
-
-    for img in images:
-        html += f'            <div class="carousel-slide" data-title="{img["title"]}">\n'
-        html += f'                <img src="{img["path"]}" alt="{img["alt"]}">\n'
-        html += '            </div>\n'
-
-    html += '        </div>\n'
-    html += '        <div class="carousel-overlay">\n'
-    html += f'            <div class="carousel-category">{category_name}</div>\n'
-    html += f'            <div class="carousel-title" id="carousel-section-title-{category_id}">{first_title}</div>\n'
-    html += '        </div>\n'
-    html += '    </div>\n'
-
-    return html
+    slides = [{'title': img['title'], 'image': slide_image_html(img, index == 0)} for index, img in enumerate(images)]
+    return site_templates.render_string('carousel', {
+        'name': category_name,
+        'id': category_name.lower().replace(' ', '-'),
+        'first_title': images[0]['title'],
+        'slides': slides,
+    })
 
-def generate_all_carousels():
+def generate_all_carousels(workers=None, force=False):
     """
     Generate HTML for all carousels
     """
     print("Scanning mobile covers directory...")
 
-    all_carousels_html = ""
+    carousels = []
 
     for category_key in sorted(CATEGORIES.keys()):
         category_name = CATEGORIES[category_key]
         category_path = os.path.join(MOBILE_COVERS_BASE, category_key)
 
         print(f"  Processing {category_name}...")
-        images = scan_category_folder(category_path, category_key)
+        with build_stats.span(category_path, 'carousel') as details:
+            images = scan_category_folder(category_path, category_key)
+            details['images'] = len(images)
 
         if images:
             print(f"    Found {len(images)} images")
-            carousel_html = generate_carousel_html(category_key, category_name, images)
-            all_carousels_html += carousel_html + "\n"
+            carousels.append((category_key, category_name, images))
         else:
             print(f"    No images found")
 
-    return all_carousels_html
+    build_renditions([img for _key, _name, images in carousels for img in images], workers, force)
+
+    return ''.join(f"{generate_carousel_html(category_key, category_name, images)}\n"
+                   for category_key, category_name, images in carousels)
 
 def update_index_html(carousels_html):
     """
@@ -141,6 +337,7 @@ def update_index_html(carousels_html):
 
     with open(index_file, 'r', encoding='utf-8') as f:
         content = f.read()
+    build_stats.count('bytes_read', len(content.encode('utf-8')))
 
     # Find the carousels container section
     # Pattern: <!-- Mobile Carousels Container --> to </div> <!-- End mobile-carousels-container -->
@@ -155,9 +352,16 @@ def update_index_html(carousels_html):
     # Replace the carousel content
     new_content = content[:match.start(2)] + carousels_html + content[match.end(2):]
 
+    if new_content == content:
+        build_stats.count('index.cache.hit')
+        print(f"✓ {index_file} already up to date")
+        return True
+
     # Write back to file
+    build_stats.count('index.cache.miss')
     with open(index_file, 'w', encoding='utf-8') as f:
         f.write(new_content)
+    build_stats.count('bytes_written', len(new_content.encode('utf-8')))
 
     print(f"✓ Updated {index_file}")
     return True
@@ -166,24 +370,38 @@ def main():
     """
     Main function
     """
+    parser = argparse.ArgumentParser(description="Regenerate the mobile carousels in index.html")
+    parser.add_argument('--force', action='store_true', help="rebuild all renditions, ignoring the manifest and cache")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="renditions encoded at once (default: number of CPU cores)")
+    build_stats.add_arguments(parser)
+    args = parser.parse_args()
+    build_stats.start(args.stats, args.trace)
+
     print("Mobile Carousel Generator")
     print("=" * 50)
 
     # Generate carousel HTML
-    carousels_html = generate_all_carousels()
+    with build_stats.stage('carousels.scan'):
+        carousels_html = generate_all_carousels(args.workers, args.force)
 
     if not carousels_html:
         print("\nNo carousels generated. Check your mobile-covers directory.")
+        build_stats.finish()
         return
 
     # Update index.html
-    if update_index_html(carousels_html):
+    with build_stats.stage('carousels.write'):
+        updated = update_index_html(carousels_html)
+
+    if updated:
         print("\n" + "=" * 50)
         print("✓ Mobile carousels regenerated successfully!")
         print("\nThe carousels in index.html have been updated to match")
         print("the current files and order in images/mobile-covers/")
     else:
         print("\n✗ Failed to update index.html")
+    build_stats.finish()
 
 if __name__ == '__main__':
     main()
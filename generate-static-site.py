@@ -2,12 +2,27 @@
 """
 Static Site Generator for Portfolio
 Generates static HTML files for each project page with pre-calculated layouts
-Uses text-content.json for all text descriptions
+Uses text-content.json for all text descriptions and the templates in templates/ for markup
+Also inlines the homepage cover manifest (a small pool of cover thumbnails per project) into index.html
 """
 
+import argparse
+import hashlib
 import json
+import multiprocessing
 import os
+import random
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from urllib.parse import quote
+
+import build_stats
+import gallery_media
+import media_rules
+import site_templates
+from gallery_media import probe_dimensions
 
 # Load text content from external file
 def load_text_content():
@@ -16,6 +31,9 @@ def load_text_content():
 
 TEXT_CONTENT = load_text_content()
 
+# Per-item media behavior (media-rules.json), compiled once into a matcher
+MEDIA_RULES = media_rules.load_matcher()
+
 # Project metadata (gallery keys and category names)
 PROJECTS = {
     'brands': {
@@ -52,6 +70,15 @@ PROJECTS = {
     }
 }
 
+# Homepage covers: each project's cover rotates through a pool of its thumbnails, listed in a
+# manifest inlined into index.html. Projects listed here rotate through these gallery images
+# (curated); the others get a random pool, stable from build to build while the gallery is unchanged
+HOMEPAGE_COVERS = {}
+COVER_POOL_SIZE = 8
+COVER_THUMBNAIL_SUFFIX = '_thumb.jpg'
+HOMEPAGE_FILE = 'index.html'
+COVER_MANIFEST_ID = 'homepage-covers'
+
 # Section configurations
 SECTION_CONFIGS = {
     'brands': {},
@@ -75,11 +102,132 @@ SECTION_CONFIGS = {
     }
 }
 
-def get_image_size(image_path, is_last_in_section=False):
-    """Get image dimensions from thumbnail using sips"""
-    import subprocess
-    import re
-
+# How sections are split into rows: 'greedy' fills each row until the next image no longer fits,
+# 'optimal' minimizes how far row heights stray from the target over the whole section.
+# A section can pick its own mode with 'layoutMode' in SECTION_CONFIGS
+DEFAULT_LAYOUT_MODE = 'greedy'
+
+# Optimal mode: rows shorter than this fraction of the target height are not considered
+# (once a row holds at least 2 x min_images_per_row - 1 images), which keeps the search linear
+OPTIMAL_MIN_HEIGHT_RATIO = 0.5
+
+# Container widths the gallery layout is precomputed for. The first is the fixed-pixel desktop
+# layout; the others switch in through media queries when the content column gets narrower
+LAYOUT_BREAKPOINTS = [1000, 768, 360]
+DESKTOP_CHROME_WIDTH = 410  # Sidebar (250px) plus main content padding (2 x 80px)
+MOBILE_MAX_WIDTH = 768  # At and below this viewport width the gallery is a single column
+
+# Responsive derivatives built by generate-thumbnails.py (<name>_thumb<width>.<ext>), best format first.
+# Only the files that exist on disk end up in srcset, so a partial ladder degrades gracefully
+RESPONSIVE_WIDTHS = [320, 480, 600, 800, 1000, 1600]
+RESPONSIVE_FORMATS = [('avif', 'image/avif'), ('webp', 'image/webp')]
+
+# Screen-sized lightbox renditions built by generate-thumbnails.py (<name>_thumb_lightbox<edge>.<ext>),
+# best format first; JPEG is the fallback and replaces the original as the lightbox image.
+# Images without them (smaller than every edge) still open the original
+LIGHTBOX_EDGES = [1600, 2400]
+LIGHTBOX_SUFFIX = '_thumb_lightbox'
+LIGHTBOX_FORMATS = [('avif', 'image/avif'), ('webp', 'image/webp'), ('jpg', 'image/jpeg')]
+LIGHTBOX_MAX_HEIGHT_VH = 90  # The lightbox image is at most 90vh tall (project-styles.css)
+
+# Video renditions built by generate-videos.py (<name>_thumb1000.<extension>), best first;
+# the original MP4 stays as the last <source>. Videos that autoplay in the grid play the
+# short silent preview loop instead, and animated GIFs with renditions play as muted loops
+VIDEO_RENDITION_WIDTH = 1000
+VIDEO_RENDITIONS = [('av1.mp4', 'video/mp4; codecs=av01.0.05M.08'), ('webm', 'video/webm; codecs=vp9'), ('mp4', 'video/mp4')]
+VIDEO_PREVIEW_SUFFIX = '_thumbpreview.mp4'
+
+# On mobile the gallery collapses to a single full-width column
+MOBILE_SIZES = '(max-width: 768px) 100vw'
+
+# Image dimensions are cached on disk, keyed by path and invalidated by mtime/size
+DIMENSION_CACHE_FILE = '.build-cache/dimensions.json'
+
+# Files whose dimensions could not be read; they are reported and left out of the layout
+UNREADABLE_FILES = []
+
+# Dimension cache entries probed during this run (sent back to the main process by page workers)
+DIMENSION_CACHE_UPDATES = {}
+
+# Per-page dependency record, used to skip pages whose inputs have not changed
+PAGE_MANIFEST_FILE = '.build-cache/pages.json'
+
+# Per-project lightbox data, fetched by lightbox.js the first time a lightbox opens
+LIGHTBOX_DATA_DIR = 'lightbox-data'
+
+# Rows behind each section's "See more" button, fetched when the button is clicked
+FRAGMENTS_DIR = 'fragments'
+
+# Files written (or confirmed up to date) for the page being generated
+GENERATED_FILES = []
+
+# Thumbnail manifest written by generate-thumbnails.py; its entries carry each image's
+# placeholder (dominant color and a tiny blurred preview), shown until the thumbnail loads
+THUMBNAIL_MANIFEST_FILE = '.build-cache/thumbnails.json'
+
+def load_placeholders():
+    """Placeholders by source image path (empty until generate-thumbnails.py has run)"""
+    try:
+        with open(THUMBNAIL_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            sources = json.load(f).get('sources', {})
+    except (OSError, ValueError):
+        return {}
+    return {path: entry['placeholder'] for path, entry in sources.items() if 'placeholder' in entry}
+
+PLACEHOLDERS = load_placeholders()
+
+def load_dimension_cache():
+    """Load cached dimensions from disk"""
+    try:
+        with open(DIMENSION_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_dimension_cache():
+    """Write the dimension cache atomically (build.py's pages and covers stages may both save at once)"""
+    os.makedirs(os.path.dirname(DIMENSION_CACHE_FILE), exist_ok=True)
+    tmp_path = f"{DIMENSION_CACHE_FILE}.tmp"
+    with DIMENSION_CACHE_LOCK:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(DIMENSION_CACHE), f, indent=1, sort_keys=True, ensure_ascii=False)
+        os.replace(tmp_path, DIMENSION_CACHE_FILE)
+
+DIMENSION_CACHE = load_dimension_cache()
+DIMENSION_CACHE_LOCK = threading.Lock()
+
+def get_cached_dimensions(path):
+    """Get dimensions for a file, probing its header only when the cache entry is stale"""
+    stat = os.stat(path)
+    entry = DIMENSION_CACHE.get(path)
+
+    if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+        build_stats.count('dimensions.cache.hit')
+        return (entry['width'], entry['height'])
+
+    build_stats.count('dimensions.cache.miss')
+    size = probe_dimensions(path)
+    if size:
+        DIMENSION_CACHE[path] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size,
+                                 'width': size[0], 'height': size[1]}
+        DIMENSION_CACHE_UPDATES[path] = DIMENSION_CACHE[path]
+    return size
+
+def uses_large_thumbnail(index, image_count, section_options):
+    """Whether an entry is measured (and shown) with its 1000px thumbnail
+
+    That is the first item of a custom layout, or otherwise the last image of the section.
+    """
+    if section_options.get('customLayout', False):
+        return index == 0
+    return index == image_count - 1
+
+def get_image_size(image_path, is_last_in_section=False, media=None):
+    """Get image dimensions from thumbnail (or the original), or None if neither can be read
+
+    media is the gallery-data.json "media" map; when it already records the original's
+    size, the original is not probed.
+    """
     # Use thumbnail for dimensions
     base_path = image_path.rsplit('.', 1)[0]
     # Use higher quality thumbnail (1000px) for last image in section
@@ -87,148 +235,228 @@ def get_image_size(image_path, is_last_in_section=False):
     thumb_path = f"{base_path}{thumbnail_suffix}"
 
     # Try thumbnail first, then original
-    for path in [thumb_path, image_path]:
-        if os.path.exists(path):
-            try:
-                result = subprocess.run(['sips', '-g', 'pixelWidth', '-g', 'pixelHeight', path],
-                                       capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    # Parse output: "pixelWidth: 1234"
-                    width_match = re.search(r'pixelWidth:\s+(\d+)', result.stdout)
-                    height_match = re.search(r'pixelHeight:\s+(\d+)', result.stdout)
-                    if width_match and height_match:
-                        return (int(width_match.group(1)), int(height_match.group(1)))
-            except Exception as e:
-                print(f"  Warning: Could not get size for {path}: {e}")
-                pass
-
-    # Default dimensions if we can't get actual size
-    return (1200, 800)
+    if os.path.exists(thumb_path):
+        size = get_cached_dimensions(thumb_path)
+        if size:
+            return size
 
-def create_bin_packed_layout(images, container_width=1000, target_row_height=300, gap=10, min_images_per_row=3, section_options=None):
-    """Create bin-packed layout from images"""
+    scanned = (media or {}).get(image_path, {})
+    if scanned.get('width') and scanned.get('height'):
+        return (scanned['width'], scanned['height'])
+
+    if os.path.exists(image_path):
+        return get_cached_dimensions(image_path)
+
+    return None
+
+def greedy_row_breaks(scaled_widths, start, container_widths, gap, min_images_per_row):
+    """Split scaled_widths[start:] into rows for several container widths in one pass
+
+    Returns {container_width: [row_length, ...]}. Every width is packed with the same
+    greedy rule (and the same float accumulation order) the layout has always used.
+    """
+    # Per-width packing state: [finished row lengths, images in current row, current row width]
+    states = {width: [[], 0, 0] for width in container_widths}
+
+    for scaled_width in scaled_widths[start:]:
+        for container_width, state in states.items():
+            row_lengths, count, row_width = state
+
+            if count < min_images_per_row or row_width + scaled_width + (count * gap) <= container_width:
+                state[1] = count + 1
+                state[2] = row_width + scaled_width
+            else:
+                if count:
+                    row_lengths.append(count)
+                state[1] = 1
+                state[2] = scaled_width
+
+    for row_lengths, count, _row_width in states.values():
+        if count:
+            row_lengths.append(count)
+
+    return {width: state[0] for width, state in states.items()}
+
+def optimal_row_breaks(scaled_widths, start, container_widths, gap, min_images_per_row, target_row_height):
+    """Split scaled_widths[start:] into rows that stay as close as possible to the target height
+
+    Dynamic programming over row end positions (Knuth-Plass style): a row's cost is the squared
+    relative difference between its justified height and the target, and the partition with
+    the lowest total cost wins. Every row holds at least min_images_per_row images. Candidate
+    rows stop growing once they get much shorter than the target, so each section is solved
+    in roughly linear time. Returns {container_width: [row_length, ...]}.
+    """
+    widths = scaled_widths[start:]
+    count = len(widths)
+
+    # Too few images to split: one row, same as the greedy packer
+    if count <= min_images_per_row:
+        return {width: [count] if count else [] for width in container_widths}
+
+    prefix = [0]
+    for scaled_width in widths:
+        prefix.append(prefix[-1] + scaled_width)
+
+    # Rows of min..2*min-1 images can always tile the remainder, so those lengths are always tried
+    always_allowed = 2 * min_images_per_row - 1
+    breaks = {}
+
+    for container_width in container_widths:
+        costs = [0.0] + [float('inf')] * count
+        previous = [0] * (count + 1)
+
+        for row_start in range(count):
+            if costs[row_start] == float('inf'):
+                continue
+
+            row_length = min_images_per_row
+            while row_start + row_length <= count:
+                row_end = row_start + row_length
+                available_width = container_width - (row_length - 1) * gap
+                row_height = target_row_height * available_width / (prefix[row_end] - prefix[row_start])
+
+                if row_length > always_allowed and row_height < target_row_height * OPTIMAL_MIN_HEIGHT_RATIO:
+                    break
+
+                cost = costs[row_start] + ((row_height - target_row_height) / target_row_height) ** 2
+                if cost < costs[row_end]:
+                    costs[row_end] = cost
+                    previous[row_end] = row_start
+
+                row_length += 1
+
+        # Walk the cheapest path back from the last image
+        row_lengths = []
+        row_end = count
+        while row_end > 0:
+            row_lengths.append(row_end - previous[row_end])
+            row_end = previous[row_end]
+
+        breaks[container_width] = row_lengths[::-1]
+
+    return breaks
+
+def plan_rows(images, scaled_widths, container_widths, gap=10, min_images_per_row=3, section_options=None,
+              target_row_height=300):
+    """Decide how many images go in each row, for several container widths at once
+
+    Section overrides (customLayout rows, firstRowImageCount, firstImageLarge) fix the
+    first rows regardless of width; the remaining images are packed greedily per width.
+    Returns {container_width: [row_length, ...]}.
+    """
     section_options = section_options or {}
-    rows = []
-    current_row = []
+    fixed_rows = []
     image_index = 0
 
     # Handle custom layout (e.g., leaky people section)
     if section_options.get('customLayout') and section_options.get('rows'):
-        custom_rows = section_options['rows']
-
-        for row_config in custom_rows:
+        for row_config in section_options['rows']:
             if image_index >= len(images):
                 break
 
-            row_count = row_config.get('count', 1)
-            is_full_width = row_config.get('fullWidth', False)
-            current_row = []
-
-            for i in range(row_count):
-                if image_index < len(images):
-                    img = images[image_index]
-                    aspect_ratio = img['width'] / img['height']
-                    scaled_width = target_row_height * aspect_ratio
-                    img['scaledWidth'] = scaled_width
-                    current_row.append(img)
-                    image_index += 1
-
-            if current_row:
-                rows.append(normalize_row(current_row, container_width, target_row_height, gap))
-
-        # Process any remaining images with normal bin packing
-        current_row = []
-        current_row_width = 0
-        for i in range(image_index, len(images)):
-            img = images[i]
-            aspect_ratio = img['width'] / img['height']
-            scaled_width = target_row_height * aspect_ratio
-            img['scaledWidth'] = scaled_width
-
-            if len(current_row) < min_images_per_row:
-                current_row.append(img)
-                current_row_width += scaled_width
-            elif current_row_width + scaled_width + (len(current_row) * gap) <= container_width:
-                current_row.append(img)
-                current_row_width += scaled_width
-            else:
-                if current_row:
-                    rows.append(normalize_row(current_row, container_width, target_row_height, gap))
-                current_row = [img]
-                current_row_width = scaled_width
-
-        if current_row:
-            rows.append(normalize_row(current_row, container_width, target_row_height, gap))
-
-        return rows
+            row_count = min(row_config.get('count', 1), len(images) - image_index)
+            fixed_rows.append(row_count)
+            image_index += row_count
 
     # Handle first row with custom image count
-    if section_options.get('firstRowImageCount') and len(images) >= section_options['firstRowImageCount']:
+    elif section_options.get('firstRowImageCount') and len(images) >= section_options['firstRowImageCount']:
         first_row_count = section_options['firstRowImageCount']
-        first_image_large = section_options.get('firstImageLarge', False)
 
-        # If firstImageLarge, separate videos from first image row
-        if first_image_large:
-            # First, render all videos in their own rows
+        if section_options.get('firstImageLarge', False):
+            # Videos first, each in its own row, then the first non-video image(s) in one row
             while image_index < len(images) and images[image_index].get('isVideo'):
-                img = images[image_index]
-                aspect_ratio = img['width'] / img['height']
-                scaled_width = target_row_height * aspect_ratio
-                img['scaledWidth'] = scaled_width
-                rows.append(normalize_row([img], container_width, target_row_height, gap))
+                fixed_rows.append(1)
                 image_index += 1
 
-            # Then render first non-video image(s) in full width row
-            for i in range(first_row_count):
-                if image_index + i < len(images):
-                    img = images[image_index + i]
-                    aspect_ratio = img['width'] / img['height']
-                    scaled_width = target_row_height * aspect_ratio
-                    img['scaledWidth'] = scaled_width
-                    current_row.append(img)
-
-            if current_row:
-                rows.append(normalize_row(current_row, container_width, target_row_height, gap))
-                current_row = []
+            row_count = min(first_row_count, len(images) - image_index)
+            if row_count:
+                fixed_rows.append(row_count)
                 image_index += first_row_count
         else:
             # Original behavior - include all items in first row
-            for i in range(min(first_row_count, len(images))):
-                img = images[i]
-                aspect_ratio = img['width'] / img['height']
-                scaled_width = target_row_height * aspect_ratio
-                img['scaledWidth'] = scaled_width
-                current_row.append(img)
-
-            rows.append(normalize_row(current_row, container_width, target_row_height, gap))
-            current_row = []
+            fixed_rows.append(min(first_row_count, len(images)))
             image_index = first_row_count
 
-    # Process remaining images
-    current_row_width = 0
-    for i in range(image_index, len(images)):
-        img = images[i]
+    if section_options.get('layoutMode', DEFAULT_LAYOUT_MODE) == 'optimal':
+        breaks = optimal_row_breaks(scaled_widths, image_index, container_widths, gap, min_images_per_row,
+                                    target_row_height)
+    else:
+        breaks = greedy_row_breaks(scaled_widths, image_index, container_widths, gap, min_images_per_row)
+    return {width: fixed_rows + row_lengths for width, row_lengths in breaks.items()}
+
+def scale_images(images, target_row_height):
+    """Width of every image when scaled to the target row height (also stored as scaledWidth)"""
+    scaled_widths = []
+    for img in images:
         aspect_ratio = img['width'] / img['height']
-        scaled_width = target_row_height * aspect_ratio
-        img['scaledWidth'] = scaled_width
-
-        if len(current_row) < min_images_per_row:
-            current_row.append(img)
-            current_row_width += scaled_width
-        elif current_row_width + scaled_width + (len(current_row) * gap) <= container_width:
-            current_row.append(img)
-            current_row_width += scaled_width
-        else:
-            if current_row:
-                rows.append(normalize_row(current_row, container_width, target_row_height, gap))
-            current_row = [img]
-            current_row_width = scaled_width
+        img['scaledWidth'] = target_row_height * aspect_ratio
+        scaled_widths.append(img['scaledWidth'])
+    return scaled_widths
+
+def create_bin_packed_layout(images, container_width=1000, target_row_height=300, gap=10, min_images_per_row=3, section_options=None):
+    """Create bin-packed layout from images"""
+    scaled_widths = scale_images(images, target_row_height)
+    row_lengths = plan_rows(images, scaled_widths, [container_width], gap, min_images_per_row,
+                            section_options, target_row_height)[container_width]
 
-    if current_row:
-        rows.append(normalize_row(current_row, container_width, target_row_height, gap))
+    rows = []
+    image_index = 0
+    for row_length in row_lengths:
+        rows.append(normalize_row(images[image_index:image_index + row_length], container_width, target_row_height, gap))
+        image_index += row_length
 
     return rows
 
+def create_responsive_layouts(images, container_widths, target_row_height=300, gap=10, min_images_per_row=3, section_options=None):
+    """Precompute fluid row layouts for narrower containers
+
+    Returns {image index: {container_width: (percent, px)}}: inside that breakpoint the image
+    is calc(percent% - px) wide, so each row exactly fills whatever width the container has.
+    """
+    scaled_widths = scale_images(images, target_row_height)
+    plans = plan_rows(images, scaled_widths, container_widths, gap, min_images_per_row, section_options,
+                      target_row_height)
+    item_widths = {img['index']: {} for img in images}
+
+    for container_width, row_lengths in plans.items():
+        image_index = 0
+        for row_length in row_lengths:
+            row_scaled = scaled_widths[image_index:image_index + row_length]
+            total_width = sum(row_scaled)
+            # Keep each row half a pixel short so rounding can never push an image onto the next line
+            slack = 0.5 / row_length
+
+            for img, scaled_width in zip(images[image_index:image_index + row_length], row_scaled):
+                share = scaled_width / total_width
+                item_widths[img['index']][container_width] = (share * 100, share * (row_length - 1) * gap + slack)
+
+            image_index += row_length
+
+    return item_widths
+
+def responsive_layout_css(breakpoints, gap=10):
+    """Media queries that switch the gallery to the precomputed layout for each narrower container"""
+    primary_width, *narrower = breakpoints
+    css = []
+    upper_width = primary_width
+
+    for index, container_width in enumerate(narrower):
+        max_viewport = upper_width + DESKTOP_CHROME_WIDTH - 1
+        rules = f'.gallery-image-wrapper {{ width: var(--w-{container_width}) !important; }}'
+
+        if index == 0:
+            # Rows become flex line breaks, so the per-breakpoint widths decide where rows end
+            rules = (f'.bin-packed-layout {{ display: flex; flex-wrap: wrap; gap: {gap}px; }} '
+                     f'.bin-packed-row:not(.hidden-row) {{ display: contents; }} '
+                     f'.gallery-image-wrapper {{ width: var(--w-{container_width}) !important; margin-right: 0 !important; }} '
+                     f'.gallery-image-wrapper img, .gallery-image-wrapper video '
+                     f'{{ width: 100% !important; height: auto !important; aspect-ratio: var(--ar); }}')
+
+        css.append(f'@media (min-width: {MOBILE_MAX_WIDTH + 1}px) and (max-width: {max_viewport}px) {{ {rules} }}')
+        upper_width = container_width
+
+    return '\n        '.join(css)
+
 def normalize_row(row, container_width, target_row_height, gap):
     """Normalize row to fit container width"""
     total_gap = (len(row) - 1) * gap
@@ -245,85 +473,295 @@ def normalize_row(row, container_width, target_row_height, gap):
 
     return normalized_row
 
-def render_gallery_html(rows, gap=10, section_id='', is_animation_project=False, section_options=None):
-    """Render gallery HTML from layout rows"""
+def render_picture_sources(image_path, rendered_width):
+    """Build <source> elements for the responsive derivatives of an image ('' if there are none)"""
+    sizes = f'{MOBILE_SIZES}, {round(rendered_width)}px'
+    sources = []
+
+    for ext, mime_type in RESPONSIVE_FORMATS:
+        # srcset is whitespace/comma separated, so file names with spaces must be URL-encoded
+        candidates = [f'{quote(f"{image_path}_thumb{width}.{ext}")} {width}w' for width in RESPONSIVE_WIDTHS
+                      if os.path.exists(f'{image_path}_thumb{width}.{ext}')]
+        if candidates:
+            sources.append(f'<source type="{mime_type}" srcset="{", ".join(candidates)}" sizes="{sizes}">')
+
+    return ''.join(sources)
+
+def lightbox_renditions(src, aspect_ratio):
+    """Lightbox renditions built for an image as [(type, [(path, width), ...]), ...], best first
+
+    Empty unless the JPEG fallback exists, since that is what the lightbox's <img> shows.
+    """
+    base_path = src.rsplit('.', 1)[0]
+    renditions = []
+    for ext, mime_type in LIGHTBOX_FORMATS:
+        candidates = [(f"{base_path}{LIGHTBOX_SUFFIX}{edge}.{ext}", edge if aspect_ratio >= 1 else max(1, round(edge * aspect_ratio)))
+                      for edge in LIGHTBOX_EDGES if os.path.exists(f"{base_path}{LIGHTBOX_SUFFIX}{edge}.{ext}")]
+        if candidates:
+            renditions.append((mime_type, candidates))
+    return renditions if renditions and renditions[-1][0] == 'image/jpeg' else []
+
+def full_size_src(img):
+    """What the lightbox shows for an image: its largest JPEG lightbox rendition, or the original"""
+    renditions = img.get('lightbox')
+    return renditions[-1][1][-1][0] if renditions else img['src']
+
+def video_renditions(src):
+    """(path, type) of the web renditions generate-videos.py built for a video or animated GIF, best first"""
+    base_path = src.rsplit('.', 1)[0]
+    return [(f"{base_path}_thumb{VIDEO_RENDITION_WIDTH}.{ext}", mime_type) for ext, mime_type in VIDEO_RENDITIONS
+            if os.path.exists(f"{base_path}_thumb{VIDEO_RENDITION_WIDTH}.{ext}")]
+
+def render_video_sources(video_src, autoplay=False):
+    """Build the <source> elements of a gallery video: preview loop or web renditions, then the original MP4"""
+    video_path = video_src.rsplit('.', 1)[0]
+    if autoplay and os.path.exists(f"{video_path}{VIDEO_PREVIEW_SUFFIX}"):
+        candidates = [(f"{video_path}{VIDEO_PREVIEW_SUFFIX}", 'video/mp4')]
+    else:
+        candidates = video_renditions(video_src)
+    if video_src.lower().endswith('.mp4'):
+        candidates.append((video_src, 'video/mp4'))
+
+    return '\n                    '.join(f'<source src="{path}" type="{mime_type}">' for path, mime_type in candidates)
+
+def visible_row_count(rows, section_options=None):
+    """Number of rows shown before the "See more" button"""
+    section_options = section_options or {}
+    return len(rows) if section_options.get('showAllRows') else 3
+
+def placeholder_style(img):
+    """Inline background showing the image's placeholder while the thumbnail loads"""
+    placeholder = img.get('placeholder')
+    if not placeholder:
+        return ''
+    return f' background: {placeholder["color"]} url({placeholder["lqip"]}) center / cover no-repeat;'
+
+def responsive_style(img, item_widths):
+    """Inline CSS variables carrying an image's precomputed breakpoint widths and aspect ratio"""
+    widths = item_widths.get(img['index'], {})
+    variables = [f'--w-{width}: calc({percent:.4f}% - {px:.3f}px);' for width, (percent, px) in widths.items()]
+    if variables:
+        variables.append(f'--ar: {img["width"] / img["height"]:.5f};')
+    return ' '.join(variables)
+
+def render_gallery_html(rows, gap=10, section_id='', section_options=None, item_widths=None, fragment_url=None):
+    """Render gallery HTML from layout rows
+
+    With fragment_url, the rows behind "See more" are left out of the page and the
+    button loads them from that URL instead.
+    """
     section_options = section_options or {}
-    visible_rows = len(rows) if section_options.get('showAllRows') else 3
+    visible_rows = visible_row_count(rows, section_options)
 
-    html = '<div class="bin-packed-layout">\n'
+    chunks = ['<div class="bin-packed-layout">\n']
 
     for row_index, row in enumerate(rows):
         is_hidden = row_index >= visible_rows and len(rows) > visible_rows
-        hidden_class = ' hidden-row' if is_hidden else ''
-        html += f'<div class="bin-packed-row{hidden_class}" style="margin-bottom: {gap}px;" data-section="{section_id}">\n'
-
-        for img_index, img in enumerate(row):
-            is_video = img['src'].lower().endswith('.mp4')
-
-            # Check for specific video types
-            is_pivot_point_video = '3-pivotpoint' in img['src'] and ('5-PP-sm_blue.mp4' in img['src'] or '8a-PP-sm_pink2.mp4' in img['src'])
-            is_ost_video = '1-OST' in img['src'] and '1c-Untitled_Artwork 2.mp4' in img['src']
-            is_monster_bow_video = '3-monster-bow' in img['src'] and is_video
-
-            animation_class = ' animation-video' if (is_animation_project or is_pivot_point_video or is_ost_video or is_monster_bow_video) else ''
-            # Only add autoplay for Pivot Point and Monster Bow (not animation page)
-            autoplay_attr = ' autoplay' if ((is_pivot_point_video or is_monster_bow_video) and not is_animation_project) else ''
-
-            margin_right = gap if img_index < len(row) - 1 else 0
-
-            if is_video:
-                video_path = img['src'].rsplit('.', 1)[0]
-                # Use 1000px thumbnail for first video item (if configured)
-                poster_suffix = '_thumb1000.jpg' if img.get('isFirstItemInSection') else '_thumb.jpg'
-                poster_path = f"{video_path}{poster_suffix}"
-                media_element = f'''<video poster="{poster_path}" style="width: {img["width"]}px; height: {img["height"]}px; object-fit: cover; display: block;" muted loop playsinline{autoplay_attr} data-has-audio="false" preload="metadata">
-                    <source src="{img["src"]}" type="video/mp4">
-                    Your browser does not support the video tag.
-                </video>'''
-            else:
-                image_path = img['src'].rsplit('.', 1)[0]
-                # Use 1000px thumbnail for last image
-                thumbnail_suffix = '_thumb1000.jpg' if img.get('isLastInSection') else '_thumb.jpg'
-                thumbnail_path = f"{image_path}{thumbnail_suffix}"
-                media_element = f'<img src="{thumbnail_path}" data-full-src="{img["src"]}" alt="{img.get("alt", "")}" style="width: {img["width"]}px; height: {img["height"]}px; object-fit: cover; display: block;" loading="lazy">'
-
-            overlay_html = ''
-            if not (is_animation_project or is_pivot_point_video or is_ost_video or is_monster_bow_video) or not is_video:
-                overlay_html = f'''<div class="gallery-image-overlay">
-                    <div class="gallery-image-description">{img.get("description", img.get("alt", ""))}</div>
-                </div>'''
-
-            sound_button_html = ''
-            needs_inverted = '0-effect_match_olenakovtash' in img['src'] or '3-neveralone_nocopyright' in img['src'] or 'LeakyPeople_final_low' in img['src']
-            inverted_class = ' inverted' if needs_inverted else ''
-            is_testarossa_video = 'testarossa-winery' in img['src']
-
-            if (is_animation_project or is_pivot_point_video or is_ost_video or is_monster_bow_video) and is_video and not is_testarossa_video:
-                sound_button_html = f'''<button class="sound-toggle-btn{inverted_class}" data-muted="true" style="display: none;">
-                    <svg width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                        <path d="M11 5L6 9H2v6h4l5 4V5z"/>
-                        <path class="sound-on-indicator" d="M15.54 8.46a5 5 0 0 1 0 7.07" stroke-width="2"/>
-                        <path class="sound-on-indicator" d="M19.07 4.93a10 10 0 0 1 0 14.14" stroke-width="2"/>
-                        <line class="sound-off-indicator" x1="23" y1="9" x2="17" y2="15" stroke-width="2"/>
-                        <line class="sound-off-indicator" x1="17" y1="9" x2="23" y2="15" stroke-width="2"/>
-                    </svg>
-                </button>'''
-
-            html += f'''<div class="gallery-image-wrapper{animation_class}" style="margin-right: {margin_right}px; cursor: pointer;" data-index="{img["index"]}">
-                {media_element}
-                {overlay_html}
-                {sound_button_html}
-            </div>\n'''
-
-        html += '</div>\n'
-
-    html += '</div>\n'
+        if is_hidden and fragment_url:
+            break
+        chunks.append(render_row(row, gap=gap, section_id=section_id, item_widths=item_widths, hidden=is_hidden))
+
+    chunks.append('</div>\n')
 
     # Add "See more" button if needed
     if len(rows) > visible_rows:
-        html += f'<div class="see-more-container"><button class="see-more-btn" data-section="{section_id}">See more</button></div>\n'
+        fragment_attr = f' data-fragment="{fragment_url}"' if fragment_url else ''
+        chunks.append(f'<div class="see-more-container"><button class="see-more-btn" data-section="{section_id}"{fragment_attr}>See more</button></div>\n')
+
+    return ''.join(chunks)
+
+def render_row(row, gap=10, section_id='', item_widths=None, hidden=False):
+    """Render one layout row (templates/gallery-row.html)"""
+    item_widths = item_widths or {}
+    items = [gallery_item(img, gap if img_index < len(row) - 1 else 0, item_widths)
+             for img_index, img in enumerate(row)]
+    return site_templates.render_string('gallery-row', {'hidden_class': ' hidden-row' if hidden else '', 'gap': gap,
+                                                        'section_id': section_id, 'items': items})
+
+def mobile_attributes(flags):
+    """Wrapper data attributes telling mobile-animation-play.js how a video plays on phones"""
+    if not flags['mobileInline']:
+        playback = 'button'
+    else:
+        playback = 'autoplay' if flags['autoplay'] else 'inline'
+    attributes = f' data-mobile-playback="{playback}"'
+    if flags['mobileInline'] and flags['mobileSound']:
+        attributes += f' data-mobile-sound="{flags["mobileSound"]}"'
+    return attributes
+
+def gallery_item(img, margin_right, item_widths):
+    """Template context for one gallery item (templates/gallery-item.html)"""
+    is_video = img['src'].lower().endswith('.mp4')
+    flags = img['flags']
+
+    animation_class = ' animation-video' if flags['animation'] else ''
+    autoplay_attr = ' autoplay' if flags['autoplay'] else ''
+
+    if is_video:
+        video_path = img['src'].rsplit('.', 1)[0]
+        # Use 1000px thumbnail for first video item (if configured)
+        poster_suffix = '_thumb1000.jpg' if img.get('isFirstItemInSection') else '_thumb.jpg'
+        poster_path = f"{video_path}{poster_suffix}"
+        media_element = f'''<video poster="{poster_path}" style="width: {img["width"]}px; height: {img["height"]}px; object-fit: cover; display: block;" muted loop playsinline{autoplay_attr} data-has-audio="false" preload="metadata">
+                    {render_video_sources(img["src"], autoplay=bool(autoplay_attr))}
+                    Your browser does not support the video tag.
+                </video>'''
+    elif img.get('isGifLoop'):
+        # Animated GIF: its looping video renditions, with the GIF itself only as a fallback
+        poster_path = f"{img['src'].rsplit('.', 1)[0]}{'_thumb1000.jpg' if img.get('isLastInSection') else '_thumb.jpg'}"
+        media_element = f'''<video poster="{poster_path}" data-gif-src="{img["src"]}" style="width: {img["width"]}px; height: {img["height"]}px; object-fit: cover; display: block;" autoplay muted loop playsinline preload="auto">
+                    {render_video_sources(img["src"])}
+                    <img src="{img["src"]}" alt="{img.get("alt", "")}" style="width: {img["width"]}px; height: {img["height"]}px; object-fit: cover; display: block;" loading="lazy">
+                </video>'''
+    else:
+        image_path = img['src'].rsplit('.', 1)[0]
+        # Use 1000px thumbnail for last image
+        thumbnail_suffix = '_thumb1000.jpg' if img.get('isLastInSection') else '_thumb.jpg'
+        thumbnail_path = f"{image_path}{thumbnail_suffix}"
+        media_element = f'<img src="{thumbnail_path}" data-full-src="{full_size_src(img)}" alt="{img.get("alt", "")}" style="width: {img["width"]}px; height: {img["height"]}px; object-fit: cover; display: block;{placeholder_style(img)}" loading="lazy">'
+
+        # Let the browser pick a modern-format derivative sized for the rendered width and DPR
+        picture_sources = render_picture_sources(image_path, img['width'])
+        if picture_sources:
+            media_element = f'<picture>{picture_sources}{media_element}</picture>'
+
+    breakpoint_style = responsive_style(img, item_widths)
+
+    return {
+        'animation_class': animation_class,
+        'margin_right': margin_right,
+        'breakpoint_style': f' {breakpoint_style}' if breakpoint_style else '',
+        'index': img['index'],
+        'mobile_attributes': mobile_attributes(flags) if is_video or img.get('isGifLoop') else '',
+        'media': media_element,
+        'overlay': not flags['animation'] or not is_video,
+        'description': img.get("description", img.get("alt", "")),
+        'sound_button': flags['animation'] and is_video and flags['soundButton'],
+        'inverted_class': ' inverted' if flags['invertedControls'] else '',
+    }
 
-    return html
+def get_layout_settings(section_name, section_options=None):
+    """Return (min_images_per_row, target_row_height) for a section"""
+    section_options = section_options or {}
+    min_images_per_row = 3
+    target_row_height = 300
+
+    if section_name == 'Elle' or section_name == 'Three Stories':
+        min_images_per_row = 2
+    elif section_name == 'Food':
+        min_images_per_row = 8
+        target_row_height = 120
+
+    if section_options.get('targetRowHeight'):
+        target_row_height = section_options['targetRowHeight']
+
+    return min_images_per_row, target_row_height
+
+def image_object(img_src, size, index, description=''):
+    """The layout and rendering fields of one measured gallery item"""
+    width, height = size
+    is_video = img_src.lower().endswith('.mp4')
+    img_obj = {
+        'src': img_src,
+        'width': width,
+        'height': height,
+        'isVideo': is_video,
+        'alt': '',
+        'description': description,
+        'index': index,
+        'flags': media_rules.match(MEDIA_RULES, img_src)
+    }
+
+    placeholder = PLACEHOLDERS.get(img_src)
+    if placeholder and not is_video:
+        img_obj['placeholder'] = placeholder
+
+    lightbox = [] if is_video else lightbox_renditions(img_src, width / height)
+    if lightbox:
+        img_obj['lightbox'] = lightbox
+
+    # Animated GIFs that generate-videos.py converted play as looping video
+    if img_src.lower().endswith('.gif') and video_renditions(img_src):
+        img_obj['isGifLoop'] = True
+
+    return img_obj
+
+def lightbox_entry(img):
+    """Only the fields lightbox.js reads, leaving out defaults"""
+    entry = {'src': img['src']}
+    if img.get('isGifLoop'):
+        # The lightbox plays the GIF's H.264 loop; "gif" names the original for its poster
+        loop_mp4 = next((path for path, mime_type in video_renditions(img['src']) if mime_type == 'video/mp4'), None)
+        if loop_mp4:
+            entry = {'src': loop_mp4, 'isVideo': True, 'gif': img['src']}
+    if img['isVideo']:
+        entry['isVideo'] = True
+    flags = img['flags']
+    if img['isVideo'] and not flags['lightboxCaption']:
+        entry['hideDescription'] = True
+    if flags['lightboxNoUpscale']:
+        entry['noUpscale'] = True
+    if img.get('lightbox'):
+        # Screen-sized renditions instead of the original: JPEG as src/srcset, better formats as <source>s
+        srcsets = [[mime_type, ', '.join(f'{quote(path)} {width}w' for path, width in candidates)]
+                   for mime_type, candidates in img['lightbox']]
+        entry['src'] = full_size_src(img)
+        entry['srcset'] = srcsets[-1][1]
+        entry['sizes'] = f"min(100vw, {LIGHTBOX_MAX_HEIGHT_VH * img['width'] / img['height']:.1f}vh)"
+        if len(srcsets) > 1:
+            entry['sources'] = srcsets[:-1]
+    if img['alt']:
+        entry['alt'] = img['alt']
+    if img['description']:
+        entry['description'] = img['description']
+    return entry
+
+def write_hashed_file(directory, name, extension, content):
+    """Write content to <directory>/<name>.<hash>.<extension> and return its path
+
+    The hash in the file name lets the file be cached forever; older versions of the
+    same name are removed.
+    """
+    content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+    filename = f"{name}.{content_hash}.{extension}"
+    output_path = f"{directory}/{filename}"
+
+    os.makedirs(directory, exist_ok=True)
+    for existing in os.listdir(directory):
+        if existing.rsplit('.', 2)[0] == name and existing.endswith(f".{extension}") and existing != filename:
+            os.remove(os.path.join(directory, existing))
+
+    if not os.path.exists(output_path):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        build_stats.count('bytes_written', len(content.encode('utf-8')))
+
+    GENERATED_FILES.append(output_path)
+    return output_path
+
+def write_lightbox_data(project_id, images):
+    """Write the project's lightbox data as compact JSON and return its path"""
+    payload = json.dumps([lightbox_entry(img) for img in images], separators=(',', ':'), ensure_ascii=False)
+    return write_hashed_file(LIGHTBOX_DATA_DIR, f"project-{project_id}", 'json', payload)
+
+def write_section_fragment(project_id, section_key, rows_html):
+    """Write the rows behind a section's "See more" button and return the fragment's path"""
+    return write_hashed_file(FRAGMENTS_DIR, f"{project_id}--{section_key}", 'html', rows_html)
+
+def remove_stale_fragments(project_id):
+    """Delete fragments of the project that this build did not produce (e.g. removed sections)"""
+    if not os.path.isdir(FRAGMENTS_DIR):
+        return
+    for existing in os.listdir(FRAGMENTS_DIR):
+        path = f"{FRAGMENTS_DIR}/{existing}"
+        if existing.startswith(f"{project_id}--") and path not in GENERATED_FILES:
+            os.remove(path)
+
+def nav_links(active_project_id=None):
+    """Project links for the menus in templates/mobile-header.html, burger-menu.html and sidebar.html"""
+    return [{'href': f"project-{project_id}.html", 'label': project_info['category'].title(),
+             'category': project_info['category'], 'active': ' class="active"' if project_id == active_project_id else ''}
+            for project_id, project_info in PROJECTS.items()]
 
 def generate_project_page(project_id, project_info, gallery_data):
     """Generate a static HTML page for a project"""
@@ -339,11 +777,11 @@ def generate_project_page(project_id, project_info, gallery_data):
 
     if not project_data:
         print(f"  Warning: No gallery data found for {gallery_key}")
-        return
+        return False
 
     # Build sections
     all_images = []
-    sections_html = []
+    sections = []
     image_index = 0
 
     is_animation_project = project_id == 'animation'
@@ -364,8 +802,6 @@ def generate_project_page(project_id, project_info, gallery_data):
         custom_layout = section_options.get('customLayout', False)
 
         for idx, img_src in enumerate(section_data['images']):
-            is_video = img_src.lower().endswith('.mp4')
-
             # For custom layout, check if this is the first item (video should use large thumb)
             is_first_item = False
             if custom_layout and idx == 0:
@@ -374,23 +810,19 @@ def generate_project_page(project_id, project_info, gallery_data):
             # Check if this is the last image in the section
             is_last = (idx == len(section_data['images']) - 1)
 
-            # Use large thumbnail for first item in custom layout or last image
-            use_large_thumb = is_first_item or (is_last and not custom_layout)
-            width, height = get_image_size(img_src, is_last_in_section=use_large_thumb)
+            use_large_thumb = uses_large_thumbnail(idx, len(section_data['images']), section_options)
+            size = get_image_size(img_src, is_last_in_section=use_large_thumb, media=gallery_data.get('media'))
+
+            if size is None:
+                print(f"  Error: Could not read dimensions of {img_src}, leaving it out of the layout")
+                UNREADABLE_FILES.append(img_src)
+                continue
 
             # Get description for this image by filename
             filename = os.path.basename(img_src)
             description = image_descriptions.get(filename, '')
 
-            img_obj = {
-                'src': img_src,
-                'width': width,
-                'height': height,
-                'isVideo': is_video,
-                'alt': '',
-                'description': description,
-                'index': image_index
-            }
+            img_obj = image_object(img_src, size, image_index, description)
 
             # Mark special images
             if is_first_item:
@@ -412,192 +844,313 @@ def generate_project_page(project_id, project_info, gallery_data):
         section_name = section_title
 
         # Layout configuration
-        min_images_per_row = 3
-        target_row_height = 300
-
-        if section_name == 'Elle' or section_name == 'Three Stories':
-            min_images_per_row = 2
-        elif section_name == 'Food':
-            min_images_per_row = 8
-            target_row_height = 120
-
-        if section_options.get('targetRowHeight'):
-            target_row_height = section_options['targetRowHeight']
+        min_images_per_row, target_row_height = get_layout_settings(section_name, section_options)
 
         # Create layout
         rows = create_bin_packed_layout(images, container_width=1000, target_row_height=target_row_height,
                                        gap=10, min_images_per_row=min_images_per_row, section_options=section_options)
 
-        # Render section
-        gallery_html = render_gallery_html(rows, gap=10, section_id=section_key,
-                                          is_animation_project=is_animation_project, section_options=section_options)
+        # Precompute the narrower breakpoints separately for the rows shown up front and the rows
+        # behind "See more", so neither group ends in a half-filled row
+        visible_count = sum(len(row) for row in rows[:visible_row_count(rows, section_options)])
+        item_widths = create_responsive_layouts(images[:visible_count], LAYOUT_BREAKPOINTS[1:], target_row_height=target_row_height,
+                                                gap=10, min_images_per_row=min_images_per_row, section_options=section_options)
+        hidden_options = {'layoutMode': section_options['layoutMode']} if 'layoutMode' in section_options else None
+        item_widths.update(create_responsive_layouts(images[visible_count:], LAYOUT_BREAKPOINTS[1:], target_row_height=target_row_height,
+                                                     gap=10, min_images_per_row=min_images_per_row, section_options=hidden_options))
+
+        # Rows behind "See more" go into a fragment that is only fetched when the button is clicked
+        visible_rows = visible_row_count(rows, section_options)
+        fragment_url = None
+        if len(rows) > visible_rows:
+            hidden_rows_html = ''.join(render_row(row, gap=10, section_id=section_key, item_widths=item_widths,
+                                                  hidden=True)
+                                       for row in rows[visible_rows:])
+            fragment_url = write_section_fragment(project_id, section_key, hidden_rows_html)
 
-        # Only show description if it exists
-        description_html = f'<p class="project-description">{section_description}</p>' if section_description else ''
+        # Render section
+        gallery_html = render_gallery_html(rows, gap=10, section_id=section_key, section_options=section_options,
+                                          item_widths=item_widths, fragment_url=fragment_url)
 
-        section_html = f'''<div class="gallery-section">
-    <h2 class="project-title">{section_title}</h2>
-    {description_html}
-    {gallery_html}
-</div>
-'''
-        sections_html.append(section_html)
+        sections.append({'title': section_title, 'description': section_description, 'gallery': gallery_html})
 
-    # Create lightbox images array as JSON
-    lightbox_images_json = json.dumps(all_images, indent=2)
+    # Lightbox data lives in its own file, loaded when a lightbox first opens
+    lightbox_data_url = write_lightbox_data(project_id, all_images)
 
     # Add mobile animation scripts for animation project, brands, and digital
     # (brands has Pivot Point, digital has Monster Bow, animation has play/pause videos)
-    needs_animation_script = is_animation_project or project_id in ['brands', 'digital']
+    scripts = ['mobile-menu.js', 'mobile-menu-alignment.js', 'mobile-project-gallery.js']
+    if is_animation_project or project_id in ['brands', 'digital']:
+        scripts.append('mobile-animation-play.js')
     if is_animation_project:
-        animation_scripts = '''<script src="mobile-animation-play.js"></script>
-    <script src="mobile-animation-gifs.js"></script>'''
-    elif needs_animation_script:
-        animation_scripts = '<script src="mobile-animation-play.js"></script>'
-    else:
-        animation_scripts = ''
-
-    # Generate complete HTML
-    html_content = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{project_title} - OLENA KOVTASH</title>
-    <link rel="stylesheet" href="styles.css">
-    <link rel="stylesheet" href="project-styles.css">
-</head>
-<body>
-    <!-- Mobile Header -->
-    <header class="mobile-header">
-        <div class="mobile-header-top">
-            <div class="mobile-logo-section">
-                <a href="index.html">
-                    <img src="images/logo5.png" alt="Logo" class="mobile-logo">
-                </a>
-                <span class="mobile-name">OLENA KOVTASH</span>
-            </div>
-            <div class="mobile-subtitle-section">
-                <div class="mobile-subtitle-line">VISUAL</div>
-                <div class="mobile-subtitle-line">DESIGNER</div>
-            </div>
-            <div class="mobile-header-icons">
-                <a href="contact.html">
-                    <img src="images/contacts.png" alt="Contact" class="mobile-contact-icon">
-                </a>
-                <div class="mobile-menu-icon" id="mobile-menu-toggle">
-                    <span></span>
-                </div>
-            </div>
-        </div>
-        <div class="mobile-burger-menu" id="mobile-burger-menu">
-            <a href="index.html">Home</a>
-            <a href="about.html">About</a>
-            <a href="contact.html">Contact</a>
-            <div class="mobile-menu-divider">PROJECTS</div>
-            <a href="project-brands.html"{"" if project_id != "brands" else ' class="active"'}>Brands</a>
-            <a href="project-magazines.html"{"" if project_id != "magazines" else ' class="active"'}>Magazines</a>
-            <a href="project-prints.html"{"" if project_id != "prints" else ' class="active"'}>Prints</a>
-            <a href="project-digital.html"{"" if project_id != "digital" else ' class="active"'}>Digital</a>
-            <a href="project-logos.html"{"" if project_id != "logos" else ' class="active"'}>Logos</a>
-            <a href="project-illustration.html"{"" if project_id != "illustration" else ' class="active"'}>Illustration</a>
-            <a href="project-animation.html"{"" if project_id != "animation" else ' class="active"'}>Animation</a>
-            <a href="project-unsorted.html"{"" if project_id != "unsorted" else ' class="active"'}>Display</a>
-        </div>
-        <div class="mobile-menu-overlay" id="mobile-menu-overlay"></div>
-        <div class="mobile-nav-wrapper">
-            <nav class="mobile-nav">
-                <a href="project-brands.html"{"" if project_id != "brands" else ' class="active"'}>BRANDS</a>
-                <a href="project-magazines.html"{"" if project_id != "magazines" else ' class="active"'}>MAGAZINES</a>
-                <a href="project-prints.html"{"" if project_id != "prints" else ' class="active"'}>PRINTS</a>
-                <a href="project-digital.html"{"" if project_id != "digital" else ' class="active"'}>DIGITAL</a>
-                <a href="project-logos.html"{"" if project_id != "logos" else ' class="active"'}>LOGOS</a>
-                <a href="project-illustration.html"{"" if project_id != "illustration" else ' class="active"'}>ILLUSTRATION</a>
-                <a href="project-animation.html"{"" if project_id != "animation" else ' class="active"'}>ANIMATION</a>
-                <a href="project-unsorted.html"{"" if project_id != "unsorted" else ' class="active"'}>DISPLAY</a>
-            </nav>
-        </div>
-    </header>
-
-    <div class="container">
-        <!-- Sidebar -->
-        <aside class="sidebar">
-            <div class="logo-section">
-                <a href="index.html">
-                    <img src="images/logo5.png" alt="Logo" class="logo">
-                </a>
-                <h1 class="name">OLENA KOVTASH</h1>
-                <p class="designer-subtitle">visual designer</p>
-                <nav class="top-nav">
-                    <a href="about.html">About</a>
-                    <a href="contact.html">Contact</a>
-                </nav>
-            </div>
-
-            <div class="projects-menu">
-                <h2>PROJECTS</h2>
-                <nav class="project-links">
-                    <a href="project-brands.html"{"" if project_id != "brands" else ' class="active"'}>Brands</a>
-                    <a href="project-magazines.html"{"" if project_id != "magazines" else ' class="active"'}>Magazines</a>
-                    <a href="project-prints.html"{"" if project_id != "prints" else ' class="active"'}>Prints</a>
-                    <a href="project-digital.html"{"" if project_id != "digital" else ' class="active"'}>Digital</a>
-                    <a href="project-logos.html"{"" if project_id != "logos" else ' class="active"'}>Logos</a>
-                    <a href="project-illustration.html"{"" if project_id != "illustration" else ' class="active"'}>Illustration</a>
-                    <a href="project-animation.html"{"" if project_id != "animation" else ' class="active"'}>Animation</a>
-                    <a href="project-unsorted.html"{"" if project_id != "unsorted" else ' class="active"'}>Display</a>
-                </nav>
-            </div>
-        </aside>
-
-        <!-- Main Content -->
-        <main class="main-content">
-            <div class="project-header">
-                <h3 class="project-category" id="categoryTitle">{project_info['category']}</h3>
-            </div>
-
-            <div class="project-images">
-{''.join(sections_html)}
-            </div>
-        </main>
-    </div>
-
-    <!-- Lightbox -->
-    <div class="lightbox" id="lightbox">
-        <button class="lightbox-close" id="lightboxClose">&times;</button>
-        <button class="lightbox-arrow prev" id="lightboxPrev">&#8249;</button>
-        <div class="lightbox-content">
-            <div class="lightbox-image-wrapper">
-                <img id="lightboxImage" src="" alt="">
-                <div class="lightbox-description" id="lightboxDescription"></div>
-            </div>
-        </div>
-        <button class="lightbox-arrow next" id="lightboxNext">&#8250;</button>
-    </div>
-
-    <script src="mobile-menu.js"></script>
-    <script src="mobile-menu-alignment.js"></script>
-    <script src="mobile-project-gallery.js"></script>
-    {animation_scripts}
-    <script src="lightbox.js"></script>
-    <script src="image-protection.js"></script>
-    <script>
-        // Initialize lightbox with pre-generated image data
-        var lightboxImages = {lightbox_images_json};
-        initLightbox(lightboxImages);
-    </script>
-</body>
-</html>
-'''
-
-    # Write to file
+        scripts.append('mobile-animation-gifs.js')
+    scripts += ['lightbox.js', 'image-protection.js']
+
+    # Render the page (templates/project.html) straight into the file
     output_file = f"project-{project_id}.html"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+
+    remove_stale_fragments(project_id)
+    GENERATED_FILES.append(output_file)
+
+    context = {
+        'title': project_title,
+        'category': project_info['category'],
+        'layout_css': responsive_layout_css(LAYOUT_BREAKPOINTS),
+        'nav': nav_links(project_id),
+        'sections': sections,
+        'scripts': scripts,
+        'lightbox_data_url': json.dumps(lightbox_data_url),
+    }
+    if not site_templates.render_to_file('project', context, output_file):
+        print(f"  ✓ {output_file} unchanged")
+        return False
 
     print(f"  ✓ Generated {output_file}")
+    return True
+
+def digest(value):
+    """Stable SHA-256 of a JSON-serializable value"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def media_candidates(img_src):
+    """Every file a gallery entry can pull into a page: original, thumbnails, responsive derivatives and lightbox renditions"""
+    base_path = img_src.rsplit('.', 1)[0]
+    paths = [img_src, f"{base_path}_thumb.jpg", f"{base_path}_thumb1000.jpg"]
+    paths += [f"{base_path}_thumb{width}.{ext}" for ext, _mime_type in RESPONSIVE_FORMATS for width in RESPONSIVE_WIDTHS]
+    paths += [f"{base_path}{LIGHTBOX_SUFFIX}{edge}.{ext}" for ext, _mime_type in LIGHTBOX_FORMATS for edge in LIGHTBOX_EDGES]
+    if img_src.lower().endswith(('.mp4', '.gif')):
+        paths += [f"{base_path}_thumb{VIDEO_RENDITION_WIDTH}.{ext}" for ext, _mime_type in VIDEO_RENDITIONS]
+        paths.append(f"{base_path}{VIDEO_PREVIEW_SUFFIX}")
+    return paths
+
+def file_state(path):
+    """(mtime, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def page_dependencies(project_id, project_info, gallery_data):
+    """Digest every input a project page is built from
+
+    The page depends on its gallery-data.json project, its text-content.json entry, its
+    section configs, the media files whose dimensions and derivatives it uses, their
+    placeholders and media-rules.json flags, the templates, and the code that builds it:
+    the generator (layout code and site-wide settings live here) and the local modules it
+    uses (gallery_media, media_rules, site_templates).
+    """
+    project_data = gallery_data['projects'].get(project_info['gallery_key'], {})
+    media = {}
+    placeholders = {}
+    flags = {}
+    for section_data in project_data.get('sections', {}).values():
+        for img_src in section_data['images']:
+            for path in media_candidates(img_src):
+                media[path] = file_state(path)
+            placeholders[img_src] = PLACEHOLDERS.get(img_src)
+            flags[img_src] = media_rules.match(MEDIA_RULES, img_src)
+
+    generator_digest = hashlib.sha256()
+    for module_file in (__file__, gallery_media.__file__, media_rules.__file__, site_templates.__file__):
+        with open(module_file, 'rb') as f:
+            generator_digest.update(f.read())
+
+    return {
+        'gallery': digest(project_data),
+        'text': digest(TEXT_CONTENT['projects'].get(project_id, {})),
+        'sections': digest(SECTION_CONFIGS.get(project_id, {})),
+        'media': digest(media),
+        'placeholders': digest(placeholders),
+        'rules': digest(flags),
+        'generator': generator_digest.hexdigest(),
+        'templates': site_templates.digest(),
+    }
+
+def load_page_manifest():
+    """Load the per-page dependency record"""
+    try:
+        with open(PAGE_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_page_manifest(manifest):
+    """Write the per-page dependency record atomically"""
+    os.makedirs(os.path.dirname(PAGE_MANIFEST_FILE), exist_ok=True)
+    tmp_path = f"{PAGE_MANIFEST_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, PAGE_MANIFEST_FILE)
+
+def build_page(project_id, project_info, gallery_data):
+    """Generate one page (in a worker process); returns what the main process needs to merge back"""
+    # A worker can build several pages; only report what this one produced
+    DIMENSION_CACHE_UPDATES.clear()
+    UNREADABLE_FILES.clear()
+    GENERATED_FILES.clear()
+
+    with build_stats.span(f"project-{project_id}.html", 'page') as details:
+        written = generate_project_page(project_id, project_info, gallery_data)
+        details['written'] = written
+    return written, dict(DIMENSION_CACHE_UPDATES), list(UNREADABLE_FILES), list(GENERATED_FILES)
+
+def measure_gallery(gallery_data):
+    """Fill the dimension cache for every gallery entry, so page builds find their sizes ready"""
+    media = gallery_data.get('media')
+    gallery_to_project = {info['gallery_key']: project_id for project_id, info in PROJECTS.items()}
+
+    for gallery_key, project_data in gallery_data['projects'].items():
+        project_configs = SECTION_CONFIGS.get(gallery_to_project.get(gallery_key), {})
+        for section_key, section_data in project_data['sections'].items():
+            section_options = project_configs.get(section_key, {})
+            for idx, img_src in enumerate(section_data['images']):
+                use_large_thumb = uses_large_thumbnail(idx, len(section_data['images']), section_options)
+                get_image_size(img_src, is_last_in_section=use_large_thumb, media=media)
+
+    save_dimension_cache()
+
+def build_pages(gallery_data, workers=None, force=False):
+    """Regenerate the pages whose inputs changed; returns the ids of the pages written"""
+    workers = workers or os.cpu_count() or 1
+
+    # Pick up placeholders for thumbnails built since this module was imported
+    PLACEHOLDERS.clear()
+    PLACEHOLDERS.update(load_placeholders())
+
+    # Work out which pages have changed inputs
+    page_manifest = load_page_manifest()
+    dependencies = {}
+    stale_pages = []
+
+    with build_stats.stage('pages.plan'):
+        for project_id, project_info in PROJECTS.items():
+            dependencies[project_id] = page_dependencies(project_id, project_info, gallery_data)
+            previous = page_manifest.get(project_id, {})
+            changed = [key for key, value in dependencies[project_id].items() if previous.get(key) != value]
+
+            outputs = previous.get('outputs', [f"project-{project_id}.html"])
+            outputs_exist = all(os.path.exists(path) for path in outputs)
+            if force or changed or not outputs_exist:
+                stale_pages.append(project_id)
+                reasons = ['forced'] if force else changed or ['missing']
+                build_stats.count('pages.cache.miss')
+                build_stats.rebuild(f"project-{project_id}.html", *reasons)
+                print(f"  project-{project_id}.html: {', '.join(reasons)}")
+            else:
+                build_stats.count('pages.cache.hit')
+
+    # Generate the stale pages, in parallel when there is more than one; compiling the templates
+    # here reports a broken one before any worker starts
+    site_templates.compile_all()
+    written_pages = []
+    workers = min(workers, len(stale_pages))
+
+    with build_stats.stage('pages.build'):
+        if workers > 1:
+            # Workers come from a fresh server process rather than a fork of this one, which
+            # may have other build stages running in threads
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = {project_id: executor.submit(build_page, project_id, PROJECTS[project_id], gallery_data)
+                           for project_id in stale_pages}
+                results = {project_id: future.result() for project_id, future in futures.items()}
+        else:
+            results = {project_id: build_page(project_id, PROJECTS[project_id], gallery_data) for project_id in stale_pages}
+
+    unreadable_files = []
+    for project_id, (written, cache_updates, unreadable, outputs) in results.items():
+        DIMENSION_CACHE.update(cache_updates)
+        unreadable_files.extend(path for path in unreadable if path not in unreadable_files)
+        page_manifest[project_id] = dict(dependencies[project_id], outputs=outputs)
+        if written:
+            written_pages.append(project_id)
+
+    save_dimension_cache()
+    save_page_manifest(page_manifest)
+
+    if unreadable_files:
+        print(f"\n⚠ {len(unreadable_files)} file(s) could not be measured and were left out:")
+        for path in unreadable_files:
+            print(f"  - {path}")
+
+    return written_pages
+
+def cover_entry(img_src, placeholders):
+    """A homepage cover: the image's thumbnail (or video poster) with its size and placeholder, or None without one"""
+    thumb_path = f"{img_src.rsplit('.', 1)[0]}{COVER_THUMBNAIL_SUFFIX}"
+    if not os.path.exists(thumb_path):
+        return None
+    size = get_cached_dimensions(thumb_path)
+    if not size:
+        return None
+
+    entry = {'src': thumb_path, 'width': size[0], 'height': size[1]}
+    if placeholders.get(img_src):
+        entry.update(placeholders[img_src])
+    return entry
+
+def build_cover_manifest(gallery_data):
+    """Cover pools for the homepage, keyed by the category its project items carry (data-category)"""
+    placeholders = load_placeholders()
+    manifest = {}
+    for project_id, project_info in PROJECTS.items():
+        project_data = gallery_data['projects'].get(project_info['gallery_key'], {})
+        images = [img_src for section_data in project_data.get('sections', {}).values() for img_src in section_data['images']]
+        covers = [entry for entry in (cover_entry(img_src, placeholders) for img_src in HOMEPAGE_COVERS.get(project_id, images))
+                  if entry]
+        if project_id not in HOMEPAGE_COVERS and len(covers) > COVER_POOL_SIZE:
+            covers = random.Random(project_id).sample(covers, COVER_POOL_SIZE)
+        manifest[project_info['category'].lower()] = covers
+    return manifest
+
+def update_homepage_covers(manifest, index_file=HOMEPAGE_FILE):
+    """Inline the cover manifest into index.html, just before homepage-covers.js; returns False if that fails"""
+    if not os.path.exists(index_file):
+        print(f"Error: {index_file} not found")
+        return False
+
+    with open(index_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    build_stats.count('bytes_read', len(content.encode('utf-8')))
+
+    # "</" would end the <script> element early
+    payload = json.dumps(manifest, separators=(',', ':'), ensure_ascii=False).replace('</', '<\\/')
+    element = f'<script type="application/json" id="{COVER_MANIFEST_ID}">{payload}</script>'
+    existing = re.search(rf'<script type="application/json" id="{COVER_MANIFEST_ID}">.*?</script>', content, re.DOTALL)
+    if existing:
+        new_content = content[:existing.start()] + element + content[existing.end():]
+    elif '<script src="homepage-covers.js"></script>' in content:
+        new_content = content.replace('<script src="homepage-covers.js"></script>',
+                                      f'{element}\n    <script src="homepage-covers.js"></script>', 1)
+    else:
+        print(f"Error: Could not find homepage-covers.js in {index_file}")
+        return False
+
+    if new_content == content:
+        build_stats.count('covers.cache.hit')
+        print(f"✓ Homepage covers in {index_file} already up to date")
+        return True
+
+    build_stats.count('covers.cache.miss')
+    with open(index_file, 'w', encoding='utf-8') as f:
+        f.write(new_content)
+    build_stats.count('bytes_written', len(new_content.encode('utf-8')))
+    print(f"✓ Updated homepage covers in {index_file} ({sum(len(covers) for covers in manifest.values())} covers, "
+          f"{len(payload.encode('utf-8')) / 1024:.1f} KB)")
+    return True
 
 def main():
     """Main function to generate all static pages"""
+    parser = argparse.ArgumentParser(description="Generate the static project pages")
+    parser.add_argument('--force', action='store_true', help="regenerate every page, ignoring the dependency record")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: number of CPU cores)")
+    build_stats.add_arguments(parser)
+    args = parser.parse_args()
+    build_stats.start(args.stats, args.trace)
+
     print("Portfolio Static Site Generator")
     print("=" * 50)
 
@@ -605,15 +1158,17 @@ def main():
     with open('gallery-data.json', 'r', encoding='utf-8') as f:
         gallery_data = json.load(f)
 
-    # Generate each project page
-    for project_id, project_info in PROJECTS.items():
-        generate_project_page(project_id, project_info, gallery_data)
+    written_pages = build_pages(gallery_data, args.workers, args.force)
+    with build_stats.stage('covers'):
+        update_homepage_covers(build_cover_manifest(gallery_data))
+    save_dimension_cache()  # Cover thumbnails measured above
 
     print("\n" + "=" * 50)
-    print("✓ All static pages generated successfully!")
-    print("\nGenerated files:")
-    for project_id in PROJECTS.keys():
+    print("✓ All static pages are up to date!")
+    print(f"\nRegenerated {len(written_pages)} of {len(PROJECTS)} pages:")
+    for project_id in written_pages:
         print(f"  - project-{project_id}.html")
+    build_stats.finish()
 
 if __name__ == '__main__':
     main()
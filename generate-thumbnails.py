@@ -2,67 +2,337 @@
 """
 Thumbnail Generator for Portfolio Gallery
 Creates 600px thumbnails for all images and 1000px for the last image in each folder
+Also builds a responsive ladder of WebP/AVIF widths next to each thumbnail (for srcset), and
+screen-sized lightbox renditions so the lightbox never loads camera-resolution originals
+Images are resized in-process with Pillow and spread across a process pool
+A build manifest records what each thumbnail was built from, so unchanged images are skipped,
+and a content-addressed cache (derivative_cache) restores outputs built before, on any machine
+Large sources are decoded at reduced size, and the pool only runs as many decodes at once as the
+memory ceiling allows
 """
 
+import argparse
+import base64
+import io
+import json
+import math
+import multiprocessing
 import os
-import subprocess
-from pathlib import Path
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import build_stats
+import derivative_cache
+from gallery_media import GALLERY_BASE, is_thumbnail_source, source_fingerprint
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    print("Error: Pillow not found")
+    print("Install with: pip install Pillow")
+    sys.exit(1)
 
 # Configuration
-GALLERY_BASE = "images/gallery"
 THUMBNAIL_SIZE = 600  # Width in pixels for regular thumbnails
 LAST_IMAGE_SIZE = 1000  # Width in pixels for last image in each folder
 THUMBNAIL_SUFFIX = "_thumb.jpg"
 LAST_IMAGE_SUFFIX = "_thumb1000.jpg"
+JPEG_QUALITY = 85
+BACKGROUND_COLOR = (255, 255, 255)  # Transparent areas are flattened onto the page background
+MANIFEST_FILE = ".build-cache/thumbnails.json"
+
+# Responsive ladder: every image also gets <name>_thumb<width>.<format> for each width up to
+# its own size. The regular JPEG thumbnail above is the fallback for browsers without these formats
+RESPONSIVE_WIDTHS = [320, 480, 600, 800, 1000, 1600]
+RESPONSIVE_FORMATS = {
+    'avif': {'quality': 50, 'speed': 8},
+    'webp': {'quality': 80, 'method': 4},
+}
+
+# Lightbox renditions: <name>_thumb_lightbox<edge>.<format> at each long edge smaller than the
+# source's, in the ladder's formats plus JPEG (the lightbox's fallback)
+LIGHTBOX_EDGES = [1600, 2400]
+LIGHTBOX_SUFFIX = '_thumb_lightbox'
+LIGHTBOX_JPEG = {'quality': 82, 'optimize': True, 'progressive': True}
+
+# Placeholders inlined into the pages until the thumbnail loads: a tiny blurred preview
+# (as a data URI) and the image's dominant color
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 40
+PLACEHOLDER_COLORS = 5  # Palette size used to find the dominant color
+
+# Decoding: JPEGs are decoded at a reduced DCT scale (1/2, 1/4 or 1/8) and other formats are
+# box-reduced right after decoding, but never below DECODE_OVERSAMPLE times the largest output
+# width, so the final Lanczos resize keeps its quality
+DECODE_OVERSAMPLE = 2
+MEMORY_LIMIT_MB = 512  # Ceiling per job for decoded bitmaps; the pool runs at most workers x this at once
+BYTES_PER_PIXEL = 4  # Pillow keeps RGB and RGBA pixels in 32 bits
+DECODE_COPIES = 3  # Decoded bitmap, its oriented RGB copy and the resize being encoded
+ORIENTATION_TAG = 0x0112
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)  # EXIF orientations that swap width and height
+
+# Encoder settings are stored with every manifest entry; changing them rebuilds all thumbnails
+ENCODER_SETTINGS = {
+    'format': 'JPEG',
+    'quality': JPEG_QUALITY,
+    'optimize': True,
+    'progressive': True,
+    'resample': 'lanczos',
+    'background': list(BACKGROUND_COLOR),
+    'lightbox': {'edges': LIGHTBOX_EDGES, 'jpeg': LIGHTBOX_JPEG},
+}
 
 def get_image_files(folder_path):
     """Get all original image files (not thumbnails) from a folder, sorted"""
-    image_extensions = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
-    files = []
+    return [file for file in sorted(os.listdir(folder_path)) if is_thumbnail_source(file)]
+
+def to_rgb(img):
+    """Convert an image to RGB, flattening any transparency onto the background color"""
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, BACKGROUND_COLOR)
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+
+    return img
+
+def resize_to_width(img, width):
+    """Resize to a width, keeping the aspect ratio"""
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), Image.LANCZOS)
+
+def thumbnail_base(output_path):
+    """Path that a thumbnail and its derivatives share, e.g. photo_thumb.jpg -> photo"""
+    return output_path.rsplit('_thumb', 1)[0]
+
+def ladder_path(output_path, width, fmt):
+    """Path of a responsive derivative, e.g. photo_thumb.jpg -> photo_thumb480.webp"""
+    return f"{thumbnail_base(output_path)}_thumb{width}.{fmt}"
+
+def ladder_widths(source_width, widths):
+    """Ladder widths for a source image; never upscale beyond the source except for the smallest rung"""
+    return [w for w in widths if w <= source_width] or widths[:1]
 
-    for file in sorted(os.listdir(folder_path)):
-        if any(file.endswith(ext) for ext in image_extensions):
-            # Skip thumbnail files (both _thumb.jpg and _thumb1000.jpg)
-            if '_thumb' not in file:
-                files.append(file)
+def lightbox_path(output_path, edge, extension):
+    """Path of a lightbox rendition, e.g. photo_thumb.jpg -> photo_thumb_lightbox2400.webp"""
+    return f"{thumbnail_base(output_path)}{LIGHTBOX_SUFFIX}{edge}.{extension}"
 
-    return files
+def lightbox_sizes(source_size):
+    """(long edge, width) of the lightbox renditions for a source size; never upscaled"""
+    source_width, source_height = source_size
+    sizes = []
+    for edge in LIGHTBOX_EDGES:
+        if edge < max(source_size):
+            sizes.append((edge, edge if source_width >= source_height else max(1, round(source_width * edge / source_height))))
+    return sizes
 
-def create_thumbnail(input_path, output_path, width):
-    """Create a thumbnail with specified width, maintaining aspect ratio"""
+def lightbox_formats(ladder=None):
+    """Lightbox rendition formats as extension -> (Pillow format, options): the ladder's formats, then JPEG"""
+    formats = {fmt: (fmt.upper(), options) for fmt, options in (ladder['formats'] if ladder else {}).items()}
+    formats['jpg'] = ('JPEG', LIGHTBOX_JPEG)
+    return formats
+
+def dominant_color(img):
+    """Most common color of an image after reducing it to a small palette, as #rrggbb"""
+    small = img.copy()
+    small.thumbnail((64, 64))
+    quantized = small.quantize(colors=PLACEHOLDER_COLORS)
+    _count, index = max(quantized.getcolors())
+    red, green, blue = quantized.getpalette()[index * 3:index * 3 + 3]
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+def placeholder_data_uri(img):
+    """A PLACEHOLDER_WIDTH-wide preview of the image as a WebP (or JPEG) data URI"""
+    fmt = 'webp' if features.check('webp') else 'jpeg'
+    buffer = io.BytesIO()
+    resize_to_width(img, PLACEHOLDER_WIDTH).save(buffer, fmt.upper(), quality=PLACEHOLDER_QUALITY)
+    return f"data:image/{fmt};base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+
+def create_placeholder(img):
+    """Placeholder metadata for a (thumbnail) image"""
+    return {'color': dominant_color(img), 'lqip': placeholder_data_uri(img)}
+
+def output_width(source_size, width, ladder=None):
+    """Largest width a job writes: the thumbnail itself, its widest ladder rung or its largest lightbox rendition"""
+    widths = [width] + [lightbox_width for _edge, lightbox_width in lightbox_sizes(source_size)]
+    return max(widths + (ladder_widths(source_size[0], ladder['widths']) if ladder else []))
+
+def prepare_decode(img, width, ladder=None):
+    """Set up an opened (not yet decoded) image to decode no more pixels than the outputs need
+
+    JPEGs get a draft size, so libjpeg scales them down while decoding. Returns (displayed
+    source size, decode width): the size after EXIF orientation, and the width the
+    decoded image should be reduced to.
+    """
+    source_width, source_height = img.size
+    if img.getexif().get(ORIENTATION_TAG) in TRANSPOSED_ORIENTATIONS:
+        source_width, source_height = source_height, source_width
+
+    decode_width = output_width((source_width, source_height), width, ladder) * DECODE_OVERSAMPLE
+    if img.format == 'JPEG' and decode_width < source_width:
+        scale = decode_width / source_width
+        img.draft(None, (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+
+    return (source_width, source_height), decode_width
+
+def reduce_decoded(img, decode_width):
+    """Box-reduce a decoded image by a whole factor while it stays at least decode_width wide"""
+    factor = img.width // decode_width
+    return img.reduce(factor) if factor > 1 else img
+
+def estimate_memory(input_path, width, ladder=None):
+    """Bytes a thumbnail job is expected to hold at its peak, from the image header alone"""
     try:
-        # Use sips (macOS built-in image tool) to resize
-        # --resampleWidth maintains aspect ratio
-        cmd = [
-            'sips',
-            '--resampleWidth', str(width),
-            input_path,
-            '--out', output_path
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-        if result.returncode == 0:
-            return True
+        with Image.open(input_path) as img:
+            prepare_decode(img, width, ladder)
+            return img.width * img.height * BYTES_PER_PIXEL * DECODE_COPIES
+    except Exception:
+        return 0  # create_thumbnail reports files Pillow cannot read
+
+def create_thumbnail(input_path, output_path, width, ladder=None):
+    """Create a thumbnail with specified width, maintaining aspect ratio
+
+    With a ladder ({'widths': [...], 'formats': {...}}) the responsive derivatives are
+    encoded from the same decoded image, as are the lightbox renditions (in the ladder's
+    formats and JPEG). Returns (derivative paths, placeholder), or None on failure.
+    """
+    with build_stats.span(input_path, 'thumbnail', width=width) as details:
+        try:
+            with Image.open(input_path) as img:
+                source_size, decode_width = prepare_decode(img, width, ladder)
+                details['decoded'] = f"{img.width}x{img.height}"
+
+                # Apply camera orientation so the thumbnail matches what browsers show
+                img = reduce_decoded(to_rgb(ImageOps.exif_transpose(img)), decode_width)
+
+                thumbnail = resize_to_width(img, width)
+                derivative_cache.detach(output_path)
+                thumbnail.save(output_path, ENCODER_SETTINGS['format'], quality=ENCODER_SETTINGS['quality'],
+                               optimize=ENCODER_SETTINGS['optimize'], progressive=ENCODER_SETTINGS['progressive'])
+
+                derivatives = []
+                if ladder:
+                    for ladder_width in ladder_widths(source_size[0], ladder['widths']):
+                        resized = thumbnail if ladder_width == width else resize_to_width(img, ladder_width)
+                        for fmt, options in ladder['formats'].items():
+                            path = ladder_path(output_path, ladder_width, fmt)
+                            derivative_cache.detach(path)
+                            resized.save(path, fmt.upper(), **options)
+                            derivatives.append(path)
+
+                for edge, lightbox_width in lightbox_sizes(source_size):
+                    resized = resize_to_width(img, lightbox_width)
+                    for extension, (fmt, options) in lightbox_formats(ladder).items():
+                        path = lightbox_path(output_path, edge, extension)
+                        derivative_cache.detach(path)
+                        resized.save(path, fmt, **options)
+                        derivatives.append(path)
+
+                placeholder = create_placeholder(thumbnail)
+
+            details['bytes_read'] = os.path.getsize(input_path)
+            details['bytes_written'] = sum(os.path.getsize(path) for path in [output_path] + derivatives)
+            build_stats.count('bytes_read', details['bytes_read'])
+            build_stats.count('bytes_written', details['bytes_written'])
+            return derivatives, placeholder
+
+        except Exception as e:
+            print(f"  Exception: {input_path}: {e}")
+            return None
+
+def available_formats(formats):
+    """Drop ladder formats this Pillow build cannot encode (AVIF needs Pillow 11.3+)"""
+    available = {}
+    for fmt, options in formats.items():
+        if features.check(fmt):
+            available[fmt] = options
         else:
-            print(f"  Error: {result.stderr}")
-            return False
+            print(f"Warning: Pillow has no {fmt.upper()} support, skipping {fmt} derivatives")
+    return available
+
+def load_manifest(path=MANIFEST_FILE):
+    """Load the build manifest (source path -> entry), or an empty one if there is none yet"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('sources', {})
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    """Write the build manifest atomically so an interrupted run never leaves it half-written"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'sources': manifest}, f, indent=1, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def encoder_settings(ladder=None):
+    """Settings a build with this ladder encodes with, as recorded in the manifest and cache keys"""
+    return dict(ENCODER_SETTINGS, ladder=ladder)
+
+def rebuild_reason(entry, fingerprint, output_path, width, settings):
+    """Why a manifest entry no longer describes the thumbnail we want to build (None if it does)"""
+    if entry is None:
+        return 'new'
+    if entry.get('hash') != fingerprint['hash']:
+        return 'source changed'
+    if entry.get('output') != output_path or entry.get('width') != width:
+        return 'position changed'
+    if entry.get('encoder') != settings:
+        return 'encoder changed'
+    if not os.path.exists(output_path) or not all(os.path.exists(path) for path in entry.get('derivatives', [])):
+        return 'missing output'
+    return None
+
+def cache_key(fingerprint, width, settings):
+    """Derivative cache key of a thumbnail job (source, width, encoder, ladder and placeholder settings)"""
+    return derivative_cache.cache_key(fingerprint['hash'], 'thumbnail', {
+        'width': width,
+        'encoder': settings,
+        'placeholder': [PLACEHOLDER_WIDTH, PLACEHOLDER_QUALITY, PLACEHOLDER_COLORS],
+    })
 
-    except Exception as e:
-        print(f"  Exception: {e}")
-        return False
+def restore_job(job, settings):
+    """Publish a job's outputs from the derivative cache; returns (derivatives, placeholder), or None on a miss"""
+    input_path, output_path, width, fingerprint = job
+    base_path = thumbnail_base(output_path)
+    meta = derivative_cache.restore(cache_key(fingerprint, width, settings), base_path)
+    if meta is None:
+        return None
+    return [f"{base_path}{name}" for name in meta['files'][1:]], meta['placeholder']
 
-def process_folder(folder_path):
-    """Process all images in a folder"""
+def is_up_to_date(entry, fingerprint, output_path, width, settings):
+    """Check whether a manifest entry still describes the thumbnail we want to build"""
+    return rebuild_reason(entry, fingerprint, output_path, width, settings) is None
+
+def remove_output(path):
+    """Delete a thumbnail this script built earlier, if it is still there"""
+    if os.path.exists(path):
+        os.remove(path)
+        print(f"  Removed stale thumbnail: {path}")
+
+def plan_folder(folder_path, manifest=None, force=False, settings=None):
+    """List the thumbnail jobs for a folder as (input_path, output_path, width, fingerprint) tuples
+
+    Images whose manifest entry still matches the encoder settings (default: no ladder) are
+    skipped, and images the derivative cache has outputs for are restored from it (unless
+    forced). When an image stops being the last one in its folder (or becomes it), its
+    previous thumbnail is removed.
+    """
+    manifest = manifest if manifest is not None else {}
+    settings = settings if settings is not None else encoder_settings()
     image_files = get_image_files(folder_path)
 
     if not image_files:
-        return 0
+        return []
 
     folder_name = os.path.basename(folder_path)
-    print(f"\nProcessing folder: {folder_name} ({len(image_files)} images)")
-
-    processed = 0
+    jobs = []
+    log_lines = []
 
     for i, image_file in enumerate(image_files):
         is_last = (i == len(image_files) - 1)
@@ -79,43 +349,175 @@ def process_folder(folder_path):
         thumb_name = f"{base_name}{suffix}"
         output_path = os.path.join(folder_path, thumb_name)
 
-        # Create thumbnail
+        entry = manifest.get(input_path)
+        fingerprint = source_fingerprint(input_path, entry)
+
+        reason = 'forced' if force else rebuild_reason(entry, fingerprint, output_path, thumb_size, settings)
+        # Thumbnails built before placeholders existed get one from the existing file, or are
+        # rebuilt when that file cannot be read
+        if reason is None and 'placeholder' not in entry:
+            try:
+                with Image.open(output_path) as thumbnail:
+                    entry['placeholder'] = create_placeholder(to_rgb(thumbnail))
+            except (OSError, Image.UnidentifiedImageError):
+                reason = 'missing placeholder'
+
+        if reason is None:
+            build_stats.count('thumbnails.cache.hit')
+            # Refresh size/mtime so the next run does not have to hash this file again
+            entry.update(fingerprint)
+            continue
+
+        build_stats.count('thumbnails.cache.miss')
+        build_stats.rebuild(output_path, reason)
+
+        # The "last image" moved: drop the thumbnail built for the old position
+        if entry and entry.get('output') not in (None, output_path):
+            remove_output(entry['output'])
+
         size_label = "LAST" if is_last else "regular"
-        print(f"  [{i+1}/{len(image_files)}] {image_file} -> {thumb_name} ({thumb_size}px, {size_label})")
+        job = (input_path, output_path, thumb_size, fingerprint)
+        restored = None if force else restore_job(job, settings)
+        if restored is not None:
+            record_jobs(manifest, [(job, restored)], settings)
+            log_lines.append(f"  [{i+1}/{len(image_files)}] {image_file} -> {thumb_name} (restored from cache)")
+            continue
 
-        if create_thumbnail(input_path, output_path, thumb_size):
-            processed += 1
-        else:
-            print(f"    Failed to create thumbnail")
+        log_lines.append(f"  [{i+1}/{len(image_files)}] {image_file} -> {thumb_name} ({thumb_size}px, {size_label})")
+        jobs.append(job)
 
-    return processed
+    if log_lines:
+        print(f"\nProcessing folder: {folder_name} ({len(log_lines)} of {len(image_files)} images changed)")
+        print("\n".join(log_lines))
 
-def main():
-    """Main function to process all gallery folders"""
-    print("=" * 60)
-    print("Portfolio Thumbnail Generator")
-    print("=" * 60)
-    print(f"Regular thumbnails: {THUMBNAIL_SIZE}px width")
-    print(f"Last image thumbnails: {LAST_IMAGE_SIZE}px width")
-    print(f"Gallery base: {GALLERY_BASE}")
+    return jobs
 
-    if not os.path.exists(GALLERY_BASE):
-        print(f"\nError: Gallery base directory not found: {GALLERY_BASE}")
-        return
+def remove_orphans(manifest, seen_sources):
+    """Delete thumbnails whose source image is gone, and forget them in the manifest"""
+    removed = 0
 
-    total_processed = 0
-    total_folders = 0
+    for input_path in sorted(set(manifest) - seen_sources):
+        entry = manifest.pop(input_path)
+        for path in [entry['output']] + entry.get('derivatives', []):
+            remove_output(path)
+        removed += 1
+
+    return removed
+
+def worker_context():
+    """Start workers from a fresh server process, never by forking this one
+
+    build.py runs stages in threads; forking while another thread holds a lock (Pillow's,
+    stdio's) can leave the worker deadlocked.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+def plan_memory(jobs, ladder=None, memory_limit=None):
+    """Pair each job with its expected peak memory, leaving out (and reporting) jobs over the limit
+
+    A source whose decode alone would not fit in memory_limit MB (a huge PNG, which cannot
+    be decoded at reduced size) is never started, rather than risking the machine's memory.
+    """
+    limit = (memory_limit or MEMORY_LIMIT_MB) * 1024 * 1024
+    planned = []
+    for job in jobs:
+        cost = estimate_memory(job[0], job[2], ladder)
+        if cost > limit:
+            build_stats.count('thumbnails.over_memory_limit')
+            print(f"    ✗ Skipped {job[0]}: decoding it needs about {cost / (1024 * 1024):.0f} MB, "
+                  f"over the --memory-limit of {limit // (1024 * 1024)} MB")
+            continue
+        planned.append((job, cost))
+    return planned
+
+def run_jobs(jobs, workers=None, ladder=None, memory_limit=None):
+    """Create thumbnails for all jobs, spread across a process pool
+
+    No job may need more than memory_limit MB, and jobs start only while the memory they
+    are expected to need fits in the pool budget (workers x memory_limit MB).
+    Returns (job, (derivatives, placeholder)) pairs for the jobs that succeeded.
+    """
+    workers = workers or os.cpu_count() or 1
+    succeeded = []
+    pending = plan_memory(jobs, ladder, memory_limit)
+
+    # A pool only pays off when there is more than one job to share out
+    if workers == 1 or len(pending) <= 1:
+        for job, _cost in pending:
+            result = create_thumbnail(*job[:3], ladder)
+            if result is not None:
+                succeeded.append((job, result))
+            else:
+                print(f"    Failed to create thumbnail: {job[1]}")
+        return succeeded
+
+    budget = workers * (memory_limit or MEMORY_LIMIT_MB) * 1024 * 1024
+    running = {}
+    in_use = 0
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=worker_context()) as executor:
+        while pending or running:
+            # Start whatever fits in the memory left, in order, letting smaller jobs go ahead
+            for job, cost in list(pending):
+                if len(running) >= workers:
+                    break
+                if running and in_use + cost > budget:
+                    build_stats.count('thumbnails.memory_waits')
+                    continue
+                pending.remove((job, cost))
+                running[executor.submit(create_thumbnail, *job[:3], ladder)] = (job, cost)
+                in_use += cost
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job, cost = running.pop(future)
+                in_use -= cost
+                result = future.result()
+                if result is not None:
+                    succeeded.append((job, result))
+                else:
+                    print(f"    Failed to create thumbnail: {job[1]}")
+
+    return succeeded
+
+def record_jobs(manifest, succeeded, settings):
+    """Store the fingerprint and outputs of freshly built thumbnails in the manifest"""
+    for (input_path, output_path, width, fingerprint), (derivatives, placeholder) in succeeded:
+        # Derivatives from an earlier build that this one no longer produces are stale
+        previous = manifest.get(input_path, {})
+        for path in set(previous.get('derivatives', [])) - set(derivatives):
+            remove_output(path)
+
+        manifest[input_path] = dict(fingerprint, output=output_path, width=width,
+                                    derivatives=derivatives, placeholder=placeholder, encoder=settings)
 
+def cache_jobs(succeeded, settings):
+    """Add freshly built thumbnails and their derivatives to the derivative cache"""
+    for (input_path, output_path, width, fingerprint), (derivatives, placeholder) in succeeded:
+        derivative_cache.store(cache_key(fingerprint, width, settings), thumbnail_base(output_path),
+                               [output_path] + derivatives, {'placeholder': placeholder})
+
+def process_folder(folder_path, workers=None, manifest=None, force=False, ladder=None, memory_limit=None):
+    """Process all images in a folder, returns the number of thumbnails created"""
+    settings = encoder_settings(ladder)
+    succeeded = run_jobs(plan_folder(folder_path, manifest, force, settings), workers, ladder, memory_limit)
+    if manifest is not None:
+        record_jobs(manifest, succeeded, settings)
+    cache_jobs(succeeded, settings)
+    return len(succeeded)
+
+def iter_gallery_folders(base=GALLERY_BASE):
+    """Yield every folder that holds gallery images (project folders and their sections)"""
     # Iterate through category folders (1-brands, 2-magazines, etc.)
-    for category_folder in sorted(os.listdir(GALLERY_BASE)):
-        category_path = os.path.join(GALLERY_BASE, category_folder)
+    for category_folder in sorted(os.listdir(base)):
+        category_path = os.path.join(base, category_folder)
 
         if not os.path.isdir(category_path) or category_folder.startswith('.'):
             continue
 
-        print(f"\n{'='*60}")
-        print(f"Category: {category_folder}")
-        print(f"{'='*60}")
+        # Projects without subsections keep their images directly in the category folder
+        yield category_path
 
         # Iterate through project folders within each category
         for project_folder in sorted(os.listdir(category_path)):
@@ -124,13 +526,92 @@ def main():
             if not os.path.isdir(project_path) or project_folder.startswith('.'):
                 continue
 
-            processed = process_folder(project_path)
-            total_processed += processed
-            total_folders += 1
+            yield project_path
+
+def ladder_config(widths=None, formats=None):
+    """Responsive ladder settings for the given widths and format names (defaults: all), or None if empty"""
+    widths = sorted(RESPONSIVE_WIDTHS if widths is None else widths)
+    formats = available_formats({fmt: RESPONSIVE_FORMATS[fmt] for fmt in (RESPONSIVE_FORMATS if formats is None else formats)})
+    return {'widths': widths, 'formats': formats} if widths and formats else None
+
+def build_thumbnails(workers=None, force=False, ladder=None, memory_limit=None):
+    """Bring every thumbnail and responsive derivative up to date; returns the number of images processed"""
+    settings = encoder_settings(ladder)
+
+    if not os.path.exists(GALLERY_BASE):
+        print(f"\nError: Gallery base directory not found: {GALLERY_BASE}")
+        return 0
+
+    start_time = time.time()
+    manifest = load_manifest()
+    seen_sources = set()
+    jobs = []
+    total_folders = 0
+
+    with build_stats.stage('thumbnails.plan'):
+        for folder_path in iter_gallery_folders():
+            seen_sources.update(os.path.join(folder_path, f) for f in get_image_files(folder_path))
+            folder_jobs = plan_folder(folder_path, manifest, force, settings)
+            if folder_jobs:
+                jobs.extend(folder_jobs)
+                total_folders += 1
+
+        removed = remove_orphans(manifest, seen_sources)
+
+    with build_stats.stage('thumbnails.encode'):
+        succeeded = run_jobs(jobs, workers, ladder, memory_limit)
+    record_jobs(manifest, succeeded, settings)
+    save_manifest(manifest)
+    cache_jobs(succeeded, settings)
+    evicted, _freed = derivative_cache.prune()
+    elapsed = time.time() - start_time
 
     print("\n" + "=" * 60)
-    print(f"Complete! Processed {total_processed} images across {total_folders} folders")
+    print(f"Complete! Processed {len(succeeded)} images across {total_folders} folders in {elapsed:.1f}s")
+    print(f"Up to date or restored: {len(seen_sources) - len(jobs)}, removed orphaned thumbnails: {removed}, "
+          f"evicted cache entries: {evicted}")
     print("=" * 60)
+    return len(succeeded)
+
+def main():
+    """Main function to process all gallery folders"""
+    parser = argparse.ArgumentParser(description="Generate gallery thumbnails")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: number of CPU cores)")
+    parser.add_argument('--force', action='store_true',
+                        help="rebuild every thumbnail, ignoring the build manifest")
+    parser.add_argument('--widths', default=','.join(str(w) for w in RESPONSIVE_WIDTHS),
+                        help="comma-separated responsive ladder widths (empty to disable)")
+    parser.add_argument('--formats', default=','.join(RESPONSIVE_FORMATS),
+                        help=f"comma-separated responsive ladder formats ({', '.join(RESPONSIVE_FORMATS)})")
+    parser.add_argument('--memory-limit', type=int, default=MEMORY_LIMIT_MB, metavar='MB',
+                        help=f"memory ceiling per image for decoded bitmaps; the pool budget is workers x this "
+                             f"(default: {MEMORY_LIMIT_MB})")
+    build_stats.add_arguments(parser)
+    args = parser.parse_args()
+    build_stats.start(args.stats, args.trace)
+
+    try:
+        widths = [int(w) for w in args.widths.split(',') if w.strip()]
+    except ValueError:
+        parser.error(f"invalid --widths: {args.widths}")
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in RESPONSIVE_FORMATS]
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(unknown)}")
+    ladder = ladder_config(widths, formats)
+
+    print("=" * 60)
+    print("Portfolio Thumbnail Generator")
+    print("=" * 60)
+    print(f"Regular thumbnails: {THUMBNAIL_SIZE}px width")
+    print(f"Last image thumbnails: {LAST_IMAGE_SIZE}px width")
+    print(f"Gallery base: {GALLERY_BASE}")
+    print(f"Responsive ladder: {', '.join(map(str, widths)) or 'off'}px in {', '.join(ladder['formats']) if ladder else 'no formats'}")
+    print(f"Workers: {args.workers} ({args.memory_limit} MB per image, {args.workers * args.memory_limit} MB pool budget)")
+
+    build_thumbnails(args.workers, args.force, ladder, args.memory_limit)
+    build_stats.finish()
 
 if __name__ == "__main__":
     main()
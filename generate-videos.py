@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Video Generator for Portfolio Gallery
+Probes every gallery video once with ffprobe, then uses ffmpeg (from PATH) to pull
+poster frames at each width the layout uses, encode bitrate-capped web renditions and
+cut a short silent preview loop. Animated GIFs get a poster and muted looping
+renditions, which the pages play in place of the GIF. A build manifest skips sources
+that have not changed, and the derivative cache restores outputs encoded before.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import build_stats
+import derivative_cache
+from gallery_media import GALLERY_BASE, is_animated_gif, is_video_file, source_fingerprint
+
+# Configuration
+MANIFEST_FILE = ".build-cache/videos.json"
+
+# Posters by file suffix and width; the site generator uses _thumb1000.jpg for the first
+# item of a custom-layout section and _thumb.jpg everywhere else
+POSTER_WIDTHS = {
+    '_thumb.jpg': 600,
+    '_thumb1000.jpg': 1000,
+}
+POSTER_QUALITY = 2  # ffmpeg JPEG qscale (2 = best)
+
+# Web renditions (<name>_thumb<width>.<extension>), never wider than the source. Each
+# codec is listed in the page as a <source> in this order, so the best-compressed one
+# a browser supports wins and H.264 is the fallback
+RENDITION_WIDTH = 1000
+VIDEO_CODECS = {
+    'av1': {
+        'extension': 'av1.mp4',
+        'type': 'video/mp4; codecs=av01.0.05M.08',
+        'video': ['-c:v', 'libsvtav1', '-crf', '35', '-preset', '8', '-maxrate', '1500k', '-bufsize', '3M'],
+        'audio': ['-c:a', 'aac', '-b:a', '128k'],
+        'container': ['-movflags', '+faststart'],
+    },
+    'vp9': {
+        'extension': 'webm',
+        'type': 'video/webm; codecs=vp9',
+        'video': ['-c:v', 'libvpx-vp9', '-crf', '34', '-b:v', '1500k', '-row-mt', '1', '-deadline', 'good', '-cpu-used', '2'],
+        'audio': ['-c:a', 'libopus', '-b:a', '96k'],
+        'container': [],
+    },
+    'h264': {
+        'extension': 'mp4',
+        'type': 'video/mp4',
+        'video': ['-c:v', 'libx264', '-preset', 'slow', '-crf', '23', '-maxrate', '2M', '-bufsize', '4M',
+                  '-profile:v', 'high'],
+        'audio': ['-c:a', 'aac', '-b:a', '128k'],
+        'container': ['-movflags', '+faststart'],
+    },
+}
+DEFAULT_CODECS = ['vp9', 'h264']  # AV1 encodes are slow; opt in with --codecs av1,vp9,h264
+
+# Short silent loop cut from the middle of the video, for videos that autoplay in the grid
+PREVIEW_SUFFIX = '_thumbpreview.mp4'
+PREVIEW_WIDTH = 480
+PREVIEW_SECONDS = 4
+PREVIEW_ENCODER = ['-c:v', 'libx264', '-preset', 'slow', '-crf', '28', '-maxrate', '600k', '-bufsize', '1200k',
+                   '-an', '-movflags', '+faststart']
+
+# Transparent GIF pixels are flattened onto this color, like thumbnails are
+GIF_BACKGROUND = 'white'
+
+# Encoder settings are stored with every manifest entry; changing them rebuilds all videos
+ENCODER_SETTINGS = {
+    'posters': POSTER_WIDTHS,
+    'poster_quality': POSTER_QUALITY,
+    'rendition_width': RENDITION_WIDTH,
+    'preview': [PREVIEW_WIDTH, PREVIEW_SECONDS, PREVIEW_ENCODER],
+    'gif_background': GIF_BACKGROUND,
+}
+
+def find_tools():
+    """Paths of ffmpeg and ffprobe on PATH, or None if either is missing"""
+    ffmpeg, ffprobe = shutil.which('ffmpeg'), shutil.which('ffprobe')
+    return (ffmpeg, ffprobe) if ffmpeg and ffprobe else None
+
+def probe_video(ffprobe, path):
+    """Duration, display size and whether there is an audio track, from a single ffprobe call"""
+    build_stats.count('subprocesses')
+    result = subprocess.run([ffprobe, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+                            capture_output=True, text=True, check=True)
+    info = json.loads(result.stdout)
+    video = next(stream for stream in info['streams'] if stream.get('codec_type') == 'video')
+
+    width, height = int(video['width']), int(video['height'])
+    rotation = int(video.get('tags', {}).get('rotate', 0))
+    for side_data in video.get('side_data_list', []):
+        rotation = int(side_data.get('rotation', rotation))
+    if rotation % 180:
+        width, height = height, width
+
+    return {
+        'duration': float(info['format'].get('duration') or video.get('duration') or 0),
+        'width': width,
+        'height': height,
+        'audio': any(stream.get('codec_type') == 'audio' for stream in info['streams']),
+    }
+
+def scale_filter(width, source_width):
+    """ffmpeg scale filter for a target width (never upscaling, even height for the encoders)"""
+    return f"scale={min(width, source_width)}:-2"
+
+def output_paths(source_path, codecs):
+    """Every file built for a source: posters, renditions and (for videos) the preview loop"""
+    base_path = source_path.rsplit('.', 1)[0]
+    paths = [f"{base_path}{suffix}" for suffix in POSTER_WIDTHS]
+    paths += [f"{base_path}_thumb{RENDITION_WIDTH}.{VIDEO_CODECS[codec]['extension']}" for codec in codecs]
+    if is_video_file(source_path):
+        paths.append(f"{base_path}{PREVIEW_SUFFIX}")
+    return paths
+
+def split_filter(probe, count, label):
+    """Filtergraph feeding input 0 into `count` outputs [<label>0], [<label>1], ...
+
+    GIF frames are first laid over a solid background, since the encoders drop transparency.
+    """
+    if probe['gif']:
+        source = f"color=c={GIF_BACKGROUND}:s={probe['width']}x{probe['height']}[bg];[bg][0:v]overlay=shortest=1"
+    else:
+        source = "[0:v]null"
+    return f"{source},split={count}" + ''.join(f"[{label}{i}]" for i in range(count))
+
+def build_video(ffmpeg, source_path, probe, codecs):
+    """Build a source's posters, renditions and preview; returns the paths written, or None on failure"""
+    base_path = source_path.rsplit('.', 1)[0]
+    outputs = output_paths(source_path, codecs)
+    with_preview = outputs[-1].endswith(PREVIEW_SUFFIX)
+
+    # Posters: one seek and decode, split to every width. GIFs show their first frame
+    # until they start playing, so that is their poster; videos use the middle frame
+    poster_time = 0 if probe['gif'] else probe['duration'] / 2
+    poster_outputs = []
+    filters = [split_filter(probe, len(POSTER_WIDTHS), 'p')]
+    for i, (suffix, width) in enumerate(POSTER_WIDTHS.items()):
+        filters.append(f"[p{i}]{scale_filter(width, probe['width'])}[o{i}]")
+        poster_outputs += ['-map', f"[o{i}]", '-frames:v', '1', '-q:v', str(POSTER_QUALITY), f"{base_path}{suffix}"]
+    poster_command = [ffmpeg, '-v', 'error', '-y', '-ss', f"{poster_time:.3f}", '-i', source_path,
+                      '-filter_complex', ';'.join(filters)] + poster_outputs
+
+    # Renditions and preview: one decode of the whole source feeding every encoder
+    filters = [split_filter(probe, len(codecs) + with_preview, 'r')]
+    encode_outputs = []
+    for i, codec in enumerate(codecs):
+        settings = VIDEO_CODECS[codec]
+        filters.append(f"[r{i}]{scale_filter(RENDITION_WIDTH, probe['width'])},format=yuv420p[e{i}]")
+        encode_outputs += ['-map', f"[e{i}]"] + (['-map', '0:a:0'] if probe['audio'] else [])
+        encode_outputs += settings['video'] + (settings['audio'] if probe['audio'] else ['-an']) + settings['container']
+        encode_outputs.append(f"{base_path}_thumb{RENDITION_WIDTH}.{settings['extension']}")
+    if with_preview:
+        middle = probe['duration'] / 2
+        filters.append(f"[r{len(codecs)}]{scale_filter(PREVIEW_WIDTH, probe['width'])},format=yuv420p[preview]")
+        encode_outputs += ['-map', '[preview]', '-ss', f"{max(0.0, middle - PREVIEW_SECONDS / 2):.3f}",
+                           '-t', str(PREVIEW_SECONDS)] + PREVIEW_ENCODER + [f"{base_path}{PREVIEW_SUFFIX}"]
+    encode_command = [ffmpeg, '-v', 'error', '-y', '-i', source_path,
+                      '-filter_complex', ';'.join(filters)] + encode_outputs
+
+    for path in outputs:
+        derivative_cache.detach(path)
+
+    for command in (poster_command, encode_command):
+        build_stats.count('subprocesses')
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"  ✗ {source_path}: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'ffmpeg failed'}")
+            return None
+
+    return outputs
+
+def load_manifest(path=MANIFEST_FILE):
+    """Load the build manifest (source path -> entry), or an empty one if there is none yet"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('sources', {})
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    """Write the build manifest atomically so an interrupted run never leaves it half-written"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'sources': manifest}, f, indent=1, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def rebuild_reason(entry, fingerprint, outputs, settings):
+    """Why a manifest entry no longer describes the outputs we want to build (None if it does)"""
+    if entry is None:
+        return 'new'
+    if entry.get('hash') != fingerprint['hash']:
+        return 'source changed'
+    if entry.get('encoder') != settings or entry.get('outputs') != outputs:
+        return 'encoder changed'
+    if not all(os.path.exists(path) for path in outputs):
+        return 'missing output'
+    return None
+
+def remove_output(path):
+    """Delete a file this script built earlier, if it is still there"""
+    if os.path.exists(path):
+        os.remove(path)
+        print(f"  Removed stale output: {path}")
+
+def iter_gallery_sources(base=GALLERY_BASE):
+    """Yield every original video and animated GIF under the gallery, in a stable order"""
+    for folder, dirs, files in os.walk(base):
+        dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+        for name in sorted(files):
+            path = f"{folder}/{name}"
+            if is_video_file(name) or is_animated_gif(path):
+                yield path
+
+def process_video(tools, video_path, entry, codecs, settings, force):
+    """Bring one video's outputs up to date; returns (manifest entry, built)"""
+    ffmpeg, ffprobe = tools
+    fingerprint = source_fingerprint(video_path, entry)
+    outputs = output_paths(video_path, codecs)
+
+    reason = 'forced' if force else rebuild_reason(entry, fingerprint, outputs, settings)
+    if reason is None:
+        build_stats.count('videos.cache.hit')
+        return dict(entry, **fingerprint), False
+    build_stats.count('videos.cache.miss')
+    build_stats.rebuild(video_path, reason)
+
+    base_path = video_path.rsplit('.', 1)[0]
+    key = derivative_cache.cache_key(fingerprint['hash'], 'video', settings)
+    meta = None if force else derivative_cache.restore(key, base_path)
+    if meta is not None:
+        print(f"  → {video_path} (restored from cache)")
+        restored = [f"{base_path}{name}" for name in meta['files']]
+        for path in set((entry or {}).get('outputs', [])) - set(restored):
+            remove_output(path)
+        return dict(fingerprint, probe=meta['probe'], outputs=restored, encoder=settings), False
+
+    try:
+        probe = dict(probe_video(ffprobe, video_path), gif=video_path.lower().endswith('.gif'))
+    except (subprocess.CalledProcessError, StopIteration, KeyError, ValueError) as e:
+        print(f"  ✗ {video_path}: could not probe ({e})")
+        return entry, False
+
+    print(f"  → {video_path} ({probe['width']}x{probe['height']}, {probe['duration']:.1f}s"
+          f"{', audio' if probe['audio'] else ''})")
+    with build_stats.span(video_path, 'video', duration=probe['duration']) as details:
+        written = build_video(ffmpeg, video_path, probe, codecs)
+        if written:
+            details['bytes_written'] = sum(os.path.getsize(path) for path in written if os.path.exists(path))
+            build_stats.count('bytes_written', details['bytes_written'])
+    if written is None:
+        return entry, False
+    derivative_cache.store(key, base_path, written, {'probe': probe})
+
+    # Renditions from an earlier build that this one no longer produces are stale
+    for path in set((entry or {}).get('outputs', [])) - set(written):
+        remove_output(path)
+
+    return dict(fingerprint, probe=probe, outputs=written, encoder=settings), True
+
+def build_videos(workers=None, force=False, codecs=None):
+    """Bring every video's and animated GIF's outputs up to date; returns the number of sources built"""
+    codecs = [codec for codec in VIDEO_CODECS if codec in (codecs or DEFAULT_CODECS)]
+    settings = dict(ENCODER_SETTINGS, codecs={codec: VIDEO_CODECS[codec] for codec in codecs})
+
+    if not os.path.exists(GALLERY_BASE):
+        print(f"\nError: Gallery base directory not found: {GALLERY_BASE}")
+        return 0
+
+    tools = find_tools()
+    if tools is None:
+        print("Warning: ffmpeg/ffprobe not found on PATH, skipping videos")
+        print("Install with: brew install ffmpeg (or your package manager)")
+        return 0
+
+    start_time = time.time()
+    manifest = load_manifest()
+    videos = list(iter_gallery_sources())
+
+    # ffmpeg is already multi-threaded, so only a few videos are encoded at once
+    workers = max(1, min(workers or 2, 2, len(videos)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda path: process_video(tools, path, manifest.get(path), codecs, settings, force),
+                                    videos))
+
+    built = 0
+    for video_path, (entry, was_built) in zip(videos, results):
+        if entry is not None:
+            manifest[video_path] = entry
+        built += was_built
+
+    removed = 0
+    for video_path in sorted(set(manifest) - set(videos)):
+        for path in manifest.pop(video_path).get('outputs', []):
+            remove_output(path)
+        removed += 1
+
+    save_manifest(manifest)
+    derivative_cache.prune()
+    elapsed = time.time() - start_time
+
+    print(f"✓ Videos: built {built}, up to date {len(videos) - built}, removed {removed} in {elapsed:.1f}s")
+    return built
+
+def main():
+    """Build posters, renditions and previews for every gallery video and animated GIF"""
+    parser = argparse.ArgumentParser(description="Generate gallery video posters, web renditions, preview loops "
+                                                 "and looping renditions of animated GIFs")
+    parser.add_argument('--workers', type=int, default=2, help="videos encoded at the same time (default: 2)")
+    parser.add_argument('--force', action='store_true', help="rebuild every video, ignoring the build manifest")
+    parser.add_argument('--codecs', default=','.join(DEFAULT_CODECS),
+                        help=f"comma-separated rendition codecs ({', '.join(VIDEO_CODECS)}; default: {','.join(DEFAULT_CODECS)})")
+    build_stats.add_arguments(parser)
+    args = parser.parse_args()
+    build_stats.start(args.stats, args.trace)
+
+    codecs = [codec.strip() for codec in args.codecs.split(',') if codec.strip()]
+    unknown = [codec for codec in codecs if codec not in VIDEO_CODECS]
+    if unknown:
+        parser.error(f"unknown codec(s): {', '.join(unknown)}")
+
+    print("=" * 60)
+    print("Portfolio Video Generator")
+    print("=" * 60)
+    build_videos(args.workers, args.force, codecs)
+    build_stats.finish()
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,64 @@
 // Homepage cover image rotation
 (function() {
-    // Map project IDs to gallery data keys
-    const projectMapping = {
-        'brands': '1-brands',
-        'magazines': '2-magazines',
-        'prints': '3-print',
-        'digital': '4-digital',
-        'logos': '5-logos',
-        'illustration': '6-illustrations',
-        'animation': '7-animation',
-        'unsorted': '8-unsorted'
-    };
+    // Cover pools per project (thumbnail, size and placeholder), inlined into index.html by the build
+    const manifestElement = document.getElementById('homepage-covers');
+    if (!manifestElement) return;
 
-    // Store all images for each project
-    const projectImages = {};
-
-    // Get random image from array, using thumbnails for better performance
-    function getRandomImage(images, projectId) {
-        const imageFiles = [];
-
-        images.forEach(img => {
-            const ext = img.toLowerCase().split('.').pop();
-
-            // Convert regular images to thumbnail paths
-            if (['jpg', 'jpeg', 'png', 'gif'].includes(ext)) {
-                const thumbnailPath = img.replace(/\.(jpg|jpeg|png|gif)$/i, '_thumb.jpg');
-                imageFiles.push(thumbnailPath);
-            }
-            // For animation project, convert video files to thumbnail paths
-            else if (projectId === 'animation' && ext === 'mp4') {
-                const thumbnailPath = img.replace('.mp4', '_thumb.jpg');
-                imageFiles.push(thumbnailPath);
-            }
-        });
+    let projectCovers;
+    try {
+        projectCovers = JSON.parse(manifestElement.textContent);
+    } catch (error) {
+        console.error('Error reading homepage covers:', error);
+        return;
+    }
 
-        if (imageFiles.length === 0) return null;
-        return imageFiles[Math.floor(Math.random() * imageFiles.length)];
+    // Get a random cover from the pool, other than the one showing
+    function getRandomCover(covers, currentSrc) {
+        const candidates = covers.filter(cover => cover.src !== currentSrc);
+        if (candidates.length === 0) return null;
+        return candidates[Math.floor(Math.random() * candidates.length)];
     }
 
     // Change cover image for a specific project with dissolve effect
     function changeCoverImage(projectId, imgElement) {
-        const images = projectImages[projectId];
-        if (!images || images.length === 0) return;
+        const covers = projectCovers[projectId];
+        if (!covers || covers.length === 0) return;
+
+        const cover = getRandomCover(covers, imgElement.getAttribute('src'));
+        if (cover) {
+            // Start downloading while the old cover fades out
+            new Image().src = cover.src;
 
-        const newImage = getRandomImage(images, projectId);
-        if (newImage) {
             // Fade out
             imgElement.style.opacity = '0';
 
             // Change image and fade in after transition
             setTimeout(() => {
-                imgElement.src = newImage;
+                imgElement.width = cover.width;
+                imgElement.height = cover.height;
+                imgElement.style.background = cover.color
+                    ? `${cover.color} url(${cover.lqip}) center / cover no-repeat`
+                    : '';
+                imgElement.src = cover.src;
                 imgElement.style.opacity = '1';
             }, 1500); // Wait for fade out to complete
         }
     }
 
-    // Load gallery data and set up rotation
-    fetch('gallery-data.json')
-        .then(response => response.json())
-        .then(data => {
-            // Collect all images for each project
-            Object.entries(projectMapping).forEach(([projectId, galleryKey]) => {
-                const project = data.projects[galleryKey];
-                if (!project) return;
-
-                const allImages = [];
-                Object.values(project.sections).forEach(section => {
-                    if (section.images) {
-                        allImages.push(...section.images);
-                    }
-                });
-
-                projectImages[projectId] = allImages;
-            });
-
-            // Set up rotation for each cover
-            const projectItems = document.querySelectorAll('.project-item');
-            projectItems.forEach((item, index) => {
-                const link = item.querySelector('a');
-                const img = item.querySelector('.project-thumbnail img');
-
-                if (!link || !img) return;
+    // Set up rotation for each cover
+    const projectItems = document.querySelectorAll('.project-item');
+    projectItems.forEach(item => {
+        const img = item.querySelector('.project-thumbnail img');
+        if (!item.querySelector('a') || !img) return;
 
-                // Extract project ID from item's id attribute or data-category
-                const projectId = item.id || item.getAttribute('data-category');
-                if (!projectId) return;
+        // Covers are keyed by the item's category (items without an id share their category's pool)
+        const projectId = item.getAttribute('data-category') || item.id;
+        if (!projectId) return;
 
-                // Change image every 5-30 seconds (random interval per cover)
-                const interval = 5000 + Math.random() * 25000;
-                setInterval(() => {
-                    changeCoverImage(projectId, img);
-                }, interval);
-            });
-        })
-        .catch(error => {
-            console.error('Error loading gallery data:', error);
-        });
+        // Change image every 5-30 seconds (random interval per cover)
+        const interval = 5000 + Math.random() * 25000;
+        setInterval(() => {
+            changeCoverImage(projectId, img);
+        }, interval);
+    });
 })();
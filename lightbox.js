@@ -1,9 +1,20 @@
 // Lightbox functionality for static portfolio site
-// lightboxImages is defined by the HTML page before this script loads
+// Pages pass either the URL of their lightbox data file (fetched on first open)
+// or, on older pages, the image array itself
+var lightboxImages = null;
+let lightboxDataUrl = null;
+let lightboxDataRequest = null;
 let currentLightboxIndex = 0;
 
+// Images built ahead of time for the entries next to the open one, by index
+const lightboxPrefetched = {};
+
 function initLightbox(images) {
-    lightboxImages = images;
+    if (typeof images === 'string') {
+        lightboxDataUrl = images;
+    } else {
+        lightboxImages = images;
+    }
 
     const lightbox = document.getElementById('lightbox');
     const lightboxImage = document.getElementById('lightboxImage');
@@ -13,128 +24,7 @@ function initLightbox(images) {
     const lightboxNext = document.getElementById('lightboxNext');
 
     // Add click handlers to all image wrappers
-    document.querySelectorAll('.gallery-image-wrapper').forEach(wrapper => {
-        const isAnimationVideo = wrapper.classList.contains('animation-video');
-        const video = wrapper.querySelector('video');
-        const soundBtn = wrapper.querySelector('.sound-toggle-btn');
-
-        // Skip if no data-index (lightbox disabled for this element)
-        if (!wrapper.hasAttribute('data-index')) {
-            return;
-        }
-
-        // Click to open lightbox
-        wrapper.addEventListener('click', function(e) {
-            // Don't open lightbox if clicking the sound button
-            if (e.target.closest('.sound-toggle-btn')) {
-                return;
-            }
-            const index = parseInt(this.getAttribute('data-index'));
-            openLightbox(index);
-        });
-
-        // Add hover play/pause for videos
-        if (video) {
-            let audioCheckDone = false;
-
-            // Quick initial check on metadata
-            video.addEventListener('loadedmetadata', function() {
-                checkVideoAudio();
-            });
-
-            // Check for audio tracks
-            const checkVideoAudio = () => {
-                let hasAudio = false;
-
-                // Method 1: Check audioTracks API
-                if (video.audioTracks && video.audioTracks.length > 0) {
-                    hasAudio = true;
-                }
-                // Method 2: Mozilla-specific property
-                else if (typeof video.mozHasAudio !== 'undefined') {
-                    hasAudio = video.mozHasAudio;
-                }
-                // Method 3: Webkit - assume has audio and verify during playback
-                else if (typeof video.webkitAudioDecodedByteCount !== 'undefined') {
-                    hasAudio = true; // Optimistic for webkit, will verify on play
-                }
-
-                video.setAttribute('data-has-audio', hasAudio ? 'true' : 'false');
-                audioCheckDone = true;
-            };
-
-            // Double-check for webkit browsers after brief playback
-            video.addEventListener('playing', function checkWebkitAudio() {
-                setTimeout(() => {
-                    if (typeof video.webkitAudioDecodedByteCount !== 'undefined') {
-                        const hasAudio = video.webkitAudioDecodedByteCount > 0;
-                        video.setAttribute('data-has-audio', hasAudio ? 'true' : 'false');
-
-                        // Update button visibility if it's currently shown
-                        if (soundBtn && soundBtn.style.display === 'flex' && !hasAudio) {
-                            soundBtn.style.display = 'none';
-                        }
-                    }
-                }, 100);
-                video.removeEventListener('playing', checkWebkitAudio);
-            });
-
-            // Hover behavior for animation videos
-            if (isAnimationVideo) {
-                const hasAutoplay = video.hasAttribute('autoplay');
-
-                wrapper.addEventListener('mouseenter', () => {
-                    // Only start playing if not autoplay (autoplay videos are already playing)
-                    if (!hasAutoplay) {
-                        video.play();
-                    }
-
-                    // If audio check not done yet, do it now
-                    if (!audioCheckDone) {
-                        checkVideoAudio();
-                    }
-
-                    // Show sound button if video has audio
-                    if (soundBtn && video.getAttribute('data-has-audio') === 'true') {
-                        soundBtn.style.display = 'flex';
-                    }
-                });
-                wrapper.addEventListener('mouseleave', () => {
-                    // Only pause if not autoplay (autoplay videos should keep playing)
-                    if (!hasAutoplay) {
-                        video.pause();
-                    }
-                    if (soundBtn) {
-                        soundBtn.style.display = 'none';
-                    }
-                });
-
-                // Sound toggle button handler
-                if (soundBtn) {
-                    soundBtn.addEventListener('click', function(e) {
-                        e.stopPropagation();
-                        const isMuted = video.muted;
-                        video.muted = !isMuted;
-                        this.setAttribute('data-muted', !isMuted);
-                    });
-                }
-
-                // For autoplay videos, check audio immediately and show button if has audio
-                if (hasAutoplay) {
-                    video.addEventListener('loadedmetadata', function checkAutoplayAudio() {
-                        checkVideoAudio();
-                        if (video.getAttribute('data-has-audio') === 'true' && soundBtn) {
-                            soundBtn.style.display = 'flex';
-                        }
-                    }, { once: true });
-                }
-            } else {
-                // Regular hover play/pause for non-animation videos
-                wrapper.addEventListener('mouseenter', () => video.play());
-                wrapper.addEventListener('mouseleave', () => video.pause());
-            }
-        }
-    });
+    document.querySelectorAll('.gallery-image-wrapper').forEach(setupGalleryWrapper);
 
     // Close lightbox
     lightboxClose.addEventListener('click', closeLightbox);
@@ -165,12 +55,14 @@ function initLightbox(images) {
     document.querySelectorAll('.see-more-btn').forEach(btn => {
         btn.addEventListener('click', function() {
             const sectionId = this.getAttribute('data-section');
-            // Show all hidden rows in this section
-            document.querySelectorAll(`.hidden-row[data-section="${sectionId}"]`).forEach(row => {
-                row.classList.remove('hidden-row');
-            });
-            // Hide the button
-            this.parentElement.style.display = 'none';
+            loadSectionFragment(sectionId).then(() => {
+                // Show all hidden rows in this section
+                document.querySelectorAll(`.hidden-row[data-section="${sectionId}"]`).forEach(row => {
+                    row.classList.remove('hidden-row');
+                });
+                // Hide the button
+                this.parentElement.style.display = 'none';
+            }).catch(error => console.log('Could not load more images:', sectionId, error));
         });
     });
 
@@ -209,15 +101,211 @@ function initLightbox(images) {
     }, 100);
 }
 
+function setupGalleryWrapper(wrapper) {
+    const isAnimationVideo = wrapper.classList.contains('animation-video');
+    const video = wrapper.querySelector('video');
+    const soundBtn = wrapper.querySelector('.sound-toggle-btn');
+
+    // Skip if no data-index (lightbox disabled for this element)
+    if (!wrapper.hasAttribute('data-index')) {
+        return;
+    }
+
+    // Click to open lightbox
+    wrapper.addEventListener('click', function(e) {
+        // Don't open lightbox if clicking the sound button
+        if (e.target.closest('.sound-toggle-btn')) {
+            return;
+        }
+        const index = parseInt(this.getAttribute('data-index'));
+        openLightbox(index);
+    });
+
+    // Add hover play/pause for videos
+    if (video) {
+        let audioCheckDone = false;
+
+        // Quick initial check on metadata
+        video.addEventListener('loadedmetadata', function() {
+            checkVideoAudio();
+        });
+
+        // Check for audio tracks
+        const checkVideoAudio = () => {
+            let hasAudio = false;
+
+            // Method 1: Check audioTracks API
+            if (video.audioTracks && video.audioTracks.length > 0) {
+                hasAudio = true;
+            }
+            // Method 2: Mozilla-specific property
+            else if (typeof video.mozHasAudio !== 'undefined') {
+                hasAudio = video.mozHasAudio;
+            }
+            // Method 3: Webkit - assume has audio and verify during playback
+            else if (typeof video.webkitAudioDecodedByteCount !== 'undefined') {
+                hasAudio = true; // Optimistic for webkit, will verify on play
+            }
+
+            video.setAttribute('data-has-audio', hasAudio ? 'true' : 'false');
+            audioCheckDone = true;
+        };
+
+        // Double-check for webkit browsers after brief playback
+        video.addEventListener('playing', function checkWebkitAudio() {
+            setTimeout(() => {
+                if (typeof video.webkitAudioDecodedByteCount !== 'undefined') {
+                    const hasAudio = video.webkitAudioDecodedByteCount > 0;
+                    video.setAttribute('data-has-audio', hasAudio ? 'true' : 'false');
+
+                    // Update button visibility if it's currently shown
+                    if (soundBtn && soundBtn.style.display === 'flex' && !hasAudio) {
+                        soundBtn.style.display = 'none';
+                    }
+                }
+            }, 100);
+            video.removeEventListener('playing', checkWebkitAudio);
+        });
+
+        // Hover behavior for animation videos
+        if (isAnimationVideo) {
+            const hasAutoplay = video.hasAttribute('autoplay');
+
+            wrapper.addEventListener('mouseenter', () => {
+                // Only start playing if not autoplay (autoplay videos are already playing)
+                if (!hasAutoplay) {
+                    video.play();
+                }
+
+                // If audio check not done yet, do it now
+                if (!audioCheckDone) {
+                    checkVideoAudio();
+                }
+
+                // Show sound button if video has audio
+                if (soundBtn && video.getAttribute('data-has-audio') === 'true') {
+                    soundBtn.style.display = 'flex';
+                }
+            });
+            wrapper.addEventListener('mouseleave', () => {
+                // Only pause if not autoplay (autoplay videos should keep playing)
+                if (!hasAutoplay) {
+                    video.pause();
+                }
+                if (soundBtn) {
+                    soundBtn.style.display = 'none';
+                }
+            });
+
+            // Sound toggle button handler
+            if (soundBtn) {
+                soundBtn.addEventListener('click', function(e) {
+                    e.stopPropagation();
+                    const isMuted = video.muted;
+                    video.muted = !isMuted;
+                    this.setAttribute('data-muted', !isMuted);
+                });
+            }
+
+            // For autoplay videos, check audio immediately and show button if has audio
+            if (hasAutoplay) {
+                video.addEventListener('loadedmetadata', function checkAutoplayAudio() {
+                    checkVideoAudio();
+                    if (video.getAttribute('data-has-audio') === 'true' && soundBtn) {
+                        soundBtn.style.display = 'flex';
+                    }
+                }, { once: true });
+            }
+        } else {
+            // Regular hover play/pause for non-animation videos
+            wrapper.addEventListener('mouseenter', () => video.play());
+            wrapper.addEventListener('mouseleave', () => video.pause());
+        }
+    }
+}
+
+// Rows behind a "See more" button may live in a separate fragment (data-fragment);
+// fetch it once, insert its rows as hidden rows and wire them up like the rest
+const sectionFragmentRequests = {};
+
+function loadSectionFragment(sectionId) {
+    const button = document.querySelector(`.see-more-btn[data-section="${sectionId}"][data-fragment]`);
+    if (!button) {
+        return Promise.resolve([]);
+    }
+    if (!sectionFragmentRequests[sectionId]) {
+        sectionFragmentRequests[sectionId] = fetch(button.getAttribute('data-fragment'))
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                return response.text();
+            })
+            .then(html => {
+                const layout = button.closest('.gallery-section').querySelector('.bin-packed-layout');
+                const template = document.createElement('template');
+                template.innerHTML = html;
+                const rows = Array.from(template.content.children);
+
+                layout.appendChild(template.content);
+                button.removeAttribute('data-fragment');
+                rows.forEach(row => row.querySelectorAll('.gallery-image-wrapper').forEach(setupGalleryWrapper));
+                document.dispatchEvent(new CustomEvent('gallery:rowsadded', { detail: { sectionId: sectionId, rows: rows } }));
+                return rows;
+            })
+            .catch(error => {
+                // Allow the next click to retry
+                delete sectionFragmentRequests[sectionId];
+                throw error;
+            });
+    }
+    return sectionFragmentRequests[sectionId];
+}
+
+function loadLightboxImages() {
+    if (lightboxImages) {
+        return Promise.resolve(lightboxImages);
+    }
+    if (!lightboxDataRequest) {
+        lightboxDataRequest = fetch(lightboxDataUrl)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(images => {
+                lightboxImages = images;
+                return images;
+            })
+            .catch(error => {
+                // Allow the next click to retry
+                lightboxDataRequest = null;
+                throw error;
+            });
+    }
+    return lightboxDataRequest;
+}
+
 function openLightbox(index) {
+    if (!lightboxImages) {
+        loadLightboxImages()
+            .then(() => openLightbox(index))
+            .catch(error => console.log('Could not load lightbox data:', lightboxDataUrl, error));
+        return;
+    }
+
     currentLightboxIndex = index;
     const lightbox = document.getElementById('lightbox');
     const lightboxImageWrapper = document.querySelector('.lightbox-image-wrapper');
     const lightboxDescription = document.getElementById('lightboxDescription');
     const currentMedia = lightboxImages[index];
 
-    // Check if this is an animation project video (7-animation in the path)
-    const isAnimationVideo = currentMedia.src.includes('7-animation') && currentMedia.isVideo;
+    // Videos whose media rule hides their description (inline data from older pages: animation project videos)
+    // Looping renditions of animated GIFs keep their description like the GIF did
+    const isAnimationVideo = lightboxDataUrl
+        ? Boolean(currentMedia.hideDescription)
+        : currentMedia.src.includes('7-animation') && currentMedia.isVideo && !currentMedia.gif;
 
     lightbox.classList.add('active');
 
@@ -229,18 +317,22 @@ function openLightbox(index) {
             existingMedia.pause();
             existingMedia.currentTime = 0;
         }
-        existingMedia.remove();
+        (existingMedia.closest('picture') || existingMedia).remove();
     }
 
     if (currentMedia.isVideo) {
         const video = document.createElement('video');
 
-        // Add poster thumbnail
-        const videoPath = currentMedia.src.substring(0, currentMedia.src.lastIndexOf('.'));
+        // Add poster thumbnail (a GIF loop's poster belongs to the original GIF)
+        const posterSource = currentMedia.gif || currentMedia.src;
+        const videoPath = posterSource.substring(0, posterSource.lastIndexOf('.'));
         video.poster = `${videoPath}_thumb.jpg`;
 
         video.id = 'lightboxImage';
-        video.controls = true;
+        // GIF loops behave like the GIF: muted, no controls
+        video.controls = !currentMedia.gif;
+        video.muted = Boolean(currentMedia.gif);
+        video.playsInline = true;
         video.autoplay = true;
         video.loop = true;
         video.style.maxWidth = '100%';
@@ -257,24 +349,9 @@ function openLightbox(index) {
 
         lightboxImageWrapper.insertBefore(video, lightboxDescription);
     } else {
-        const img = document.createElement('img');
-        img.src = currentMedia.src;
-        img.alt = currentMedia.alt;
-        img.id = 'lightboxImage';
-
-        // Check if this is from the prints gallery (3-print in the path)
-        const isPrintsGallery = currentMedia.src.includes('3-print');
-
-        if (isPrintsGallery) {
-            // For prints gallery, don't upscale - show at original size or smaller
-            img.style.maxWidth = '100%';
-            img.style.maxHeight = '90vh';
-            img.style.width = 'auto';
-            img.style.height = 'auto';
-            img.style.objectFit = 'contain';
-        }
-
-        lightboxImageWrapper.insertBefore(img, lightboxDescription);
+        const image = lightboxPrefetched[index] || createLightboxImage(currentMedia);
+        delete lightboxPrefetched[index];
+        lightboxImageWrapper.insertBefore(image, lightboxDescription);
     }
 
     // Hide description for animation videos, show for others
@@ -282,10 +359,79 @@ function openLightbox(index) {
         lightboxDescription.style.display = 'none';
     } else {
         lightboxDescription.style.display = 'block';
-        lightboxDescription.textContent = currentMedia.description || currentMedia.alt;
+        lightboxDescription.textContent = currentMedia.description || currentMedia.alt || '';
     }
 
     document.body.style.overflow = 'hidden';
+
+    prefetchNeighbors(index);
+}
+
+// Newer lightbox data lists screen-sized renditions of an image: a JPEG srcset and
+// <source>s in better formats. Older data only has the original in src
+function createLightboxImage(media) {
+    const picture = media.sources && media.sources.length ? document.createElement('picture') : null;
+    if (picture) {
+        // The <picture> should not change the layout around the image
+        picture.style.display = 'contents';
+        media.sources.forEach(([type, srcset]) => {
+            const source = document.createElement('source');
+            source.type = type;
+            source.srcset = srcset;
+            source.sizes = media.sizes;
+            picture.appendChild(source);
+        });
+    }
+
+    const img = document.createElement('img');
+    img.alt = media.alt || '';
+    img.id = 'lightboxImage';
+
+    // Images whose media rule says not to upscale them (inline data from older pages: the prints gallery)
+    const noUpscale = lightboxDataUrl ? Boolean(media.noUpscale) : media.src.includes('3-print');
+
+    if (noUpscale) {
+        // Don't upscale - show at original size or smaller
+        img.style.maxWidth = '100%';
+        img.style.maxHeight = '90vh';
+        img.style.width = 'auto';
+        img.style.height = 'auto';
+        img.style.objectFit = 'contain';
+    }
+
+    if (picture) {
+        picture.appendChild(img);
+    }
+    // Set the candidates last so the browser only ever requests the one it picks
+    if (media.srcset) {
+        img.sizes = media.sizes;
+        img.srcset = media.srcset;
+    }
+    img.src = media.src;
+    return picture || img;
+}
+
+// Start loading the previous and next images while one is open, so navigating shows
+// them at once (skipped when the browser asks to save data; videos load on demand)
+function prefetchNeighbors(index) {
+    const total = lightboxImages.length;
+    const neighbors = [(index + 1) % total, (index - 1 + total) % total];
+
+    Object.keys(lightboxPrefetched).forEach(key => {
+        if (!neighbors.includes(Number(key))) {
+            delete lightboxPrefetched[key];
+        }
+    });
+
+    if (navigator.connection && navigator.connection.saveData) {
+        return;
+    }
+    neighbors.forEach(neighbor => {
+        const media = lightboxImages[neighbor];
+        if (neighbor !== index && !media.isVideo && !lightboxPrefetched[neighbor]) {
+            lightboxPrefetched[neighbor] = createLightboxImage(media);
+        }
+    });
 }
 
 function closeLightbox() {
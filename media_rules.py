@@ -0,0 +1,106 @@
+"""
+Media Rules
+Per-item behavior of gallery media (autoplay, sound buttons, captions, mobile playback,
+lightbox sizing), declared in media-rules.json instead of path checks in the generator and
+the client scripts.
+
+Each rule has a pattern and the flags it sets:
+  "images/gallery/7-animation/"                  every file under a folder (path prefix)
+  "images/gallery/5-logos/1-OST/1c-intro.mp4"    one file
+  "images/gallery/4-digital/3-monster-bow/*.mp4" a glob (*, ? and [...] within a path segment)
+Rules are compiled once into a trie of path segments, so matching a path only looks at the
+rules on its way down the tree, however many rules there are. When several rules match,
+later rules in the file override earlier ones.
+"""
+
+import json
+import re
+
+RULES_FILE = 'media-rules.json'
+
+# Every flag a rule can set, with its value for media no rule mentions
+DEFAULT_FLAGS = {
+    'animation': False,          # Hover-to-play "animation-video" item; videos get a sound button instead of a caption
+    'autoplay': False,           # Videos autoplay, muted, in the grid
+    'soundButton': True,         # False leaves out the sound button an animation video would get
+    'invertedControls': False,   # Light sound button for dark videos
+    'mobileInline': False,       # On phones, videos play inline instead of opening the lightbox
+    'mobileSound': None,         # On phones, inline videos show a sound button "always" or while "playing"
+    'lightboxCaption': True,     # False hides the description under videos in the lightbox
+    'lightboxNoUpscale': False,  # The lightbox shows images at most at their own size
+}
+
+GLOB_CHARACTERS = re.compile(r'[*?\[]')
+
+def new_node():
+    """A trie node: child segments, rules for everything below, rules for this exact path, and globs"""
+    return {'children': {}, 'prefix': [], 'exact': [], 'globs': []}
+
+def glob_regex(pattern):
+    """Regex for a glob over the rest of a path; wildcards never cross a /"""
+    parts = []
+    for token in re.split(r'(\*|\?|\[[^\]]*\])', pattern):
+        if token == '*':
+            parts.append('[^/]*')
+        elif token == '?':
+            parts.append('[^/]')
+        elif token.startswith('[') and token.endswith(']') and len(token) > 2:
+            parts.append('[^/' + token[2:] if token[1] == '!' else token)
+        else:
+            parts.append(re.escape(token))
+    return re.compile(''.join(parts) + '$')
+
+def compile_rules(rules):
+    """Compile [{"match": pattern, "flags": {...}}, ...] into a matcher for match()"""
+    root = new_node()
+    for index, rule in enumerate(rules):
+        unknown = set(rule['flags']) - set(DEFAULT_FLAGS)
+        if unknown:
+            raise ValueError(f"{RULES_FILE}: unknown flag(s) {', '.join(sorted(unknown))} for {rule['match']}")
+
+        segments = rule['match'].rstrip('/').split('/')
+        node = root
+        for depth, segment in enumerate(segments):
+            if GLOB_CHARACTERS.search(segment):
+                node['globs'].append((glob_regex('/'.join(segments[depth:])), index))
+                break
+            node = node['children'].setdefault(segment, new_node())
+        else:
+            node['prefix' if rule['match'].endswith('/') else 'exact'].append(index)
+
+    return {'root': root, 'flags': [rule['flags'] for rule in rules]}
+
+def match(matcher, path):
+    """Flags for a media path: the defaults, overridden by every matching rule in file order"""
+    segments = path.split('/')
+    node = matcher['root']
+    matched = []
+    for depth in range(len(segments) + 1):
+        if node['globs']:
+            rest = '/'.join(segments[depth:])
+            matched += [index for regex, index in node['globs'] if regex.match(rest)]
+        if depth == len(segments):
+            matched += node['exact']
+            break
+        if depth:
+            matched += node['prefix']
+        node = node['children'].get(segments[depth])
+        if node is None:
+            break
+
+    flags = dict(DEFAULT_FLAGS)
+    for index in sorted(matched):
+        flags.update(matcher['flags'][index])
+    return flags
+
+def load_rules(path=RULES_FILE):
+    """The rules in media-rules.json, or none if there is no such file"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('rules', [])
+    except FileNotFoundError:
+        return []
+
+def load_matcher(path=RULES_FILE):
+    """Load and compile media-rules.json"""
+    return compile_rules(load_rules(path))
@@ -1,5 +1,5 @@
 /**
- * Mobile Animation GIFs - Autoplay GIFs and disable lightbox
+ * Mobile Animation GIFs - Autoplay GIFs (or their looping video renditions) and disable lightbox
  * Only runs on mobile devices for animation project
  */
 
@@ -9,10 +9,25 @@ document.addEventListener('DOMContentLoaded', function() {
         return;
     }
 
-    // Find all GIF images in the gallery
-    const allImageWrappers = document.querySelectorAll('.gallery-image-wrapper');
+    function disableLightbox(wrapper) {
+        // Remove click handler by preventing clicks
+        wrapper.style.cursor = 'default';
+        wrapper.addEventListener('click', function(e) {
+            e.preventDefault();
+            e.stopPropagation();
+        }, true);
+
+        // Remove data-index to prevent lightbox from tracking it
+        wrapper.removeAttribute('data-index');
+    }
+
+    function showGif(wrapper) {
+        // GIFs converted to looping video already play in place
+        if (wrapper.querySelector('video[data-gif-src]')) {
+            disableLightbox(wrapper);
+            return;
+        }
 
-    allImageWrappers.forEach(function(wrapper) {
         const img = wrapper.querySelector('img[data-full-src]');
 
         if (img) {
@@ -22,17 +37,18 @@ document.addEventListener('DOMContentLoaded', function() {
             if (fullSrc && fullSrc.toLowerCase().endsWith('.gif')) {
                 // Replace thumbnail with actual GIF
                 img.src = fullSrc;
-
-                // Remove click handler by preventing clicks
-                wrapper.style.cursor = 'default';
-                wrapper.addEventListener('click', function(e) {
-                    e.preventDefault();
-                    e.stopPropagation();
-                }, true);
-
-                // Remove data-index to prevent lightbox from tracking it
-                wrapper.removeAttribute('data-index');
+                disableLightbox(wrapper);
             }
         }
+    }
+
+    // Find all GIF images in the gallery
+    document.querySelectorAll('.gallery-image-wrapper').forEach(showGif);
+
+    // Rows loaded later by a "See more" button
+    document.addEventListener('gallery:rowsadded', function(e) {
+        e.detail.rows.forEach(function(row) {
+            row.querySelectorAll('.gallery-image-wrapper').forEach(showGif);
+        });
     });
 });
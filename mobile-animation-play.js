@@ -126,23 +126,28 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
 
-        // Check if we're on the animation page
-        const isAnimationPage = window.location.pathname.includes('project-animation');
-
-        // Check video source to determine section
-        const videoSrc = video.querySelector('source')?.src || video.src || '';
-        const isPivotPoint = videoSrc.includes('pivotpoint');
-        const isMonsterBow = videoSrc.includes('monster-bow');
-        const isTestarossa = videoSrc.includes('testarossa');
-        const isAutoplayVideo = isPivotPoint || isMonsterBow || isAnimationPage;
-
-        if (isAutoplayVideo) {
-            // For Pivot Point, Monster Bow, and Animation page: Keep autoplay, disable lightbox
+        // How the video plays on phones, resolved from media-rules.json at build time:
+        // "autoplay" (keeps playing in place), "inline" (plays in place when centered) or "button"
+        let playback = wrapper.dataset.mobilePlayback;
+        let soundMode = wrapper.dataset.mobileSound;
+        if (!playback) {
+            // Pages built before the rules carried these attributes
+            const isAnimationPage = window.location.pathname.includes('project-animation');
+            const videoSrc = video.querySelector('source')?.src || video.src || '';
+            const isPivotPoint = videoSrc.includes('pivotpoint');
+            const isMonsterBow = videoSrc.includes('monster-bow');
+            const isTestarossa = videoSrc.includes('testarossa');
+            playback = isPivotPoint || isMonsterBow ? 'autoplay' : isAnimationPage ? 'inline' : 'button';
+            soundMode = isPivotPoint ? 'always' : isAnimationPage && !isTestarossa ? 'playing' : undefined;
+        }
+
+        if (playback !== 'button') {
+            // For autoplay and inline videos: Keep autoplay, disable lightbox
             video.setAttribute('playsinline', 'true');
             video.setAttribute('webkit-playsinline', 'true');
 
-            // For animation page videos: setup viewport-based autoplay
-            if (isAnimationPage) {
+            // For inline videos: setup viewport-based autoplay
+            if (playback === 'inline') {
                 video.muted = true;
                 video.pause(); // Start paused
 
@@ -162,12 +167,10 @@ document.addEventListener('DOMContentLoaded', function() {
                 return false;
             }, true);
 
-            // Add sound toggle button for Pivot Point videos (always) AND animation page videos (excluding Testarossa)
-            if (isPivotPoint) {
-                // Pivot Point videos always get sound button (always visible)
+            // Add sound toggle button, always visible or only visible when playing
+            if (soundMode === 'always') {
                 addSoundToggleButton(video, wrapper, false);
-            } else if (isAnimationPage && !isTestarossa) {
-                // Animation page videos get sound button (only visible when playing)
+            } else if (soundMode === 'playing') {
                 addSoundToggleButton(video, wrapper, true);
             }
 
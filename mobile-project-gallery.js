@@ -31,6 +31,10 @@ document.addEventListener('DOMContentLoaded', function() {
 
             const allImages = Array.from(layout.querySelectorAll('.gallery-image-wrapper'));
 
+            // Rows behind the desktop "See more" button may not be in the page yet (see loadSectionFragment in lightbox.js)
+            const fragmentButton = section.querySelector('.see-more-btn[data-fragment]');
+            let hasPendingFragment = fragmentButton !== null && typeof loadSectionFragment === 'function';
+
             // Check if this is the food section (5-food)
             const isFoodSection = layout.querySelector('[data-section="5-food"]') !== null;
             const imagesPerLoad = isFoodSection ? 8 : 7;
@@ -76,7 +80,7 @@ document.addEventListener('DOMContentLoaded', function() {
             console.log('Now showing ' + currentlyVisible + ' of ' + allImages.length + ' images');
 
             // Hide button if all images are shown
-            if (currentlyVisible >= allImages.length && seeMoreContainer) {
+            if (currentlyVisible >= allImages.length && !hasPendingFragment && seeMoreContainer) {
                 seeMoreContainer.style.setProperty('display', 'none', 'important');
                 console.log('Hiding button - all images shown');
             }
@@ -86,7 +90,25 @@ document.addEventListener('DOMContentLoaded', function() {
         let seeMoreContainer = null;
         let seeMoreBtn = null;
 
-        if (allImages.length > imagesPerLoad) {
+        // Fetch the deferred rows once the images already in the page run out
+        function loadPendingRows() {
+            if (!hasPendingFragment || currentlyVisible + imagesPerLoad <= allImages.length) {
+                return Promise.resolve();
+            }
+            return loadSectionFragment(fragmentButton.getAttribute('data-section')).then(function(rows) {
+                hasPendingFragment = false;
+                rows.forEach(function(row) {
+                    row.style.setProperty('display', 'none', 'important');
+                    row.querySelectorAll('.gallery-image-wrapper').forEach(function(img) {
+                        img.style.setProperty('display', 'none', 'important');
+                        img.classList.add('mobile-hidden');
+                        allImages.push(img);
+                    });
+                });
+            });
+        }
+
+        if (allImages.length > imagesPerLoad || hasPendingFragment) {
             console.log('>>> Creating button for section ' + sectionIndex);
 
             // Always create new button for mobile
@@ -114,31 +136,36 @@ document.addEventListener('DOMContentLoaded', function() {
                 console.log('!!! Button clicked in section ' + sectionIndex);
                 const scrollPosition = window.pageYOffset;
                 const startIndex = currentlyVisible;
-                showNextBatch();
-
-                // Smooth scroll to first newly revealed image
-                setTimeout(function() {
-                    const firstNewImage = allImages[startIndex];
-                    if (firstNewImage) {
-                        // Temporarily add class to ALL newly revealed images to prevent overlay
-                        for (let i = startIndex; i < currentlyVisible; i++) {
-                            allImages[i].classList.add('no-overlay-temp');
-                        }
 
-                        const imageTop = firstNewImage.getBoundingClientRect().top + window.pageYOffset;
-                        window.scrollTo({
-                            top: Math.max(scrollPosition, imageTop - 160),
-                            behavior: 'smooth'
-                        });
+                loadPendingRows().catch(function(error) {
+                    console.log('Could not load more images:', error);
+                }).then(function() {
+                    showNextBatch();
 
-                        // Remove the class after scroll completes
-                        setTimeout(function() {
+                    // Smooth scroll to first newly revealed image
+                    setTimeout(function() {
+                        const firstNewImage = allImages[startIndex];
+                        if (firstNewImage) {
+                            // Temporarily add class to ALL newly revealed images to prevent overlay
                             for (let i = startIndex; i < currentlyVisible; i++) {
-                                allImages[i].classList.remove('no-overlay-temp');
+                                allImages[i].classList.add('no-overlay-temp');
                             }
-                        }, 1500);
-                    }
-                }, 100);
+
+                            const imageTop = firstNewImage.getBoundingClientRect().top + window.pageYOffset;
+                            window.scrollTo({
+                                top: Math.max(scrollPosition, imageTop - 160),
+                                behavior: 'smooth'
+                            });
+
+                            // Remove the class after scroll completes
+                            setTimeout(function() {
+                                for (let i = startIndex; i < currentlyVisible; i++) {
+                                    allImages[i].classList.remove('no-overlay-temp');
+                                }
+                            }, 1500);
+                        }
+                    }, 100);
+                });
             });
             console.log('Click handler attached to button');
         } else {
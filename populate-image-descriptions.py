@@ -4,24 +4,34 @@ Helper script to populate text-content.json with all images from gallery-data.js
 This makes it easy to add descriptions for each image that will appear in lightbox mode
 """
 
+import argparse
 import json
 import os
 from pathlib import Path
 
+import build_stats
+
 def get_filename_from_path(path):
     """Extract just the filename from full path"""
     return os.path.basename(path)
 
-def populate_text_content():
-    """Read gallery-data.json and create/update text-content.json with image entries"""
+def populate_text_content(gallery_data=None):
+    """Read gallery-data.json and create/update text-content.json with image entries
+
+    Returns the updated text content.
+    """
 
     # Load existing text-content.json
     with open('text-content.json', 'r', encoding='utf-8') as f:
-        text_content = json.load(f)
+        original = f.read()
+    build_stats.count('bytes_read', len(original.encode('utf-8')))
+    text_content = json.loads(original)
 
     # Load gallery data
-    with open('gallery-data.json', 'r', encoding='utf-8') as f:
-        gallery_data = json.load(f)
+    if gallery_data is None:
+        with open('gallery-data.json', 'r', encoding='utf-8') as f:
+            gallery_data = json.load(f)
+        build_stats.count('bytes_read', os.path.getsize('gallery-data.json'))
 
     # Mapping from gallery keys to project IDs
     gallery_to_project = {
@@ -82,13 +92,34 @@ def populate_text_content():
                     'description': existing_images.get(filename, '')
                 })
 
-    # Write updated text-content.json
+    # Write updated text-content.json (only if something changed, so its mtime stays meaningful)
+    updated = json.dumps(text_content, indent=2, ensure_ascii=False)
+    if updated == original:
+        build_stats.count('text_content.cache.hit')
+        print("✓ text-content.json already lists every image")
+        return text_content
+
+    build_stats.count('text_content.cache.miss')
+    build_stats.rebuild('text-content.json', 'gallery changed')
     with open('text-content.json', 'w', encoding='utf-8') as f:
-        json.dump(text_content, f, indent=2, ensure_ascii=False)
+        f.write(updated)
+    build_stats.count('bytes_written', len(updated.encode('utf-8')))
 
     print("✓ text-content.json updated with all images!")
     print("\nYou can now add descriptions for each image.")
     print("These descriptions will appear in the lightbox when hovering over images.")
+    return text_content
+
+def main():
+    """Sync text-content.json with gallery-data.json"""
+    parser = argparse.ArgumentParser(description="Add every gallery image to text-content.json")
+    build_stats.add_arguments(parser)
+    args = parser.parse_args()
+    build_stats.start(args.stats, args.trace)
+
+    with build_stats.stage('descriptions'):
+        populate_text_content()
+    build_stats.finish()
 
 if __name__ == '__main__':
-    populate_text_content()
+    main()
@@ -642,7 +642,7 @@ async function renderDynamicGallery(projectId, sectionTitles = {}, sectionOption
     const sections = await loadDynamicProject(projectId, sectionTitles);
 
     if (!sections) {
-        projectImagesDiv.innerHTML = '<p style="color: #888;">No images found. Run generate-gallery.sh to scan your gallery folder.</p>';
+        projectImagesDiv.innerHTML = '<p style="color: #888;">No images found. Run generate-gallery.py to scan your gallery folder.</p>';
         return;
     }
 
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Site Publisher
+Copies the built site into dist/ ready to upload: HTML, CSS and JS are minified,
+stylesheets, scripts and JSON get content-hashed file names (with every reference in
+the pages rewritten), and text files get .gz and .br siblings at maximum compression
+next to an .htaccess that serves them as-is and caches hashed files forever. Images
+and videos are hard-linked, so publishing costs no extra disk space.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+
+import build_stats
+import derivative_cache
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only .gz siblings are written
+    brotli = None
+
+# Configuration
+PUBLISH_DIR = "dist"
+SITE_DIRECTORIES = ['images', 'lightbox-data', 'fragments']
+SITE_EXTENSIONS = ('.html', '.css', '.js', '.json', '.ico', '.png', '.svg', '.txt', '.xml', '.webmanifest')
+SITE_FILES = ['CNAME']
+EXCLUDED_FILES = {
+    'generate-gallery.js',  # Node version of the gallery scan
+    'gallery-data.example.json',
+    'text-content.json',  # Build input, already baked into the pages
+    'media-rules.json',  # Build input, resolved into the pages' data attributes and lightbox data
+}
+
+FINGERPRINT_EXTENSIONS = ('.css', '.js', '.json')
+HASH_LENGTH = 10  # Same length as the lightbox data and fragment hashes
+HASHED_NAME = re.compile(r'\.[0-9a-f]{10}\.[a-z]+$')
+COMPRESS_EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg')
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+HTACCESS = r"""# Written by publish-site.py
+AddType video/mp4 .mp4 .m4v
+AddType video/webm .webm
+AddType video/ogg .ogv
+
+<FilesMatch "\.(mp4|m4v|webm|ogv)$">
+    Header set Access-Control-Allow-Origin "*"
+</FilesMatch>
+
+# Text files are compressed at publish time; serve the .br or .gz sibling and never compress per request
+DirectoryIndex index.html
+<IfModule mod_rewrite.c>
+    RewriteEngine On
+    RewriteCond %{HTTP:Accept-Encoding} br
+    RewriteCond %{REQUEST_FILENAME}.br -f
+    RewriteRule ^(.+\.(html|css|js|json|svg))$ $1.br [L]
+    RewriteCond %{HTTP:Accept-Encoding} gzip
+    RewriteCond %{REQUEST_FILENAME}.gz -f
+    RewriteRule ^(.+\.(html|css|js|json|svg))$ $1.gz [L]
+    RewriteRule \.(br|gz)$ - [E=no-gzip:1,E=no-brotli:1]
+</IfModule>
+<FilesMatch "\.html\.(br|gz)$">
+    ForceType "text/html; charset=utf-8"
+</FilesMatch>
+<FilesMatch "\.css\.(br|gz)$">
+    ForceType "text/css; charset=utf-8"
+</FilesMatch>
+<FilesMatch "\.js\.(br|gz)$">
+    ForceType "text/javascript; charset=utf-8"
+</FilesMatch>
+<FilesMatch "\.json\.(br|gz)$">
+    ForceType application/json
+</FilesMatch>
+<FilesMatch "\.svg\.(br|gz)$">
+    ForceType image/svg+xml
+</FilesMatch>
+<FilesMatch "\.br$">
+    Header set Content-Encoding br
+    Header append Vary Accept-Encoding
+</FilesMatch>
+<FilesMatch "\.gz$">
+    Header set Content-Encoding gzip
+    Header append Vary Accept-Encoding
+</FilesMatch>
+
+# Pages keep their names, so browsers check them for changes; everything they reference
+# with a content hash in its name never changes in place and is cached for a year
+<FilesMatch "\.html(\.br|\.gz)?$">
+    Header set Cache-Control "no-cache"
+</FilesMatch>
+<FilesMatch "\.[0-9a-f]{10}\.(css|js|json|html)(\.br|\.gz)?$">
+    Header set Cache-Control "public, max-age=31536000, immutable"
+</FilesMatch>
+
+<IfModule mod_expires.c>
+    ExpiresActive On
+    ExpiresByType video/mp4 "access plus 1 month"
+    ExpiresByType video/webm "access plus 1 month"
+</IfModule>
+"""
+
+# Minification. Only ASCII whitespace is collapsed: gallery file names contain non-breaking spaces
+HTML_TOKEN = re.compile(r'(<!--.*?-->|<(pre|textarea|script|style)\b.*?</\2\s*>|<[^>]*>)', re.S | re.I)
+CSS_TOKEN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/)', re.S)
+WHITESPACE = re.compile(r'[ \t\r\n\f]+')
+JS_WHITESPACE = ' \t\r\n\f'
+JS_WORD = re.compile(r'[\w$]+')
+JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^}')  # A / after these starts a regular expression
+JS_POSTFIX = ('++', '--')  # ...except after a postfix increment or decrement, where it divides
+JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                     'instanceof', 'yield', 'await'}
+
+def collapse_whitespace(text):
+    """Runs of whitespace as a single newline (if they had one) or space"""
+    return WHITESPACE.sub(lambda match: '\n' if '\n' in match.group() else ' ', text)
+
+def minify_html(source):
+    """Drop comments and indentation; tags, <pre>, <textarea>, <script> and <style> are kept as written"""
+    parts = []
+    text = ''  # Text since the last kept tag; a dropped comment joins the text around it
+    position = 0
+    for match in HTML_TOKEN.finditer(source):
+        text += source[position:match.start()]
+        token = match.group()
+        if not token.startswith('<!--') or token.startswith('<!--['):  # Keep conditional comments
+            parts.append(collapse_whitespace(text))
+            parts.append(token)
+            text = ''
+        position = match.end()
+    parts.append(collapse_whitespace(text + source[position:]))
+    return ''.join(parts).strip() + '\n'
+
+def minify_css(source):
+    """Drop comments and whitespace that does not separate anything"""
+    # Code between strings (comments dropped), and the strings themselves
+    code, strings = [''], []
+    for i, part in enumerate(CSS_TOKEN.split(source)):
+        if not i % 2:
+            code[-1] += part
+        elif not part.startswith('/*'):
+            strings.append(part)
+            code.append('')
+
+    parts = []
+    for i, part in enumerate(code):
+        part = WHITESPACE.sub(' ', part)
+        part = re.sub(r' ?([{};,>]) ?', r'\1', part)
+        part = re.sub(r': ', ':', part)
+        parts.append(part.replace(';}', '}'))
+        if i < len(strings):
+            parts.append(strings[i])
+    return ''.join(parts).strip() + '\n'
+
+def skip_quoted(source, start, quote):
+    """Index just past a string literal starting at `start` (or the end of its line if it is unterminated)"""
+    i = start + 1
+    while i < len(source) and source[i] != quote and source[i] != '\n':
+        i += 2 if source[i] == '\\' else 1
+    return min(i + 1, len(source))
+
+def skip_template(source, start):
+    """Index just past a template literal starting at `start`, including nested ${...} expressions"""
+    i = start + 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+        elif source[i] == '`':
+            return i + 1
+        elif source.startswith('${', i):
+            depth = 1
+            i += 2
+            while i < len(source) and depth:
+                if source[i] in '\'"':
+                    i = skip_quoted(source, i, source[i])
+                    continue
+                if source[i] == '`':
+                    i = skip_template(source, i)
+                    continue
+                depth += {'{': 1, '}': -1}.get(source[i], 0)
+                i += 1
+        else:
+            i += 1
+    return i
+
+def skip_regex(source, start):
+    """Index just past a regular expression literal (flags included), or None if this / is not one"""
+    i = start + 1
+    in_class = False
+    while i < len(source) and source[i] != '\n':
+        if source[i] == '\\':
+            i += 2
+            continue
+        if source[i] == '[':
+            in_class = True
+        elif source[i] == ']':
+            in_class = False
+        elif source[i] == '/' and not in_class:
+            match = JS_WORD.match(source, i + 1)
+            return match.end() if match else i + 1
+        i += 1
+    return None
+
+def minify_js(source):
+    """Drop comments, indentation and spaces between punctuation
+
+    Line breaks are kept (one per run), so automatic semicolon insertion still sees
+    every statement end. Strings, template literals and regular expressions are copied
+    as written.
+    """
+    out = []
+    last = None  # Last token written
+    pending = None  # Whitespace seen since it: '\n', ' ' or None
+    i = 0
+    while i < len(source):
+        c = source[i]
+        if c in JS_WHITESPACE:
+            end = i
+            while end < len(source) and source[end] in JS_WHITESPACE:
+                end += 1
+            pending = '\n' if '\n' in source[i:end] or pending == '\n' else ' '
+            i = end
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = len(source) if end == -1 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = len(source) if end == -1 else end + 2
+            pending = '\n' if '\n' in source[i:end] or pending == '\n' else pending or ' '
+            i = end
+            continue
+
+        # The whitespace before a token: a line break stays, a space only where it separates
+        if pending and last is not None:
+            if pending == '\n':
+                out.append('\n')
+            elif (JS_WORD.fullmatch(last[-1]) and JS_WORD.match(c)) or (last[-1] == c and c in '+-'):
+                out.append(' ')
+        pending = None
+
+        if c in '\'"':
+            end = skip_quoted(source, i, c)
+        elif c == '`':
+            end = skip_template(source, i)
+        elif c == '/' and (last is None or last in JS_REGEX_KEYWORDS
+                           or (last[-1] in JS_REGEX_AFTER and last not in JS_POSTFIX)):
+            end = skip_regex(source, i) or i + 1
+        elif source.startswith(JS_POSTFIX, i):
+            end = i + 2
+        else:
+            match = JS_WORD.match(source, i)
+            end = match.end() if match else i + 1
+
+        last = source[i:end]
+        out.append(last)
+        i = end
+
+    return ''.join(out) + '\n'
+
+def minify_json(source):
+    """Re-serialize JSON without whitespace"""
+    return json.dumps(json.loads(source), separators=(',', ':'), ensure_ascii=False) + '\n'
+
+MINIFIERS = {
+    '.html': minify_html,
+    '.css': minify_css,
+    '.js': minify_js,
+    '.json': minify_json,
+}
+
+def fingerprinted_name(path, content):
+    """styles.css -> styles.<hash>.css, for files whose names do not carry a hash yet"""
+    if not path.endswith(FINGERPRINT_EXTENSIONS) or HASHED_NAME.search(path):
+        return path
+    base, extension = os.path.splitext(path)
+    return f"{base}.{hashlib.sha256(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]}{extension}"
+
+def rewrite_references(content, renamed):
+    """Point quoted references to renamed files ("styles.css", 'gallery-data.json') at their new names"""
+    if not renamed:
+        return content
+    pattern = re.compile(r'(["\'])(?:\./)?(' + '|'.join(re.escape(path) for path in sorted(renamed, key=len, reverse=True))
+                         + r')\1')
+    return pattern.sub(lambda match: f"{match.group(1)}{renamed[match.group(2)]}{match.group(1)}", content)
+
+def collect_site_files():
+    """Paths of every file to publish, relative to the site root"""
+    files = [name for name in sorted(os.listdir('.'))
+             if os.path.isfile(name) and name not in EXCLUDED_FILES
+             and (name.endswith(SITE_EXTENSIONS) or name in SITE_FILES)]
+    for directory in SITE_DIRECTORIES:
+        for folder, dirs, names in os.walk(directory):
+            dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+            files += [f"{folder}/{name}" for name in sorted(names) if not name.startswith('.')]
+    return files
+
+def publish_order(path):
+    """JSON before CSS before JS before HTML, so each file is written after the files it references"""
+    extension = os.path.splitext(path)[1]
+    return ['.json', '.css', '.js', '.html'].index(extension) if extension in MINIFIERS else -1
+
+def write_if_changed(path, data):
+    """Write bytes unless the file already holds them; returns whether it was written"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    build_stats.count('bytes_written', len(data))
+    return True
+
+def write_compressed(path, data, changed):
+    """Write the .gz and .br siblings of a published file; returns their paths"""
+    siblings = {f"{path}.gz": lambda: gzip.compress(data, GZIP_LEVEL, mtime=0)}
+    if brotli:
+        siblings[f"{path}.br"] = lambda: brotli.compress(data, quality=BROTLI_QUALITY)
+
+    for sibling, compress in siblings.items():
+        if not changed and os.path.exists(sibling):
+            build_stats.count('publish.compress.hit')
+            continue
+        build_stats.count('publish.compress.miss')
+        with open(sibling, 'wb') as f:
+            f.write(compress())
+    return list(siblings)
+
+def remove_stale(output_dir, published):
+    """Delete files in the output directory that this publish did not write, and empty folders"""
+    removed = 0
+    for folder, _dirs, names in os.walk(output_dir, topdown=False):
+        for name in names:
+            path = os.path.join(folder, name)
+            if path not in published:
+                os.remove(path)
+                removed += 1
+        if folder != output_dir and not os.listdir(folder):
+            os.rmdir(folder)
+    return removed
+
+def publish_site(output_dir=PUBLISH_DIR):
+    """Publish the built site into output_dir; returns the number of files published"""
+    if brotli is None:
+        print("Warning: the brotli module is not installed, writing .gz siblings only")
+        print("Install with: pip install brotli")
+
+    start_time = time.time()
+    renamed = {}
+    published = set()
+    text_bytes = [0, 0]  # Before and after minification
+
+    for path in sorted(collect_site_files(), key=publish_order):
+        extension = os.path.splitext(path)[1]
+        if extension not in MINIFIERS:
+            # Media and other files are linked in as they are
+            destination = os.path.join(output_dir, path)
+            if not (os.path.exists(destination) and os.path.samefile(path, destination)):
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                derivative_cache.link_or_copy(path, destination)
+            published.add(destination)
+            if extension in COMPRESS_EXTENSIONS:
+                with open(path, 'rb') as f:
+                    published.update(write_compressed(destination, f.read(), False))
+            continue
+
+        with build_stats.span(path, 'publish'):
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+            content = MINIFIERS[extension](rewrite_references(source, renamed))
+            name = fingerprinted_name(path, content)
+            if name != path:
+                renamed[path] = name
+
+            data = content.encode('utf-8')
+            text_bytes[0] += len(source.encode('utf-8'))
+            text_bytes[1] += len(data)
+            destination = os.path.join(output_dir, name)
+            changed = write_if_changed(destination, data)
+            published.add(destination)
+            published.update(write_compressed(destination, data, changed))
+
+    htaccess_path = os.path.join(output_dir, '.htaccess')
+    write_if_changed(htaccess_path, HTACCESS.encode('utf-8'))
+    published.add(htaccess_path)
+    removed = remove_stale(output_dir, published)
+    elapsed = time.time() - start_time
+
+    print(f"✓ Published {len(published)} files to {output_dir}/ in {elapsed:.1f}s "
+          f"({len(renamed)} fingerprinted, {removed} stale removed)")
+    print(f"  HTML/CSS/JS/JSON: {text_bytes[0] / 1024:.0f} KB -> {text_bytes[1] / 1024:.0f} KB minified")
+    return len(published)
+
+def main():
+    """Publish the site into the output directory"""
+    parser = argparse.ArgumentParser(description="Publish the built site: minified, fingerprinted and pre-compressed")
+    parser.add_argument('--output', default=PUBLISH_DIR, help=f"output directory (default: {PUBLISH_DIR})")
+    build_stats.add_arguments(parser)
+    args = parser.parse_args()
+    build_stats.start(args.stats, args.trace)
+
+    print("=" * 60)
+    print("Site Publisher")
+    print("=" * 60)
+    with build_stats.stage('publish'):
+        publish_site(args.output)
+    build_stats.finish()
+
+if __name__ == "__main__":
+    main()
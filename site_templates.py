@@ -0,0 +1,180 @@
+"""
+Site Templates
+A small template engine for the generated pages. Templates live in templates/<name>.html
+and are parsed and compiled into Python functions, recompiled only when the file changes
+on disk (so a long-running watch build picks up edits), then render straight into a writer (a buffered file, or a list of chunks joined once), so render time grows
+linearly with the page.
+
+  {{ name }}, {{ item.key }}                 a context value, inserted as is (not escaped)
+  {{> partial }}                             templates/partial.html, with the same context
+  {% for item in items %} ... {% endfor %}
+  {% if name %} ... {% else %} ... {% endif %}
+
+A block tag or partial alone on its line takes the whole line with it, so templates keep
+the indentation of the HTML they produce. Values that are lists or generators are written
+chunk by chunk.
+"""
+
+import filecmp
+import hashlib
+import os
+import re
+
+import build_stats
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+TEMPLATE_EXTENSION = '.html'
+WRITE_BUFFER = 256 * 1024  # Pages are written through a buffer this size
+
+# A block tag or partial alone on its line (group 1), or any tag (group 2)
+TAG = re.compile(r'^[ \t]*(\{%.*?%\}|\{\{>.*?\}\})[ \t]*(?:\n|\Z)|(\{%.*?%\}|\{\{.*?\}\})', re.MULTILINE | re.DOTALL)
+NAME = re.compile(r'[A-Za-z_]\w*(\.[A-Za-z_]\w*)*$')
+PARTIAL_NAME = re.compile(r'[\w-]+$')
+
+_compiled = {}  # Template name -> (file mtime and size, compiled function)
+
+class TemplateError(Exception):
+    """A template that cannot be parsed, or a value it uses that the context does not have"""
+
+def template_path(name):
+    """File of a template, e.g. gallery-item -> templates/gallery-item.html"""
+    return os.path.join(TEMPLATE_DIR, f"{name}{TEMPLATE_EXTENSION}")
+
+def _get(scope, parts):
+    """Look up a dotted name in the render scope"""
+    try:
+        value = scope[parts[0]]
+        for part in parts[1:]:
+            value = value[part]
+    except (KeyError, TypeError):
+        raise TemplateError(f"{'.'.join(parts)} is not defined") from None
+    return value
+
+def _emit(value, write):
+    """Write a value: strings as they are, lists and generators chunk by chunk, None as nothing"""
+    if isinstance(value, str):
+        write(value)
+    elif value is None:
+        return
+    elif isinstance(value, (int, float)):
+        write(str(value))
+    else:
+        for chunk in value:
+            write(chunk)
+
+def compile_template(name, source):
+    """Compile template source into a function render(context, write)"""
+    lines = ['def render(_scope0, write):', '    pass']
+    blocks = []  # Open blocks as (kind, scope number)
+    scope = 0
+
+    def emit(code):
+        lines.append('    ' * (len(blocks) + 1) + code)
+
+    def lookup(expression):
+        if not NAME.match(expression):
+            raise TemplateError(f"{name}: invalid name {expression!r}")
+        return f"_get(_scope{scope}, {expression.split('.')!r})"
+
+    position = 0
+    for match in TAG.finditer(source):
+        if match.start() > position:
+            emit(f"write({source[position:match.start()]!r})")
+        position = match.end()
+        tag = match.group(1) or match.group(2)
+
+        if tag.startswith('{{>'):
+            partial = tag[3:-2].strip()
+            if not PARTIAL_NAME.match(partial):
+                raise TemplateError(f"{name}: invalid partial {partial!r}")
+            emit(f"_render({partial!r}, _scope{scope}, write)")
+        elif tag.startswith('{{'):
+            emit(f"_emit({lookup(tag[2:-2].strip())}, write)")
+        else:
+            words = tag[2:-2].split()
+            if len(words) == 4 and words[0] == 'for' and words[2] == 'in' and NAME.match(words[1]) and '.' not in words[1]:
+                emit(f"_scope{scope + 1} = dict(_scope{scope})")
+                emit(f"for _scope{scope + 1}[{words[1]!r}] in {lookup(words[3])}:")
+                blocks.append(('for', scope))
+                scope += 1
+                emit('pass')
+            elif len(words) == 2 and words[0] == 'if':
+                emit(f"if {lookup(words[1])}:")
+                blocks.append(('if', scope))
+                emit('pass')
+            elif words == ['else'] and blocks and blocks[-1][0] == 'if':
+                blocks[-1] = ('else', scope)
+                lines.append('    ' * len(blocks) + 'else:')
+                emit('pass')
+            elif words == ['endfor'] and blocks and blocks[-1][0] == 'for':
+                scope = blocks.pop()[1]
+            elif words == ['endif'] and blocks and blocks[-1][0] in ('if', 'else'):
+                blocks.pop()
+            else:
+                raise TemplateError(f"{name}: unexpected {tag}")
+
+    if blocks:
+        raise TemplateError(f"{name}: {{% {blocks[-1][0]} %}} is never closed")
+    if position < len(source):
+        emit(f"write({source[position:]!r})")
+
+    namespace = {'_get': _get, '_emit': _emit, '_render': render}
+    exec(compile('\n'.join(lines), template_path(name), 'exec'), namespace)
+    return namespace['render']
+
+def load(name):
+    """A compiled template, compiled the first time it is asked for and again whenever its file changes"""
+    path = template_path(name)
+    stat = os.stat(path)
+    state = (stat.st_mtime_ns, stat.st_size)
+    cached = _compiled.get(name)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    with build_stats.span(name, 'template'):
+        template = compile_template(name, source)
+    _compiled[name] = (state, template)
+    return template
+
+def compile_all():
+    """Compile every template up front, so a broken one fails before any page is rendered"""
+    for filename in sorted(os.listdir(TEMPLATE_DIR)):
+        if filename.endswith(TEMPLATE_EXTENSION):
+            load(filename[:-len(TEMPLATE_EXTENSION)])
+
+def digest():
+    """SHA-256 over every template, for the dependency records of pages built from them"""
+    content = hashlib.sha256()
+    for filename in sorted(os.listdir(TEMPLATE_DIR)):
+        with open(os.path.join(TEMPLATE_DIR, filename), 'rb') as f:
+            content.update(filename.encode('utf-8') + b'\0' + f.read() + b'\0')
+    return content.hexdigest()
+
+def render(name, context, write):
+    """Render a template into a writer, e.g. a file's write method"""
+    load(name)(context, write)
+
+def render_string(name, context):
+    """Render a template to a string"""
+    chunks = []
+    load(name)(context, chunks.append)
+    return ''.join(chunks)
+
+def render_to_file(name, context, path):
+    """Render a template into a file through a buffered writer; returns False, leaving the file alone, if it is unchanged
+
+    Identical files are not rewritten, so their mtime (and CDN caches) stay valid.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+        render(name, context, f.write)
+
+    if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+        os.remove(tmp_path)
+        return False
+
+    os.replace(tmp_path, path)
+    build_stats.count('bytes_written', os.path.getsize(path))
+    return True
@@ -0,0 +1,10 @@
+"""Make the site's modules, and (through build.py's import finder) its hyphenated scripts, importable"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # The pipeline scripts read their data files relative to the site root
+
+import build  # noqa: E402,F401  Registers the import finder for the hyphenated pipeline scripts
@@ -0,0 +1,55 @@
+"""Range requests in dev_server.py: 206 for a satisfiable range, 416 past the end, 200 for anything else"""
+
+import http.client
+
+import pytest
+
+import dev_server
+
+@pytest.mark.parametrize('header, size, expected', [
+    ('bytes=0-99', 1000, (0, 99)),
+    ('bytes=500-', 1000, (500, 999)),
+    ('bytes=900-2000', 1000, (900, 999)),
+    ('bytes=-100', 1000, (900, 999)),
+    ('bytes=-5000', 1000, (0, 999)),
+    (' bytes=0-0 ', 1000, (0, 0)),
+    # Ignored: served in full
+    ('bytes=0-1,5-6', 1000, None),
+    ('bytes=-', 1000, None),
+    ('items=0-10', 1000, None),
+    ('bytes=abc', 1000, None),
+    ('bytes=5-2', 1000, None),
+    ('bytes=0-10', 0, None),
+    ('bytes=-10', 0, None),
+])
+def test_parse_range(header, size, expected):
+    assert dev_server.parse_range(header, size) == expected
+
+@pytest.mark.parametrize('header', ['bytes=1000-', 'bytes=1000-1200', 'bytes=-0'])
+def test_parse_range_not_satisfiable(header):
+    with pytest.raises(dev_server.RangeNotSatisfiable):
+        dev_server.parse_range(header, 1000)
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / 'clip.mp4').write_bytes(bytes(range(256)) * 4)
+    (tmp_path / 'empty.mp4').write_bytes(b'')
+    server = dev_server.start_server(0, str(tmp_path))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def get(server, path, range_header):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+    connection.request('GET', path, headers={'Range': range_header})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response.status, response.getheader('Content-Range'), body
+
+def test_range_responses(server):
+    assert get(server, '/clip.mp4', 'bytes=10-19') == (206, 'bytes 10-19/1024', bytes(range(10, 20)))
+    assert get(server, '/clip.mp4', 'bytes=2000-')[:2] == (416, 'bytes */1024')
+    status, content_range, body = get(server, '/clip.mp4', 'bytes=0-1,5-6')
+    assert (status, content_range, len(body)) == (200, None, 1024)
+    assert get(server, '/empty.mp4', 'bytes=0-10') == (200, None, b'')
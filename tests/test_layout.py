@@ -0,0 +1,70 @@
+"""Row breaking in generate-static-site.py: the dynamic program must find the cheapest partition"""
+
+import importlib
+import random
+
+import pytest
+
+site = importlib.import_module('generate_static_site')
+
+TARGET_ROW_HEIGHT = 300
+GAP = 10
+CONTAINER_WIDTHS = [1000, 600]
+
+def row_cost(widths, container_width, min_images_per_row):
+    """Cost of one row as optimal_row_breaks scores it, or None for a row it never considers"""
+    available_width = container_width - (len(widths) - 1) * GAP
+    row_height = TARGET_ROW_HEIGHT * available_width / sum(widths)
+    if (len(widths) > 2 * min_images_per_row - 1
+            and row_height < TARGET_ROW_HEIGHT * site.OPTIMAL_MIN_HEIGHT_RATIO):
+        return None
+    return ((row_height - TARGET_ROW_HEIGHT) / TARGET_ROW_HEIGHT) ** 2
+
+def brute_force_cost(widths, container_width, min_images_per_row):
+    """Lowest total cost over every split into rows of at least min_images_per_row images"""
+    if not widths:
+        return 0.0
+    best = float('inf')
+    for length in range(min_images_per_row, len(widths) + 1):
+        cost = row_cost(widths[:length], container_width, min_images_per_row)
+        if cost is not None:
+            best = min(best, cost + brute_force_cost(widths[length:], container_width, min_images_per_row))
+    return best
+
+def partition_cost(widths, row_lengths, container_width, min_images_per_row):
+    """Total cost of a given split"""
+    total, start = 0.0, 0
+    for length in row_lengths:
+        cost = row_cost(widths[start:start + length], container_width, min_images_per_row)
+        assert cost is not None and length >= min_images_per_row
+        total += cost
+        start += length
+    assert start == len(widths)
+    return total
+
+def aspect_lists():
+    """Aspect-ratio lists: a few hand-picked ones and some random ones"""
+    yield [1.5] * 7
+    yield [0.5, 3.0, 1.0, 0.66, 1.78, 2.33, 0.8, 1.33]
+    yield [4.0, 0.25, 4.0, 0.25, 1.0, 1.0, 1.0, 0.75, 1.5, 2.0]
+    rng = random.Random(6)
+    for count in (5, 9, 12):
+        yield [rng.choice([0.56, 0.67, 0.75, 0.8, 1.0, 1.33, 1.5, 1.78, 2.33]) for _ in range(count)]
+
+@pytest.mark.parametrize('aspects', list(aspect_lists()))
+@pytest.mark.parametrize('min_images_per_row', [1, 2, 3])
+def test_optimal_row_breaks_matches_brute_force(aspects, min_images_per_row):
+    widths = [aspect * TARGET_ROW_HEIGHT for aspect in aspects]
+    breaks = site.optimal_row_breaks(widths, 0, CONTAINER_WIDTHS, GAP, min_images_per_row, TARGET_ROW_HEIGHT)
+
+    for container_width in CONTAINER_WIDTHS:
+        cost = partition_cost(widths, breaks[container_width], container_width, min_images_per_row)
+        assert cost == pytest.approx(brute_force_cost(widths, container_width, min_images_per_row))
+
+def test_optimal_row_breaks_starts_at_offset():
+    widths = [450.0, 300.0, 900.0, 300.0, 450.0, 600.0]
+    assert site.optimal_row_breaks(widths, 2, [1000], GAP, 2, TARGET_ROW_HEIGHT) == \
+        site.optimal_row_breaks(widths[2:], 0, [1000], GAP, 2, TARGET_ROW_HEIGHT)
+
+def test_optimal_row_breaks_keeps_short_sections_in_one_row():
+    assert site.optimal_row_breaks([300.0, 450.0], 0, [1000, 600], GAP, 3, TARGET_ROW_HEIGHT) == {1000: [2], 600: [2]}
@@ -0,0 +1,110 @@
+"""media_rules.py: the compiled matcher, and media-rules.json against the path checks it replaced"""
+
+import importlib
+import json
+import re
+
+import pytest
+
+import media_rules
+
+site = importlib.import_module('generate_static_site')
+
+def gallery_paths():
+    """Every media path in gallery-data.json, plus the file paths media-rules.json names"""
+    with open('gallery-data.json', 'r', encoding='utf-8') as f:
+        gallery_data = json.load(f)
+    paths = {img_src for project in gallery_data['projects'].values()
+             for section in project['sections'].values() for img_src in section['images']}
+    paths.update(rule['match'] for rule in media_rules.load_rules()
+                 if not rule['match'].endswith('/') and not media_rules.GLOB_CHARACTERS.search(rule['match']))
+    return sorted(paths)
+
+def baseline_flags(path):
+    """What the generator, lightbox.js and mobile-animation-play.js decided from the path before the rules"""
+    is_video = path.lower().endswith('.mp4')
+    is_animation_page = '7-animation/' in path
+    is_pivot_point_video = '3-pivotpoint' in path and ('5-PP-sm_blue.mp4' in path or '8a-PP-sm_pink2.mp4' in path)
+    is_ost_video = '1-OST' in path and '1c-Untitled_Artwork 2.mp4' in path
+    is_monster_bow_video = '3-monster-bow' in path and is_video
+    is_testarossa = 'testarossa' in path
+
+    if 'pivotpoint' in path or 'monster-bow' in path:
+        playback = 'autoplay'
+    else:
+        playback = 'inline' if is_animation_page else 'button'
+    if 'pivotpoint' in path:
+        sound = 'always'
+    else:
+        sound = 'playing' if is_animation_page and not is_testarossa else None
+
+    return {
+        'animation': is_animation_page or is_pivot_point_video or is_ost_video or is_monster_bow_video,
+        'autoplay': (is_pivot_point_video or is_monster_bow_video) and not is_animation_page,
+        'sound_button': not is_testarossa,
+        'inverted': any(name in path for name in ('0-effect_match_olenakovtash', '3-neveralone_nocopyright',
+                                                   'LeakyPeople_final_low')),
+        'hide_description': '7-animation' in path and is_video,
+        # The old check was '3-print' anywhere in the path, which also caught file names such as
+        # 3-print_t-shirt_PP_3_image.jpg in other projects; the rule covers the prints gallery only
+        'no_upscale': '/3-print/' in path,
+        'mobile_playback': playback,
+        'mobile_sound': sound,
+    }
+
+def resolved_flags(path):
+    """The same decisions, from the flags media-rules.json resolves for the path"""
+    flags = media_rules.match(site.MEDIA_RULES, path)
+    attributes = dict(re.findall(r'data-mobile-(\w+)="(\w+)"', site.mobile_attributes(flags)))
+    return {
+        'animation': flags['animation'],
+        'autoplay': flags['autoplay'],
+        'sound_button': flags['soundButton'],
+        'inverted': flags['invertedControls'],
+        'hide_description': not flags['lightboxCaption'] and path.lower().endswith('.mp4'),
+        'no_upscale': flags['lightboxNoUpscale'],
+        'mobile_playback': attributes['playback'],
+        'mobile_sound': attributes.get('sound'),
+    }
+
+@pytest.mark.parametrize('path', gallery_paths())
+def test_rules_match_the_path_checks(path):
+    baseline = baseline_flags(path)
+    resolved = resolved_flags(path)
+    is_video = path.lower().endswith(('.mp4', '.gif'))
+
+    # Sound buttons and inverted controls are only rendered on animation videos, mobile playback only on videos
+    if not (baseline['animation'] and path.lower().endswith('.mp4')):
+        for key in ('sound_button', 'inverted'):
+            del baseline[key], resolved[key]
+    if not is_video:
+        for key in ('mobile_playback', 'mobile_sound'):
+            del baseline[key], resolved[key]
+    assert resolved == baseline
+
+RULES = [
+    {'match': 'images/gallery/a/', 'flags': {'animation': True}},
+    {'match': 'images/gallery/a/b/', 'flags': {'animation': False, 'autoplay': True}},
+    {'match': 'images/gallery/a/b/x.mp4', 'flags': {'mobileSound': 'always'}},
+    {'match': 'images/gallery/c/*.mp4', 'flags': {'mobileInline': True}},
+    {'match': 'images/gallery/c/[!x]?.jpg', 'flags': {'lightboxNoUpscale': True}},
+]
+
+@pytest.mark.parametrize('path, expected', [
+    ('images/gallery/a/1.jpg', {'animation': True}),
+    ('images/gallery/a/b/1.jpg', {'autoplay': True}),  # Later rules override earlier ones
+    ('images/gallery/a/b/x.mp4', {'autoplay': True, 'mobileSound': 'always'}),
+    ('images/gallery/a', {}),  # A prefix rule covers what is below the folder, not the folder
+    ('images/gallery/ab/1.jpg', {}),
+    ('images/gallery/c/clip.mp4', {'mobileInline': True}),
+    ('images/gallery/c/sub/clip.mp4', {}),  # * stays within one path segment
+    ('images/gallery/c/ab.jpg', {'lightboxNoUpscale': True}),
+    ('images/gallery/c/xb.jpg', {}),
+    ('images/gallery/c/abc.jpg', {}),
+])
+def test_match(path, expected):
+    assert media_rules.match(media_rules.compile_rules(RULES), path) == dict(media_rules.DEFAULT_FLAGS, **expected)
+
+def test_unknown_flag():
+    with pytest.raises(ValueError, match='autoPlay'):
+        media_rules.compile_rules([{'match': 'images/', 'flags': {'autoPlay': True}}])
@@ -0,0 +1,92 @@
+"""Minifiers in publish-site.py: output that must stay byte-for-byte, and JS that must behave the same"""
+
+import importlib
+import shutil
+import subprocess
+
+import pytest
+
+publish_site = importlib.import_module('publish_site')
+minify_js = publish_site.minify_js
+minify_css = publish_site.minify_css
+minify_html = publish_site.minify_html
+
+# ------------------------------------------------------------------
+# JavaScript
+# ------------------------------------------------------------------
+
+@pytest.mark.parametrize('source, expected', [
+    # Regular expressions are copied as written, including what looks like comments or strings
+    ("const re = /\\/\\/ not a comment/g;", "const re=/\\/\\/ not a comment/g;"),
+    ("x = s.replace(/[/*]+/g, '')", "x=s.replace(/[/*]+/g,'')"),
+    ("if (ok) return /it's/.test(s)", "if(ok)return/it's/.test(s)"),
+    ("function f() {}\n/a b/.test(s)", "function f(){}\n/a b/.test(s)"),
+    # Division, including after a postfix increment and before a line comment
+    ("x = a / b / c", "x=a/b/c"),
+    ("x = (a + 1) / 2 // half", "x=(a+1)/2"),
+    ("x = a++ / 2 // c /\ny", "x=a++/2\ny"),
+    ("x = arr[i] / n", "x=arr[i]/n"),
+    # Template literals, with nested ${} holding braces, strings and templates
+    ("s = `a  ${ {b: 1}.b }  c`", "s=`a  ${ {b: 1}.b }  c`"),
+    ("s = `${ f(`x ${ '}' } y`) }  /* kept */`", "s=`${ f(`x ${ '}' } y`) }  /* kept */`"),
+    # Strings keep comment markers and spacing
+    ("a = '//  x'; b = \"/* y */\"", "a='//  x';b=\"/* y */\""),
+    # Comments are dropped
+    ("a = 1; /* note */ b = 2", "a=1;b=2"),
+    ("a = 1 // note\nb = 2", "a=1\nb=2"),
+    # Spaces stay only where they separate words or + and - signs
+    ("return  typeof  x", "return typeof x"),
+    ("a + ++b; c - -d; e++ + f", "a+ ++b;c- -d;e++ +f"),
+])
+def test_minify_js(source, expected):
+    assert minify_js(source) == expected + '\n'
+
+@pytest.mark.parametrize('source, expected', [
+    # Line breaks stay, so automatic semicolon insertion sees the same statement ends
+    ("a = b\n(c || d).run()", "a=b\n(c||d).run()"),
+    ("return\nvalue", "return\nvalue"),
+    ("a\n++b", "a\n++b"),
+    ("x = 1 /* one\ntwo */ y = 2", "x=1\ny=2"),
+    ("a = 1\n\n\n   b = 2", "a=1\nb=2"),
+])
+def test_minify_js_keeps_statement_ends(source, expected):
+    assert minify_js(source) == expected + '\n'
+
+# Programs whose printed result must not change when minified
+JS_PROGRAMS = [
+    "let a = 7, b = 2; let i = 1; console.log(a / b / 2, i++ / 2, [8][0] / 4, (a) / b)",
+    "console.log('a/b//c'.replace(/\\//g, '-'), /[/]/.test('/'), 'x'.split(/(?:)/).length)",
+    "const n = {v: 3}; console.log(`${n.v} ${ `${ {k: '}'}.k }` } ${'${'}`)",
+    "function f() {\n  return\n  1\n}\nconsole.log(f())",
+    "let a = 1\nlet b = a\n++a\nconsole.log(a, b)",
+    "let x = 5; x = x - -1; x = x + +1; console.log(x)",
+    "if (true) {} /a/.test('a') && console.log('regex after block')",
+]
+
+@pytest.mark.skipif(not shutil.which('node'), reason="node is not installed")
+@pytest.mark.parametrize('program', JS_PROGRAMS)
+def test_minify_js_behaves_the_same(program):
+    def run(source):
+        return subprocess.run(['node', '-e', source], capture_output=True, text=True, check=True).stdout
+
+    assert run(minify_js(program)) == run(program)
+
+# ------------------------------------------------------------------
+# CSS and HTML
+# ------------------------------------------------------------------
+
+@pytest.mark.parametrize('source, expected', [
+    ("a {\n  color: red;\n}\n", "a{color:red}"),
+    # A space before : stays, since it can be a descendant combinator (a :hover)
+    ("/* header */\na > b , c { margin : 0 }", "a>b,c{margin :0}"),
+    ("a::after { content: \"/* not a comment */  ;}\"; }", "a::after{content:\"/* not a comment */  ;}\"}"),
+    ("a { background: url('x  y.png') }", "a{background:url('x  y.png')}"),
+    ("@media (max-width: 768px) { .a { top: 0; } }", "@media (max-width:768px){.a{top:0}}"),
+])
+def test_minify_css(source, expected):
+    assert minify_css(source) == expected + '\n'
+
+def test_minify_html():
+    source = ("<div>\n    <!-- note -->\n    <p>Hello   world</p>\n"
+              "    <pre>  keep\n  this </pre>\n    <script>if (a  <  b) {}</script>\n</div>\n")
+    assert minify_html(source) == "<div>\n<p>Hello world</p>\n<pre>  keep\n  this </pre>\n<script>if (a  <  b) {}</script>\n</div>\n"